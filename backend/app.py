@@ -1,15 +1,24 @@
 import os
 import random
 import time
+import asyncio
+import hashlib
+import threading
 import requests
 import json
+import re
+import math
+import gzip
+import heapq
+import functools
 import urllib.parse 
 from bs4 import BeautifulSoup
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv, find_dotenv
 from datetime import datetime
-from pymongo import MongoClient 
+from collections import OrderedDict
+from pymongo import MongoClient, ReturnDocument
 
 # --- HYBRID MODEL IMPORTS ---
 import torch 
@@ -22,6 +31,9 @@ from google import genai
 from google.genai import types
 from google.genai.errors import APIError 
 
+import covid_stats
+import vector_index
+
 # Load environment variables from the root .env file
 load_dotenv(find_dotenv())
 
@@ -44,24 +56,98 @@ NEWS_API_KEY_NEWSDATA = os.getenv("NEW_API_KEY_NEWSDATA")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 FACT_CHECK_API_KEY = os.getenv("FACT_CHECK_API_KEY")
 
-ANALYSIS_DELAY_SECONDS = 3
+ANALYSIS_DELAY_SECONDS = float(os.getenv("ANALYSIS_DELAY_SECONDS", 3))
 MAX_RETRIES = 3
-INITIAL_BACKOFF_SECONDS = 5
-
-ACTIVE_NEWS_SERVICE = 'newsapi' 
-
-NEWSAPI_ENDPOINT = "https://newsapi.org/v2/top-headlines" 
-NEWSDATA_ENDPOINT = "https://newsdata.io/api/1/latest" 
-FACT_CHECK_ENDPOINT = "https://factchecktools.googleapis.com/v1alpha1/claims:search"
+INITIAL_BACKOFF_SECONDS = float(os.getenv("INITIAL_BACKOFF_SECONDS", 5))
+
+ACTIVE_NEWS_SERVICE = os.getenv("ACTIVE_NEWS_SERVICE", 'newsapi')
+
+# Upstream endpoints can be overridden (e.g. to point at the fakes in load_test.py)
+NEWSAPI_ENDPOINT = os.getenv("NEWSAPI_ENDPOINT", "https://newsapi.org/v2/top-headlines")
+NEWSDATA_ENDPOINT = os.getenv("NEWSDATA_ENDPOINT", "https://newsdata.io/api/1/latest")
+FACT_CHECK_ENDPOINT = os.getenv("FACT_CHECK_ENDPOINT", "https://factchecktools.googleapis.com/v1alpha1/claims:search")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") # None -> default Google endpoint
+
+# Gemini prompt passage selection: 'selected' (budgeted passages), 'full' (whole article),
+# 'ab' (random 50/50 split per request) or 'shadow' (serve 'selected', also run 'full' in the background and log agreement)
+PROMPT_PASSAGE_MODE = os.getenv("PROMPT_PASSAGE_MODE", "full") # stays 'full' until 'shadow' runs show verdict agreement
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 1200))
+CHARS_PER_TOKEN_ESTIMATE = 4
+
+# Verification cascade: cheapest stages first, stop once a stage is decisive
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "true").lower() == "true"
+CASCADE_LOCAL_TRUE_THRESHOLD = float(os.getenv("CASCADE_LOCAL_TRUE_THRESHOLD", 0.97))
+CASCADE_LOCAL_FALSE_THRESHOLD = float(os.getenv("CASCADE_LOCAL_FALSE_THRESHOLD", 0.03))
+# The local tier may only decide for domains explicitly listed as trusted, never on the unknown-domain default reputation
+CASCADE_TRUSTED_DOMAINS = {d.strip().lower() for d in os.getenv("CASCADE_TRUSTED_DOMAINS", "reuters.com,apnews.com,bbc.com,bbc.co.uk,npr.org,who.int,cdc.gov").split(',') if d.strip()}
+CASCADE_FACT_CHECK_THRESHOLD = float(os.getenv("CASCADE_FACT_CHECK_THRESHOLD", 0.9))
+CASCADE_STATS_MIN_SUPPORTED = int(os.getenv("CASCADE_STATS_MIN_SUPPORTED", 2))
+CASCADE_STATS_MIN_CONTRADICTED = int(os.getenv("CASCADE_STATS_MIN_CONTRADICTED", 2)) # one wrong number is evidence, not a verdict
+STATS_DECISIVE_CONFIDENCE = 0.9
+
+# Similar past verdicts: pooled RoBERTa embeddings of every saved analysis (see vector_index.py)
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vector_index'))
+SIMILAR_DEFAULT_K = 5
+SIMILAR_MAX_K = 50
+VECTOR_INDEX = None
+
+# Local statistical verifier over the bundled COVID-19 tables (see covid_stats.py)
+COVID_STATS_ENABLED = os.getenv("COVID_STATS_ENABLED", "true").lower() == "true"
+COVID_STORE = None
+
+# Read-only GET endpoints: cached responses are revalidated with ETags built from collection write versions
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 30))
+RESPONSE_CACHE_MAX_ENTRIES = 512
+COLLECTION_VERSION_TTL_SECONDS = float(os.getenv("COLLECTION_VERSION_TTL_SECONDS", 1)) # how stale other workers' writes may look
+GZIP_MIN_BYTES = 500
+
+# Admission control (per worker process): concurrency budgets with bounded, priority-ordered wait queues.
+# Waiting requests hold a server thread, so keep a gate's concurrency + queue below GUNICORN_THREADS to
+# leave threads free for the cheap lookups.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_ANALYSIS_CONCURRENCY = int(os.getenv("ADMISSION_ANALYSIS_CONCURRENCY", 3)) # analyze / explain / inline daily-news
+ADMISSION_ANALYSIS_QUEUE = int(os.getenv("ADMISSION_ANALYSIS_QUEUE", 3))
+ADMISSION_ANALYSIS_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_ANALYSIS_MAX_WAIT_SECONDS", 30))
+ADMISSION_EXPLAIN_CONCURRENCY = int(os.getenv("ADMISSION_EXPLAIN_CONCURRENCY", 1)) # LIME is CPU bound
+ADMISSION_LOOKUP_CONCURRENCY = int(os.getenv("ADMISSION_LOOKUP_CONCURRENCY", 32)) # source / history / analytics / similar
+ADMISSION_LOOKUP_QUEUE = int(os.getenv("ADMISSION_LOOKUP_QUEUE", 64))
+ADMISSION_LOOKUP_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_LOOKUP_MAX_WAIT_SECONDS", 2))
+ADMISSION_SIMILAR_CONCURRENCY = int(os.getenv("ADMISSION_SIMILAR_CONCURRENCY", 4)) # may run an encoder forward pass
+ADMISSION_MAX_RETRY_AFTER_SECONDS = 120
+# Priority classes: lower runs first; a full queue sheds its lowest-priority waiter for a higher-priority arrival
+PRIORITY_LOOKUP = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_DEFERRABLE = 2
+
+# Daily-news digest: refreshed in the background, served instantly from an atomically replaced snapshot file
+DAILY_NEWS_SCHEDULER_ENABLED = os.getenv("DAILY_NEWS_SCHEDULER_ENABLED", "true").lower() == "true" # false -> refresh inline when stale
+DAILY_NEWS_REFRESH_SECONDS = float(os.getenv("DAILY_NEWS_REFRESH_SECONDS", 900))
+DAILY_NEWS_RETRY_SECONDS = float(os.getenv("DAILY_NEWS_RETRY_SECONDS", 60)) # after a failed refresh
+DAILY_NEWS_SNAPSHOT_FILE = os.getenv("DAILY_NEWS_SNAPSHOT_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'daily_news_snapshot.json'))
 
 # DB Configuration
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
 
 # --- HYBRID MODEL REFERENCES ---
-LOCAL_MODEL_PATH = r'C:\Users\DELL\Desktop\truthChain\backend\models\roberta_finetuned_final' 
+LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", r'C:\Users\DELL\Desktop\truthChain\backend\models\roberta_finetuned_final')
 GLOBAL_MODEL = None
 GLOBAL_TOKENIZER = None
+TOKENIZER_LOCK = threading.Lock() # the Rust fast tokenizer is not re-entrant ("Already borrowed" across threads)
+MODEL_MAX_LENGTH = 512
+
+# Per-document encoding cache (token ids, offsets, base logits), bounded by the bytes of the cached encodings
+ENCODING_CACHE_MAX_BYTES = int(os.getenv("ENCODING_CACHE_MAX_BYTES", 24 * 1024 * 1024)) # ~2M tokens at 12 bytes each
+ENCODING_CACHE_MAX_PREDICTIONS = int(os.getenv("ENCODING_CACHE_MAX_PREDICTIONS", 4096))
+
+# /api/explain: 'lime' (perturbation sampling) or 'gradients' (integrated gradients over the input embeddings)
+EXPLAIN_DEFAULT_METHOD = os.getenv("EXPLAIN_DEFAULT_METHOD", "lime")
+EXPLAIN_METHODS = ('lime', 'gradients')
+EXPLAIN_NUM_FEATURES = 10
+EXPLAIN_MAX_CHARS = 2000
+LIME_NUM_SAMPLES = 300
+EXPLAIN_IG_STEPS = int(os.getenv("EXPLAIN_IG_STEPS", 16)) # 0 -> a single gradient x (input - baseline) pass
+EXPLAIN_IG_BATCH_SIZE = int(os.getenv("EXPLAIN_IG_BATCH_SIZE", 8)) # interpolation steps per forward/backward pass
 
 db_client = None
 db = None
@@ -70,7 +156,10 @@ db = None
 client = None
 if GEMINI_API_KEY:
     try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        if GEMINI_BASE_URL:
+            client = genai.Client(api_key=GEMINI_API_KEY, http_options={'base_url': GEMINI_BASE_URL})
+        else:
+            client = genai.Client(api_key=GEMINI_API_KEY)
         print("Gemini client initialized successfully.")
     except Exception as e:
         print(f"Error initializing Gemini client: {e}")
@@ -101,23 +190,221 @@ except Exception as e:
     GLOBAL_MODEL = None 
 # ---------------------------------------------
 
-# --- Initialize MongoDB Client (As before) ---
-if MONGO_URI and MONGO_DB_NAME:
+# --- Load Local COVID-19 Statistics Store (memory-mapped, built on first run) ---
+if COVID_STATS_ENABLED:
     try:
-        db_client = MongoClient(MONGO_URI)
-        db = db_client[MONGO_DB_NAME]
-        db.list_collection_names() 
-        db.articles.create_index("url", unique=True)
-        db.articles.create_index([("title", "text")])
-        db.sources.create_index("domain", unique=True)
-        print(f"MongoDB client initialized successfully. Connected to DB: {MONGO_DB_NAME}.")
+        COVID_STORE = covid_stats.open_store()
+        print(f"COVID-19 statistics store loaded: {len(COVID_STORE.places)} places.")
     except Exception as e:
-        print(f"Error initializing MongoDB client. Ensure the MongoDB server is running: {e}")
-        db = None 
-else:
-    print("WARNING: MONGO_URI or MONGO_DB_NAME not found. Database logging is disabled.")
+        print(f"WARNING: COVID-19 statistics store unavailable: {e}. Statistical claim checks are disabled.")
 # ---------------------------------------------
 
+# --- Load Similar-Verdict Vector Index (needs the local encoder) ---
+if GLOBAL_MODEL is not None:
+    try:
+        VECTOR_INDEX = vector_index.VectorIndex(VECTOR_INDEX_DIR, GLOBAL_MODEL.config.hidden_size)
+        print(f"Vector index loaded: {len(VECTOR_INDEX)} analyzed articles.")
+    except Exception as e:
+        print(f"WARNING: Vector index unavailable: {e}. Similarity search is disabled.")
+# ---------------------------------------------
+
+# --- Initialize MongoDB Client (As before) ---
+def init_mongo_client():
+    """Connects to MongoDB. Called at import and again in each forked worker (MongoClient is not fork-safe)."""
+    global db_client, db
+    if MONGO_URI and MONGO_DB_NAME:
+        try:
+            db_client = MongoClient(MONGO_URI)
+            db = db_client[MONGO_DB_NAME]
+            db.list_collection_names() 
+            db.articles.create_index("url", unique=True)
+            db.articles.create_index([("title", "text")])
+            db.sources.create_index("domain", unique=True)
+            print(f"MongoDB client initialized successfully. Connected to DB: {MONGO_DB_NAME}.")
+        except Exception as e:
+            print(f"Error initializing MongoDB client. Ensure the MongoDB server is running: {e}")
+            db = None 
+    else:
+        print("WARNING: MONGO_URI or MONGO_DB_NAME not found. Database logging is disabled.")
+
+init_mongo_client()
+# ---------------------------------------------
+
+# ----------------------------------------------------------------------
+# --- DOCUMENT ENCODING CACHE (TOKENIZE ONCE PER DOCUMENT) ---
+# ----------------------------------------------------------------------
+
+class DocumentEncoding:
+    """Tokenizer output for one text: int32 ids without special tokens plus an (n, 2) int32 array of character offsets."""
+    __slots__ = ('key', 'input_ids', 'offsets')
+
+    def __init__(self, key, input_ids, offsets):
+        self.key = key
+        self.input_ids = np.asarray(input_ids, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int32).reshape(-1, 2)
+
+    @property
+    def nbytes(self):
+        return self.input_ids.nbytes + self.offsets.nbytes
+
+    def visible_char_limit(self, max_tokens=MODEL_MAX_LENGTH - 2):
+        """Character index where the model's truncation window ends for this text."""
+        if len(self.input_ids) <= max_tokens: return None
+        return int(self.offsets[max_tokens - 1, 1])
+
+
+class EncodingCache:
+    """
+    LRU cache shared by classification, truncation and explanation. Encodings are keyed by a
+    content hash and bounded by the total nbytes of their arrays; base-prediction logits (and the pooled
+    embedding from the same forward pass) are keyed by the exact model input ids so any path
+    that builds the same input reuses the forward pass.
+    """
+
+    def __init__(self, max_bytes, max_predictions):
+        self.max_bytes = max_bytes
+        self.max_predictions = max_predictions
+        self._encodings = OrderedDict()
+        self._logits = OrderedDict()
+        self._embeddings = OrderedDict()
+        self._byte_total = 0
+        self._lock = threading.Lock()
+        self.stats = {"encode_hits": 0, "encode_misses": 0, "logit_hits": 0, "logit_misses": 0}
+
+    def get_encoding(self, key):
+        with self._lock:
+            encoding = self._encodings.get(key)
+            if encoding is not None:
+                self._encodings.move_to_end(key)
+                self.stats["encode_hits"] += 1
+            else:
+                self.stats["encode_misses"] += 1
+            return encoding
+
+    def put_encoding(self, encoding):
+        with self._lock:
+            if encoding.key in self._encodings: return
+            self._encodings[encoding.key] = encoding
+            self._byte_total += encoding.nbytes
+            while self._byte_total > self.max_bytes and len(self._encodings) > 1:
+                _, evicted = self._encodings.popitem(last=False)
+                self._byte_total -= evicted.nbytes
+
+    def get_logits(self, key):
+        with self._lock:
+            logits = self._logits.get(key)
+            if logits is not None:
+                self._logits.move_to_end(key)
+                self.stats["logit_hits"] += 1
+            else:
+                self.stats["logit_misses"] += 1
+            return logits
+
+    def put_logits(self, key, logits):
+        with self._lock:
+            self._logits[key] = logits
+            self._logits.move_to_end(key)
+            while len(self._logits) > self.max_predictions:
+                self._logits.popitem(last=False)
+
+    def get_embedding(self, key):
+        with self._lock:
+            embedding = self._embeddings.get(key)
+            if embedding is not None: self._embeddings.move_to_end(key)
+            return embedding
+
+    def put_embedding(self, key, embedding):
+        with self._lock:
+            self._embeddings[key] = embedding
+            self._embeddings.move_to_end(key)
+            while len(self._embeddings) > self.max_predictions:
+                self._embeddings.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._encodings.clear()
+            self._logits.clear()
+            self._embeddings.clear()
+            self._byte_total = 0
+
+
+ENCODING_CACHE = EncodingCache(ENCODING_CACHE_MAX_BYTES, ENCODING_CACHE_MAX_PREDICTIONS)
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode('utf-8', errors='ignore')).hexdigest()
+
+
+def get_document_encoding(text):
+    """Tokenizes `text` once (untruncated, with offsets) and serves later calls from the cache."""
+    key = content_hash(text)
+    encoding = ENCODING_CACHE.get_encoding(key)
+    if encoding is None:
+        with TOKENIZER_LOCK: tokens = GLOBAL_TOKENIZER(text, add_special_tokens=False, truncation=False, return_offsets_mapping=True, verbose=False)
+        encoding = DocumentEncoding(key, tokens['input_ids'], tokens['offset_mapping'])
+        ENCODING_CACHE.put_encoding(encoding)
+    return encoding
+
+
+def build_model_input_ids(*encodings, max_length=MODEL_MAX_LENGTH):
+    """
+    Joins cached segments with the separator token and truncates to the model window. Produces
+    the same ids as tokenizing `seg1 + sep_token + seg2` with truncation=True.
+    """
+    parts = []
+    for index, encoding in enumerate(encodings):
+        if index: parts.append(np.array([GLOBAL_TOKENIZER.sep_token_id], dtype=np.int32))
+        parts.append(encoding.input_ids)
+    joined = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+    return [GLOBAL_TOKENIZER.cls_token_id] + joined[:max_length - 2].tolist() + [GLOBAL_TOKENIZER.sep_token_id]
+
+
+def _ids_key(input_ids):
+    return hashlib.sha1(np.asarray(input_ids, dtype=np.int32).tobytes()).hexdigest()
+
+
+def _forward_logits(batch_ids, with_embeddings=False):
+    """
+    Runs one padded forward pass over a list of model input id lists. With `with_embeddings`
+    also returns the mask-aware mean of the last encoder layer (one vector per input).
+    """
+    with TOKENIZER_LOCK: inputs = GLOBAL_TOKENIZER.pad({"input_ids": batch_ids}, padding=True, return_tensors="pt")
+    with torch.no_grad(): outputs = GLOBAL_MODEL(**inputs, output_hidden_states=with_embeddings)
+    logits = outputs.logits.cpu().numpy()
+    if not with_embeddings: return logits
+    mask = inputs['attention_mask'].unsqueeze(-1).to(outputs.hidden_states[-1].dtype)
+    pooled = (outputs.hidden_states[-1] * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+    return logits, pooled.float().cpu().numpy()
+
+
+def _forward_base(input_ids, key):
+    logits, embeddings = _forward_logits([input_ids], with_embeddings=True)
+    ENCODING_CACHE.put_logits(key, logits[0])
+    ENCODING_CACHE.put_embedding(key, embeddings[0])
+    return logits[0], embeddings[0]
+
+
+def get_base_logits(input_ids):
+    """Base-prediction logits for one model input, computed at most once while cached."""
+    key = _ids_key(input_ids)
+    logits = ENCODING_CACHE.get_logits(key)
+    if logits is None: logits, _ = _forward_base(input_ids, key)
+    return logits
+
+
+def get_base_embedding(input_ids):
+    """Pooled encoder embedding for one model input; shares the forward pass with get_base_logits."""
+    key = _ids_key(input_ids)
+    embedding = ENCODING_CACHE.get_embedding(key)
+    if embedding is None: _, embedding = _forward_base(input_ids, key)
+    return embedding
+
+
+def softmax_np(logits):
+    shifted = np.exp(logits - np.max(logits, axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
 # ----------------------------------------------------------------------
 # --- HYBRID MODEL PREDICTION FUNCTIONS (UTILITIES) ---
 # ----------------------------------------------------------------------
@@ -127,11 +414,8 @@ def predict_proba_for_lime(texts):
     if GLOBAL_MODEL is None: return np.array([[0.5, 0.5]] * len(texts)) 
 
     try:
-        inputs = GLOBAL_TOKENIZER(texts, return_tensors="pt", padding=True, truncation=True, max_length=512)
-        
-        with torch.no_grad(): outputs = GLOBAL_MODEL(**inputs)
-        probabilities = torch.softmax(outputs.logits, dim=1).cpu().numpy()
-        return probabilities
+        with TOKENIZER_LOCK: encoded = GLOBAL_TOKENIZER(texts, truncation=True, max_length=MODEL_MAX_LENGTH)
+        return softmax_np(_forward_logits(encoded['input_ids']))
         
     except Exception as e:
         print(f"LIME Prediction Runtime Error: {e}")
@@ -148,8 +432,9 @@ def predict_local_model_confidence(title, content, source_name):
         return 0.6, "mixed"
 
     try:
-        input_text = title + GLOBAL_TOKENIZER.sep_token + content
-        probabilities = predict_proba_for_lime([input_text])[0]
+        # Equivalent to tokenizing `title + sep_token + content`, but the content encoding is cached
+        input_ids = build_model_input_ids(get_document_encoding(title), get_document_encoding(content))
+        probabilities = softmax_np(get_base_logits(input_ids))
         true_confidence = float(probabilities[1])
         
         if true_confidence > 0.7: verdict = "true"
@@ -167,42 +452,125 @@ def predict_ai_generation_probability(text):
     if text_len < 100: return 0.1 
     return 0.35 
 
+# ----------------------------------------------------------------------
+# --- LOCAL MODEL EXPLANATIONS (LIME / INTEGRATED GRADIENTS) ---
+# ----------------------------------------------------------------------
+
+WORD_SPAN_REGEX = re.compile(r'\w+') # the word units LIME's default splitter (\W+) produces
+
+def explain_with_lime(text, num_features=EXPLAIN_NUM_FEATURES, num_samples=LIME_NUM_SAMPLES, random_state=None):
+    """(word, weight) pairs for the 'Real' class (index 1), strongest first."""
+    explainer = LimeTextExplainer(class_names=['Fake', 'Real'], random_state=random_state)
+    explanation = explainer.explain_instance(
+        text,
+        classifier_fn=predict_proba_for_lime,
+        num_samples=num_samples,
+        num_features=num_features,
+        labels=(0, 1)
+    )
+    return explanation.as_list(label=1)
+
+
+def integrated_gradients(input_ids, steps=EXPLAIN_IG_STEPS, target=1):
+    """
+    Per-token attribution of P(target) for one model input. The baseline replaces every text
+    token embedding with the pad embedding (keeping <s> and </s>); gradients are averaged over
+    `steps` midpoints on the straight path to the input, EXPLAIN_IG_BATCH_SIZE points per pass.
+    """
+    ids = torch.tensor([input_ids])
+    embedding_layer = GLOBAL_MODEL.get_input_embeddings()
+    with torch.no_grad():
+        inputs_embeds = embedding_layer(ids)[0]
+        baseline = embedding_layer(torch.full_like(ids, GLOBAL_TOKENIZER.pad_token_id))[0]
+        baseline[0], baseline[-1] = inputs_embeds[0], inputs_embeds[-1]
+    delta = inputs_embeds - baseline
+    alphas = [1.0] if steps <= 0 else [(k + 0.5) / steps for k in range(steps)]
+
+    total_grad = torch.zeros_like(inputs_embeds)
+    for start in range(0, len(alphas), EXPLAIN_IG_BATCH_SIZE):
+        batch_alphas = torch.tensor(alphas[start:start + EXPLAIN_IG_BATCH_SIZE], dtype=delta.dtype).view(-1, 1, 1)
+        path = (baseline + batch_alphas * delta).requires_grad_(True)
+        with torch.enable_grad():
+            logits = GLOBAL_MODEL(inputs_embeds=path, attention_mask=torch.ones(path.shape[:2], dtype=torch.long)).logits
+            target_probability = torch.softmax(logits, dim=-1)[:, target].sum()
+            # autograd.grad (not backward) so no parameter .grad buffers are written by concurrent requests
+            grads, = torch.autograd.grad(target_probability, path)
+        total_grad += grads.sum(dim=0)
+    return ((total_grad / len(alphas)) * delta).sum(dim=-1).detach().numpy()
+
+
+def merge_token_attributions(text, offsets, scores):
+    """Sums subword-token scores into LIME-style features: distinct words of `text` (punctuation dropped)."""
+    spans = [(m.start(), m.end(), m.group()) for m in WORD_SPAN_REGEX.finditer(text)]
+    weights = {}
+    word = 0
+    for (start, end), score in zip(offsets, scores):
+        if end <= start: continue
+        while word < len(spans) and spans[word][1] <= start: word += 1
+        overlap = word
+        while overlap < len(spans) and spans[overlap][0] < end:
+            weights[spans[overlap][2]] = weights.get(spans[overlap][2], 0.0) + float(score)
+            overlap += 1
+    return weights
+
+
+def explain_with_gradients(text, num_features=EXPLAIN_NUM_FEATURES, steps=EXPLAIN_IG_STEPS):
+    """Same (word, weight) output as explain_with_lime, from integrated gradients of P(Real)."""
+    encoding = get_document_encoding(text)
+    input_ids = build_model_input_ids(encoding)
+    token_scores = integrated_gradients(input_ids, steps=steps)[1:-1] # drop <s> / </s>
+    weights = merge_token_attributions(text, encoding.offsets[:len(token_scores)], token_scores)
+    return sorted(weights.items(), key=lambda item: abs(item[1]), reverse=True)[:num_features]
+
 # --- CLAIM EXTRACTION & FACT CHECKING ---
 
+# Shared by the sync handlers below and the async serving mode (async_app.py): only the I/O differs.
+CLAIM_EXTRACTION_MODEL = 'gemini-2.5-flash'
+
+def build_claim_extraction_prompt(text):
+    return f"Analyze the following text and extract the single, most critical factual claim that would need external verification. Return ONLY the text of the claim, nothing else. Text: {text[:500]}"
+
 def extract_primary_claim(text):
     if not client: return None
-    extraction_prompt = f"Analyze the following text and extract the single, most critical factual claim that would need external verification. Return ONLY the text of the claim, nothing else. Text: {text[:500]}"
     try:
-        response = client.models.generate_content(model='gemini-2.5-flash', contents=extraction_prompt)
+        response = client.models.generate_content(model=CLAIM_EXTRACTION_MODEL, contents=build_claim_extraction_prompt(text))
         return response.text.strip().replace('"', '')
     except Exception: return None
 
+def fact_check_params(claim):
+    return {"query": claim, "key": FACT_CHECK_API_KEY, "languageCode": "en", "pageSize": 5}
+
+def interpret_fact_check(data):
+    """Maps a Fact Check API response to (result tag, confidence)."""
+    claims = data.get('claims', [])
+    if not claims: return "NO_EXTERNAL_MATCH", 0.0
+    false_count = 0
+    true_count = 0
+    for fact_claim in claims:
+        rating = fact_claim.get('claimReview', [{}])[0].get('textualRating', '').lower()
+        if 'false' in rating or 'lie' in rating or 'misleading' in rating: false_count += 1
+        if 'true' in rating or 'correct' in rating or 'accurate' in rating: true_count += 1
+    
+    if false_count > true_count: return "CONTRADICTORY", 0.95
+    if true_count > false_count: return "SUPPORTING", 0.95
+    return "MIXED_EXTERNAL", 0.0
+
 def check_google_fact_check(claim):
     if not claim or not FACT_CHECK_API_KEY: return "API_KEY_MISSING", 0.0
-    params = {"query": claim, "key": FACT_CHECK_API_KEY, "languageCode": "en", "pageSize": 5}
     try:
-        response = requests.get(FACT_CHECK_ENDPOINT, params=params, timeout=5)
+        response = requests.get(FACT_CHECK_ENDPOINT, params=fact_check_params(claim), timeout=5)
         response.raise_for_status()
-        data = response.json()
-        claims = data.get('claims', [])
-        if not claims: return "NO_EXTERNAL_MATCH", 0.0
-        false_count = 0
-        true_count = 0
-        for fact_claim in claims:
-            rating = fact_claim.get('claimReview', [{}])[0].get('textualRating', '').lower()
-            if 'false' in rating or 'lie' in rating or 'misleading' in rating: false_count += 1
-            if 'true' in rating or 'correct' in rating or 'accurate' in rating: true_count += 1
-        
-        if false_count > true_count: return "CONTRADICTORY", 0.95
-        if true_count > false_count: return "SUPPORTING", 0.95
-        return "MIXED_EXTERNAL", 0.0
+        return interpret_fact_check(response.json())
     except Exception: return "API_ERROR", 0.0
 
-def get_external_domain_reputation(domain):
+def clean_source_domain(domain):
     try:
         parsed_uri = urllib.parse.urlparse(domain)
-        clean_domain = parsed_uri.netloc or domain.split('/')[0]
-    except: clean_domain = domain
+        return parsed_uri.netloc or domain.split('/')[0]
+    except: return domain
+
+def get_external_domain_reputation(domain):
+    clean_domain = clean_source_domain(domain)
 
     if not clean_domain or clean_domain in ['user-input-text', 'localhost', '#']: return 0.5, "LOCAL_OR_USER_INPUT"
     low_rep_keywords = ['blog', 'viral', 'news-update', 'free-info', 'spam-site']
@@ -211,17 +579,171 @@ def get_external_domain_reputation(domain):
         
     return 0.9, "HIGH_REPUTATION_DEFAULT"
 
-def analyze_text_for_fake_news(text, external_rep_score=0.5, external_rep_tag="N/A", fact_check_result=None, fact_check_confidence=0.0):
-    if not client: return {"verdict": "mixed", "confidence": 0.5, "summary": "Error: Real-time analysis failed. Gemini API Key is missing or invalid.", "evidence": [], "txHash": "", "ipfsCid": ""}
+def is_trusted_domain(clean_domain):
+    """True for a CASCADE_TRUSTED_DOMAINS entry or one of its subdomains."""
+    host = clean_domain.lower().split(':')[0]
+    return any(host == domain or host.endswith('.' + domain) for domain in CASCADE_TRUSTED_DOMAINS)
+
+def is_trusted_source(url):
+    """Cascade tier-1 gate for an article URL; kept out of the reputation tag so the Gemini prompt is unchanged."""
+    return bool(url) and is_trusted_domain(clean_source_domain(url))
+
+def build_fact_check_result(fact_check_result, fact_check_confidence):
+    """Analysis result used when the Fact Check API alone is definitive (no Gemini reasoning call)."""
+    summary_text = f"External Fact Check API provided a definitive result: Claim is {fact_check_result.replace('ING', '')}. Further AI analysis was skipped. Verdict based on verified external sources."
+    verdict_type = "false" if fact_check_result == "CONTRADICTORY" else "true"
+    return {"verdict": verdict_type, "confidence": fact_check_confidence, "summary": summary_text, "evidence": [{"source": "Google Fact Check API", "link": FACT_CHECK_ENDPOINT, "content": "Primary Claim Check", "credibility": 1.0, "supportVerdict": fact_check_result, "description": "Verdict concluded by external fact-checker database."}], "txHash": f"0x{random.getrandbits(256):064x}", "ipfsCid": f"Qm{random.getrandbits(16):x}b20399d82a17f22384a6217462a69074b1"}
+
+# --- PROMPT PASSAGE SELECTION ---
+
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'for', 'with', 'at', 'by', 'from', 'as', 'is', 'are',
+    'was', 'were', 'be', 'been', 'it', 'its', 'this', 'that', 'these', 'those', 'has', 'have', 'had', 'will', 'would',
+    'can', 'could', 'not', 'no', 'he', 'she', 'they', 'we', 'you', 'his', 'her', 'their', 'our', 'than', 'then', 'there',
+    'which', 'who', 'what', 'when', 'where', 'also', 'into', 'about', 'after', 'over', 'more', 'said', 'says'
+}
+SENTENCE_SPLIT_REGEX = re.compile(r'(?<=[.!?])\s+(?=["\'A-Z0-9])')
+WORD_REGEX = re.compile(r"[a-z0-9][a-z0-9'%.-]*")
+CHECKWORTHY_REGEX = re.compile(r'\d|%|percent|according to|reported|study|official|million|billion|"')
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN_ESTIMATE + 1
+
+
+def _content_terms(text):
+    return [w.strip(".'-") for w in WORD_REGEX.findall(text.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def select_relevant_passages(text, claim=None, headline=None, token_budget=PROMPT_TOKEN_BUDGET):
+    """
+    Picks the sentences most relevant to the claim within a token budget. Sentences are scored by
+    IDF-weighted term overlap with the claim/headline plus a small check-worthiness and lead bonus,
+    then emitted in original order with '[...]' marking gaps. Returns the text unchanged if it fits.
+    """
+    if estimate_tokens(text) <= token_budget: return text
+
+    sentences = [s.strip() for s in SENTENCE_SPLIT_REGEX.split(text) if s.strip()]
+    if len(sentences) <= 1: return text[:token_budget * CHARS_PER_TOKEN_ESTIMATE]
+
+    sentence_terms = [set(_content_terms(s)) for s in sentences]
+    doc_freq = {}
+    for terms in sentence_terms:
+        for term in terms: doc_freq[term] = doc_freq.get(term, 0) + 1
+    num_sentences = len(sentences)
+
+    query_terms = set(_content_terms(claim or '')) | set(_content_terms(headline or ''))
+
+    scored = []
+    for index, (sentence, terms) in enumerate(zip(sentences, sentence_terms)):
+        overlap = sum(math.log(1 + num_sentences / doc_freq[t]) for t in terms & query_terms)
+        score = overlap / math.sqrt(len(terms) + 1)
+        if CHECKWORTHY_REGEX.search(sentence.lower()): score += 0.15
+        if index < 2: score += 0.25 # Lead sentences usually carry the story
+        scored.append((score, index))
+
+    ranked = sorted(scored, key=lambda item: (-item[0], item[1]))
+    selected, used = set(), 0
+    for score, index in ranked:
+        cost = estimate_tokens(sentences[index])
+        if used + cost > token_budget: continue
+        selected.add(index)
+        used += cost
+    # Every sentence alone exceeds the budget: keep the best one, truncated like the single-sentence case
+    if not selected: return sentences[ranked[0][1]][:token_budget * CHARS_PER_TOKEN_ESTIMATE]
+
+    parts, previous = [], -1
+    for index in sorted(selected):
+        if previous >= 0 and index != previous + 1: parts.append('[...]')
+        parts.append(sentences[index])
+        previous = index
+    return ' '.join(parts)
+
+
+def choose_prompt_mode():
+    if PROMPT_PASSAGE_MODE == 'ab': return random.choice(['selected', 'full'])
+    if PROMPT_PASSAGE_MODE in ('full', 'selected', 'shadow'): return PROMPT_PASSAGE_MODE
+    return 'full'
+
+
+def build_analysis_prompt(article_text, reputation_context, headline=None, claim=None):
+    headline_line = f"Headline: {headline} " if headline else ""
+    claim_line = f"Primary Claim: {claim} " if claim else ""
+    return f"""You are an expert, unbiased AI fact-checker. Your task is to analyze the following article text for factual accuracy by using your access to Google Search. {reputation_context} Output your response STRICTLY as a single JSON object. [...] {headline_line}{claim_line}Article Text to Analyze: --- {article_text} ---"""
+
+
+def run_shadow_full_prompt(full_prompt, selected_result, prompt_stats):
+    """Background comparison for PROMPT_PASSAGE_MODE='shadow': runs the full-text prompt and records agreement."""
+    started = time.perf_counter()
+    full_result = _generate_gemini_analysis(full_prompt, "", "")
+    record = {
+        **prompt_stats, "timestamp": datetime.utcnow(),
+        "selected_verdict": selected_result.get('verdict'), "selected_confidence": selected_result.get('confidence'),
+        "full_verdict": full_result.get('verdict'), "full_confidence": full_result.get('confidence'),
+        "full_latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "verdict_agreement": selected_result.get('verdict') == full_result.get('verdict'),
+    }
+    print(f"[prompt-shadow] selected={record['selected_verdict']} full={record['full_verdict']} agreement={record['verdict_agreement']} "
+          f"latency selected={prompt_stats['gemini_latency_ms']}ms full={record['full_latency_ms']}ms")
+    if db is not None:
+        try: db.prompt_experiments.insert_one(record)
+        except Exception: pass
+
+
+# --- LOCAL STATISTICAL CLAIM CHECKS ---
+
+def check_statistical_claims(text):
+    """Numeric COVID-19 claims checked against the local store (in-process, no external calls)."""
+    if COVID_STORE is None: return None
+    try: return covid_stats.verify_text(COVID_STORE, text)
+    except Exception as e:
+        print(f"Statistical claim check failed: {e}")
+        return None
+
+def statistics_verdict(stats_check):
+    """'false' when several claims are contradicted and none supported, 'true' when enough claims all check out, else None."""
+    if not stats_check or not stats_check['checked']: return None
+    if stats_check['contradicted'] >= CASCADE_STATS_MIN_CONTRADICTED and not stats_check['supported']: return 'false'
+    if not stats_check['contradicted'] and not stats_check['inconclusive'] and stats_check['supported'] >= CASCADE_STATS_MIN_SUPPORTED: return 'true'
+    return None
+
+def build_statistics_evidence(stats_check):
+    evidence = []
+    for claim in (stats_check or {}).get('claims', []):
+        place = claim['place'] if not claim['parent'] or claim['level'] in ('country', 'world') else f"{claim['place']}, {claim['parent']}"
+        dataset_value = f"{claim['actual']:,} ({claim['actual_date'] or 'latest snapshot'})" if claim['actual'] is not None else f"not available ({claim['reason']})"
+        evidence.append({
+            "source": "Local COVID-19 statistics", "link": "", "content": claim['text'], "credibility": 1.0,
+            "supportVerdict": {"supported": "SUPPORTING", "contradicted": "CONTRADICTORY"}.get(claim['verdict'], "INCONCLUSIVE"),
+            "description": f"Claimed {claim['metric'].replace('_', ' ')} in {place} ({claim['bound']}): {claim['claimed']:,.0f} by {claim['date'] or 'unspecified date'}; dataset: {dataset_value}.",
+        })
+    return evidence
+
+def build_statistics_result(stats_check, verdict):
+    """Analysis result used when the local statistics alone are decisive (no external calls)."""
+    summary_text = (f"Local COVID-19 statistics were decisive: {stats_check['supported']} numeric claim(s) supported, "
+                    f"{stats_check['contradicted']} contradicted by the dataset. External AI analysis was skipped.")
+    return {"verdict": verdict, "confidence": STATS_DECISIVE_CONFIDENCE, "summary": summary_text, "evidence": [], "txHash": f"0x{random.getrandbits(256):064x}", "ipfsCid": f"Qm{random.getrandbits(16):x}b20399d82a17f22384a6217462a69074b1"}
+
+def attach_statistics(analysis_result, stats_check):
+    """Adds the statistical checks to whichever tier produced the result, as evidence for the fusion step."""
+    if stats_check and stats_check['checked']:
+        analysis_result['evidence'] = build_statistics_evidence(stats_check) + list(analysis_result.get('evidence') or [])
+        analysis_result['statistics'] = {k: stats_check[k] for k in ('checked', 'supported', 'contradicted', 'inconclusive', 'latency_ms')}
+    return analysis_result
+
+def prepare_gemini_analysis(text, external_rep_score=0.5, external_rep_tag="N/A", fact_check_result=None, fact_check_confidence=0.0, primary_claim=None, headline=None):
+    """
+    Pre-checks and prompt construction for the Gemini reasoning call.
+    Returns (result, None) when no call is needed, else (None, gemini_request).
+    """
+    if not client: return {"verdict": "mixed", "confidence": 0.5, "summary": "Error: Real-time analysis failed. Gemini API Key is missing or invalid.", "evidence": [], "txHash": "", "ipfsCid": ""}, None
     if not text or len(text) < 50 or text.startswith("Error: Could not extract"):
          summary_text = "Insufficient text provided for comprehensive analysis."
          if text.startswith("Error: Could not extract"): summary_text = "Analysis failed: Could not scrape meaningful content from the provided URL."
-         return {"verdict": "mixed", "confidence": 0.5, "summary": summary_text, "evidence": [], "txHash": "", "ipfsCid": ""}
+         return {"verdict": "mixed", "confidence": 0.5, "summary": summary_text, "evidence": [], "txHash": "", "ipfsCid": ""}, None
 
-    if fact_check_confidence > 0.9:
-        summary_text = f"External Fact Check API provided a definitive result: Claim is {fact_check_result.replace('ING', '')}. Further AI analysis was skipped. Verdict based on verified external sources."
-        verdict_type = "false" if fact_check_result == "CONTRADICTORY" else "true"
-        return {"verdict": verdict_type, "confidence": fact_check_confidence, "summary": summary_text, "evidence": [{"source": "Google Fact Check API", "link": FACT_CHECK_ENDPOINT, "content": "Primary Claim Check", "credibility": 1.0, "supportVerdict": fact_check_result, "description": "Verdict concluded by external fact-checker database."}], "txHash": f"0x{random.getrandbits(256):064x}", "ipfsCid": f"Qm{random.getrandbits(16):x}b20399d82a17f22384a6217462a69074b1"}
+    if fact_check_confidence > 0.9: return build_fact_check_result(fact_check_result, fact_check_confidence), None
     
     tx_hash = f"0x{random.getrandbits(256):064x}"
     ipfs_cid = f"Qm{random.getrandbits(16):x}b20399d82a17f22384a6217462a69074b1"
@@ -231,45 +753,525 @@ def analyze_text_for_fake_news(text, external_rep_score=0.5, external_rep_tag="N
     Use ALL this information, along with your live Google Search results, to inform the overall 'confidence' level and the final verdict.
     """
     
-    prompt = f"""You are an expert, unbiased AI fact-checker. Your task is to analyze the following article text for factual accuracy by using your access to Google Search. {reputation_context} Output your response STRICTLY as a single JSON object. [...] Article Text to Analyze: --- {text} ---"""
-    
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = client.models.generate_content(model='gemini-2.5-pro', contents=prompt, config=types.GenerateContentConfig(tools=[{"google_search": {}}]))
-            if response.text is None: raise Exception("Gemini API returned an empty text response (None).")
+    prompt_mode = choose_prompt_mode()
+    full_prompt = build_analysis_prompt(text, reputation_context, headline=headline, claim=primary_claim)
+    if prompt_mode == 'full':
+        prompt = full_prompt
+        prompt_text = text
+    else:
+        prompt_text = select_relevant_passages(text, claim=primary_claim, headline=headline)
+        prompt = build_analysis_prompt(prompt_text, reputation_context, headline=headline, claim=primary_claim)
 
-            raw_text = response.text.strip()
-            if raw_text.startswith("```json"): raw_text = raw_text[7:]
-            if raw_text.endswith("```"): raw_text = raw_text[:-3]
-                
-            analysis_result = json.loads(raw_text.strip())
-            analysis_result['confidence'] = float(analysis_result.get('confidence', 0.5))
-            
-            evidence_list = analysis_result.get('evidence', [])
-            for ev in evidence_list:
-                 try: ev['credibility'] = float(ev.get('credibility', 0.5))
-                 except ValueError: ev['credibility'] = 0.5 
-                     
-            if 'txHash' not in analysis_result: analysis_result['txHash'] = tx_hash
-            if 'ipfsCid' not in analysis_result: analysis_result['ipfsCid'] = ipfs_cid
+    return None, {"text": text, "prompt": prompt, "prompt_text": prompt_text, "prompt_mode": prompt_mode, "full_prompt": full_prompt, "tx_hash": tx_hash, "ipfs_cid": ipfs_cid}
+
+
+def finish_gemini_analysis(gemini_request, analysis_result, started):
+    """Attaches prompt stats (and starts the shadow full-prompt run) once the Gemini call returned."""
+    prompt_stats = {
+        "mode": gemini_request['prompt_mode'], "article_chars": len(gemini_request['text']), "prompt_chars": len(gemini_request['prompt_text']),
+        "prompt_tokens_estimate": estimate_tokens(gemini_request['prompt']), "gemini_latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    analysis_result['prompt_stats'] = prompt_stats
+
+    if gemini_request['prompt_mode'] == 'shadow' and gemini_request['prompt_text'] != gemini_request['text']:
+        threading.Thread(target=run_shadow_full_prompt, args=(gemini_request['full_prompt'], dict(analysis_result), prompt_stats), daemon=True).start()
+
+    return analysis_result
+
+
+def analyze_text_for_fake_news(text, external_rep_score=0.5, external_rep_tag="N/A", fact_check_result=None, fact_check_confidence=0.0, primary_claim=None, headline=None):
+    result, gemini_request = prepare_gemini_analysis(text, external_rep_score, external_rep_tag, fact_check_result, fact_check_confidence, primary_claim, headline)
+    if result is not None: return result
+
+    started = time.perf_counter()
+    analysis_result = _generate_gemini_analysis(gemini_request['prompt'], gemini_request['tx_hash'], gemini_request['ipfs_cid'])
+    return finish_gemini_analysis(gemini_request, analysis_result, started)
+
+
+GEMINI_ANALYSIS_MODEL = 'gemini-2.5-pro'
+
+def gemini_analysis_config():
+    return types.GenerateContentConfig(tools=[{"google_search": {}}])
+
+def parse_gemini_analysis(response_text, tx_hash, ipfs_cid):
+    """Parses Gemini's JSON verdict (optionally fenced in ```json) and normalises the numeric fields."""
+    if response_text is None: raise Exception("Gemini API returned an empty text response (None).")
+
+    raw_text = response_text.strip()
+    if raw_text.startswith("```json"): raw_text = raw_text[7:]
+    if raw_text.endswith("```"): raw_text = raw_text[:-3]
+        
+    analysis_result = json.loads(raw_text.strip())
+    analysis_result['confidence'] = float(analysis_result.get('confidence', 0.5))
+    
+    evidence_list = analysis_result.get('evidence', [])
+    for ev in evidence_list:
+         try: ev['credibility'] = float(ev.get('credibility', 0.5))
+         except ValueError: ev['credibility'] = 0.5 
+             
+    if 'txHash' not in analysis_result: analysis_result['txHash'] = tx_hash
+    if 'ipfsCid' not in analysis_result: analysis_result['ipfsCid'] = ipfs_cid
+
+    return analysis_result
+
+def gemini_retry_delay(error, attempt):
+    """Backoff before retrying a 503 / overloaded APIError, or None when the error is final."""
+    if '503' in str(error) or 'overloaded' in str(error) and attempt < MAX_RETRIES - 1:
+        wait_time = INITIAL_BACKOFF_SECONDS * (2 ** attempt) + random.uniform(0, 1)
+        print(f"API 503 Error (Attempt {attempt + 1}/{MAX_RETRIES}). Retrying analysis in {wait_time:.2f} seconds...")
+        return wait_time
+    return None
+
+def gemini_failure_result(error, attempt=None):
+    if attempt is not None:
+        return {"verdict": "mixed", "confidence": 0.3, "summary": f"Real-time analysis failed permanently after {attempt + 1} attempts: {error}", "evidence": [], "txHash": "", "ipfsCid": ""}
+    if isinstance(error, json.JSONDecodeError):
+        return {"verdict": "mixed", "confidence": 0.4, "summary": "Analysis failed: The AI did not return a valid JSON format.", "evidence": [], "txHash": "", "ipfsCid": ""}
+    return {"verdict": "mixed", "confidence": 0.3, "summary": f"An unexpected error occurred during analysis: {error}", "evidence": [], "txHash": "", "ipfsCid": ""}
+
+def gemini_retries_exhausted_result():
+    return {"verdict": "mixed", "confidence": 0.3, "summary": f"Real-time analysis failed after {MAX_RETRIES} attempts due to persistent server unavailability.", "evidence": [], "txHash": "", "ipfsCid": ""}
 
-            return analysis_result
 
+def _generate_gemini_analysis(prompt, tx_hash, ipfs_cid):
+    """Calls gemini-2.5-pro with Google Search grounding and parses the JSON verdict (with 503 backoff)."""
+    for attempt in range(MAX_RETRIES):
+        try:
+            response = client.models.generate_content(model=GEMINI_ANALYSIS_MODEL, contents=prompt, config=gemini_analysis_config())
+            return parse_gemini_analysis(response.text, tx_hash, ipfs_cid)
         except APIError as e:
-            if '503' in str(e) or 'overloaded' in str(e) and attempt < MAX_RETRIES - 1:
-                wait_time = INITIAL_BACKOFF_SECONDS * (2 ** attempt) + random.uniform(0, 1)
-                print(f"API 503 Error (Attempt {attempt + 1}/{MAX_RETRIES}). Retrying analysis in {wait_time:.2f} seconds...")
-                time.sleep(wait_time)
-                continue
-            else:
-                error_summary = f"Real-time analysis failed permanently after {attempt + 1} attempts: {e}"
-                return {"verdict": "mixed", "confidence": 0.3, "summary": error_summary, "evidence": [], "txHash": "", "ipfsCid": ""}
-        except json.JSONDecodeError:
-            return {"verdict": "mixed", "confidence": 0.4, "summary": "Analysis failed: The AI did not return a valid JSON format.", "evidence": [], "txHash": "", "ipfsCid": ""}
+            wait_time = gemini_retry_delay(e, attempt)
+            if wait_time is None: return gemini_failure_result(e, attempt)
+            time.sleep(wait_time)
         except Exception as e:
-            return {"verdict": "mixed", "confidence": 0.3, "summary": f"An unexpected error occurred during analysis: {e}", "evidence": [], "txHash": "", "ipfsCid": ""}
+            return gemini_failure_result(e)
     
-    return {"verdict": "mixed", "confidence": 0.3, "summary": f"Real-time analysis failed after {MAX_RETRIES} attempts due to persistent server unavailability.", "evidence": [], "txHash": "", "ipfsCid": ""}
+    return gemini_retries_exhausted_result()
+
+
+# --- CONFIDENCE-GATED VERIFICATION CASCADE ---
+
+def run_local_cascade_tiers(bert_confidence, bert_verdict, trusted_source, stats_check, stages_run):
+    """Tiers 1-2 (no external calls). Returns (analysis_result, cascade_info) if one is decisive, else None."""
+    local_decisive = bert_confidence >= CASCADE_LOCAL_TRUE_THRESHOLD or bert_confidence <= CASCADE_LOCAL_FALSE_THRESHOLD
+    if CASCADE_ENABLED and local_decisive and trusted_source:
+        summary_text = f"Local classifier was decisive ({bert_confidence:.2f}) on a known trusted source. External AI analysis was skipped."
+        analysis_result = {"verdict": bert_verdict, "confidence": float(bert_confidence), "summary": summary_text, "evidence": [], "txHash": f"0x{random.getrandbits(256):064x}", "ipfsCid": f"Qm{random.getrandbits(16):x}b20399d82a17f22384a6217462a69074b1"}
+        return attach_statistics(analysis_result, stats_check), {"decided_by": "local_model", "stages_run": stages_run}
+
+    if stats_check and stats_check['checked']:
+        stages_run.append('statistics')
+        stats_verdict = statistics_verdict(stats_check)
+        if CASCADE_ENABLED and stats_verdict:
+            return attach_statistics(build_statistics_result(stats_check, stats_verdict), stats_check), {"decided_by": "statistics", "stages_run": stages_run}
+    return None
+
+
+def run_fact_check_tier(fact_check_result, fact_check_confidence, stats_check, stages_run):
+    """Tier 3 decision on an already-fetched Fact Check result. Returns (analysis_result, cascade_info) if decisive, else None."""
+    if CASCADE_ENABLED and fact_check_confidence >= CASCADE_FACT_CHECK_THRESHOLD:
+        return attach_statistics(build_fact_check_result(fact_check_result, fact_check_confidence), stats_check), {"decided_by": "fact_check", "stages_run": stages_run}
+    stages_run.append('gemini')
+    return None
+
+
+def finish_cascade(fact_check_result, fact_check_confidence, analysis_result, stats_check, stages_run):
+    """Tier 4 bookkeeping once the Gemini analysis is back. Returns (analysis_result, cascade_info)."""
+    # analyze_text_for_fake_news still short-circuits on a definitive fact check when the cascade is disabled
+    decided_by = "fact_check" if fact_check_confidence > 0.9 else "gemini"
+    return attach_statistics(analysis_result, stats_check), {"decided_by": decided_by, "stages_run": stages_run}
+
+def run_verification_cascade(text, bert_confidence, bert_verdict, external_rep_score, external_rep_tag, headline=None, trusted_source=False):
+    """
+    Runs the verification stages cheapest first and stops at the first decisive one:
+      1. local_model  - local classifier on a CASCADE_TRUSTED_DOMAINS domain (no external calls)
+      2. statistics   - numeric COVID-19 claims looked up in the local store (no external calls)
+      3. fact_check   - gemini-2.5-flash claim extraction + Google Fact Check API
+      4. gemini       - gemini-2.5-pro with Google Search
+    Returns (analysis_result, cascade_info); cascade_info records which tier decided the verdict.
+    Statistical checks are attached as evidence whichever tier decides.
+    trusted_source comes from is_trusted_source(url); tiers 1-2 run before any Gemini call.
+    """
+    stages_run = ['local_model']
+    stats_check = check_statistical_claims(text)
+
+    decided = run_local_cascade_tiers(bert_confidence, bert_verdict, trusted_source, stats_check, stages_run)
+    if decided: return decided
+
+    stages_run.append('fact_check')
+    primary_claim = extract_primary_claim(text)
+    fact_check_result, fact_check_confidence = check_google_fact_check(primary_claim)
+    decided = run_fact_check_tier(fact_check_result, fact_check_confidence, stats_check, stages_run)
+    if decided: return decided
+
+    analysis_result = analyze_text_for_fake_news(
+        text,
+        external_rep_score=external_rep_score,
+        external_rep_tag=external_rep_tag,
+        fact_check_result=fact_check_result,
+        fact_check_confidence=fact_check_confidence,
+        primary_claim=primary_claim,
+        headline=headline
+    )
+    return finish_cascade(fact_check_result, fact_check_confidence, analysis_result, stats_check, stages_run)
+
+
+# ----------------------------------------------------------------------
+# --- SIMILAR PAST VERDICTS (EMBEDDING INDEX) ---
+# ----------------------------------------------------------------------
+
+def embed_text(*segments):
+    """Pooled embedding of the same input the classifier sees (title + sep + content)."""
+    return get_base_embedding(build_model_input_ids(*[get_document_encoding(segment) for segment in segments]))
+
+def index_article_embedding(url, title, content, source_name, analysis_result):
+    """Adds (or refreshes) an analyzed article in the vector index; usually a cache hit on the classifier's pass."""
+    if VECTOR_INDEX is None or not content: return
+    try:
+        VECTOR_INDEX.add(content_hash(url), embed_text(title, content), {
+            "url": url[:500], "title": title, "source_name": source_name,
+            "verdict": analysis_result.get('verdict'), "confidence": float(analysis_result.get('confidence') or 0.0),
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+    except Exception as e: print(f"Vector index update failed: {e}")
+
+
+# ----------------------------------------------------------------------
+# --- READ-ONLY RESPONSE CACHE (ETAGS + CONDITIONAL GET) ---
+# ----------------------------------------------------------------------
+
+class CollectionVersions:
+    """
+    Write version per Mongo collection, kept in the `collection_versions` collection so every
+    worker sees the same numbers. Reads are cached for COLLECTION_VERSION_TTL_SECONDS; this
+    process's own writes are visible immediately.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached and cached[1] > now: return cached[0]
+        version = 0
+        if db is not None:
+            try:
+                doc = db.collection_versions.find_one({"_id": name})
+                version = doc.get('version', 0) if doc else 0
+            except Exception: pass
+        with self._lock: self._cache[name] = (version, now + self.ttl)
+        return version
+
+    def bump(self, name):
+        version = None
+        if db is not None:
+            try:
+                doc = db.collection_versions.find_one_and_update({"_id": name}, {"$inc": {"version": 1}}, upsert=True, return_document=ReturnDocument.AFTER)
+                version = doc['version']
+            except Exception: pass
+        with self._lock:
+            if version is not None: self._cache[name] = (version, time.monotonic() + self.ttl)
+            else: self._cache.pop(name, None)
+        RESPONSE_CACHE.invalidate(name)
+
+
+class ResponseCache:
+    """Short-lived LRU of rendered GET responses (plain + gzip body), tagged with the collection versions they were built from."""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def get(self, key, versions):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires'] < time.monotonic() or entry['versions'] != versions:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection):
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if collection in entry['collections']]:
+                del self._entries[key]
+
+
+RESPONSE_CACHE = ResponseCache(RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES)
+COLLECTION_VERSIONS = CollectionVersions(COLLECTION_VERSION_TTL_SECONDS)
+
+
+def _cached_response(entry, etag, use_gzip, cache_status):
+    body = entry['gzip_body'] if use_gzip else entry['body']
+    response = app.response_class(body, status=entry['status'], mimetype=entry['mimetype'])
+    if use_gzip: response.headers['Content-Encoding'] = 'gzip'
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache' # always revalidate; a matching ETag costs a 304
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['X-Cache'] = cache_status
+    return response
+
+
+def conditional_get(*collections):
+    """
+    Caches a read-only GET endpoint. The strong ETag is derived from the request path and the
+    write versions of `collections`, so If-None-Match is answered with a 304 before the view (and
+    its Mongo queries) runs. Bodies are cached for RESPONSE_CACHE_TTL_SECONDS and gzip-compressed once.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = tuple(COLLECTION_VERSIONS.get(name) for name in collections)
+            cache_key = request.full_path
+            base_etag = hashlib.sha1(f"{cache_key}|{versions}".encode('utf-8')).hexdigest()[:24]
+            use_gzip = request.accept_encodings['gzip'] > 0
+            etags = {False: f'"{base_etag}"', True: f'"{base_etag}-gz"'} # distinct strong tags per encoding
+
+            if request.if_none_match.contains(base_etag) or request.if_none_match.contains(f"{base_etag}-gz"):
+                RESPONSE_CACHE.stats["not_modified"] += 1
+                response = app.response_class(status=304)
+                response.headers.update({'ETag': etags[use_gzip], 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'})
+                return response
+
+            entry = RESPONSE_CACHE.get(cache_key, versions)
+            cache_status = 'HIT'
+            if entry is None:
+                cache_status = 'MISS'
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code >= 500: return response # never cache failures
+                body = response.get_data()
+                entry = {
+                    "versions": versions, "collections": collections, "status": response.status_code,
+                    "mimetype": response.mimetype, "body": body, "expires": time.monotonic() + RESPONSE_CACHE_TTL_SECONDS,
+                    "gzip_body": gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None,
+                }
+                RESPONSE_CACHE.put(cache_key, entry)
+            use_gzip = use_gzip and entry['gzip_body'] is not None
+            return _cached_response(entry, etags[use_gzip], use_gzip, cache_status)
+        return wrapper
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# --- ADMISSION CONTROL (CONCURRENCY BUDGETS + PRIORITY QUEUES) ---
+# ----------------------------------------------------------------------
+
+class AdmissionRejected(Exception):
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _LoopEvent:
+    """threading.Event stand-in for a coroutine waiter: set() may be called from any thread."""
+    __slots__ = ('loop', 'future')
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+
+    def _resolve(self):
+        if not self.future.done(): self.future.set_result(None)
+
+    def set(self):
+        self.loop.call_soon_threadsafe(self._resolve)
+
+    async def wait(self, timeout):
+        try: await asyncio.wait_for(asyncio.shield(self.future), timeout)
+        except asyncio.TimeoutError: pass
+
+
+class _Waiter:
+    __slots__ = ('endpoint', 'limit', 'event', 'outcome')
+
+    def __init__(self, endpoint, limit, event):
+        self.endpoint = endpoint
+        self.limit = limit
+        self.event = event
+        self.outcome = None # 'granted' | 'shed'
+
+
+class AdmissionGate:
+    """
+    At most `max_active` requests run inside the gate (and at most the per-endpoint limit of any one
+    endpoint); up to `max_queue` more wait, served by priority class and then arrival order. A
+    request is refused with 429 when the queue is full of equal or higher priority work, and with
+    503 when it waited `max_wait` seconds or was shed for a higher-priority arrival. Retry-After is
+    estimated from the queue length and a moving average of the service time.
+    Threads wait with acquire(), coroutines with acquire_async(); both share the same budget and queue.
+    """
+
+    def __init__(self, name, max_active, max_queue, max_wait):
+        self.name = name
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._active = 0
+        self._active_by_endpoint = {}
+        self._waiters = [] # heap of (priority, seq, waiter)
+        self._seq = 0
+        self._service_seconds = None # exponentially weighted moving average
+        self.stats = {}
+
+    def _endpoint_stats(self, endpoint):
+        return self.stats.setdefault(endpoint, {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "shed": 0})
+
+    def _can_run(self, endpoint, limit):
+        return self._active < self.max_active and (limit is None or self._active_by_endpoint.get(endpoint, 0) < limit)
+
+    def _start(self, endpoint):
+        self._active += 1
+        self._active_by_endpoint[endpoint] = self._active_by_endpoint.get(endpoint, 0) + 1
+        self._endpoint_stats(endpoint)["admitted"] += 1
+
+    def _dispatch(self):
+        """Starts every queued request that now fits, best priority first."""
+        blocked = []
+        while self._waiters and self._active < self.max_active:
+            entry = heapq.heappop(self._waiters)
+            waiter = entry[2]
+            if not self._can_run(waiter.endpoint, waiter.limit): blocked.append(entry); continue
+            self._start(waiter.endpoint)
+            waiter.outcome = 'granted'
+            waiter.event.set()
+        for entry in blocked: heapq.heappush(self._waiters, entry)
+
+    def _retry_after(self):
+        service = self._service_seconds or 1.0
+        estimate = service * (len(self._waiters) + 1) / max(1, self.max_active)
+        return int(min(ADMISSION_MAX_RETRY_AFTER_SECONDS, max(1, math.ceil(estimate))))
+
+    def _enqueue(self, endpoint, priority, limit, make_event):
+        """Admits immediately (returns (start time, None)), queues (returns (None, waiter)) or raises AdmissionRejected."""
+        with self._lock:
+            if self._can_run(endpoint, limit):
+                self._start(endpoint)
+                return time.perf_counter(), None
+
+            stats = self._endpoint_stats(endpoint)
+            if len(self._waiters) >= self.max_queue:
+                worst = max(self._waiters) if self._waiters else None
+                if worst is None or worst[0] <= priority:
+                    stats["rejected_queue_full"] += 1
+                    raise AdmissionRejected(429, f"{self.name} queue is full", self._retry_after())
+                self._waiters.remove(worst)
+                heapq.heapify(self._waiters)
+                self._endpoint_stats(worst[2].endpoint)["shed"] += 1
+                worst[2].outcome = 'shed'
+                worst[2].event.set()
+
+            waiter = _Waiter(endpoint, limit, make_event())
+            self._seq += 1
+            heapq.heappush(self._waiters, (priority, self._seq, waiter))
+            stats["queued"] += 1
+            return None, waiter
+
+    def _remove_waiter(self, waiter):
+        self._waiters = [entry for entry in self._waiters if entry[2] is not waiter]
+        heapq.heapify(self._waiters)
+
+    def _finish_wait(self, waiter):
+        with self._lock:
+            if waiter.outcome == 'granted': return time.perf_counter()
+            if waiter.outcome == 'shed':
+                raise AdmissionRejected(503, f"{self.name} queue shed this request for higher-priority work", self._retry_after())
+            self._remove_waiter(waiter)
+            self._endpoint_stats(waiter.endpoint)["rejected_timeout"] += 1
+            raise AdmissionRejected(503, f"{self.name} queue wait exceeded {self.max_wait:g}s", self._retry_after())
+
+    def acquire(self, endpoint, priority, limit=None):
+        """Blocks until admitted (returns the start time for release) or raises AdmissionRejected."""
+        started, waiter = self._enqueue(endpoint, priority, limit, threading.Event)
+        if waiter is None: return started
+        waiter.event.wait(self.max_wait)
+        return self._finish_wait(waiter)
+
+    async def acquire_async(self, endpoint, priority, limit=None):
+        """acquire() for coroutines: waits without blocking the event loop."""
+        started, waiter = self._enqueue(endpoint, priority, limit, _LoopEvent)
+        if waiter is None: return started
+        try: await waiter.event.wait(self.max_wait)
+        except asyncio.CancelledError:
+            # Client went away while queued: give back a slot granted in the meantime, else leave the queue
+            with self._lock:
+                if waiter.outcome == 'granted':
+                    self._active -= 1
+                    self._active_by_endpoint[endpoint] -= 1
+                    self._dispatch()
+                else: self._remove_waiter(waiter)
+            raise
+        return self._finish_wait(waiter)
+
+    def release(self, endpoint, started):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._active -= 1
+            self._active_by_endpoint[endpoint] -= 1
+            self._service_seconds = elapsed if self._service_seconds is None else 0.8 * self._service_seconds + 0.2 * elapsed
+            self._dispatch()
+
+    def snapshot(self):
+        with self._lock:
+            queued_by_endpoint = {}
+            for _, _, waiter in self._waiters: queued_by_endpoint[waiter.endpoint] = queued_by_endpoint.get(waiter.endpoint, 0) + 1
+            return {
+                "active": self._active, "queue_depth": len(self._waiters),
+                "max_active": self.max_active, "max_queue": self.max_queue, "max_wait_seconds": self.max_wait,
+                "avg_service_ms": round(self._service_seconds * 1000, 1) if self._service_seconds is not None else None,
+                "endpoints": {
+                    endpoint: {**counts, "active": self._active_by_endpoint.get(endpoint, 0), "waiting": queued_by_endpoint.get(endpoint, 0)}
+                    for endpoint, counts in self.stats.items()
+                },
+            }
+
+
+ADMISSION_GATES = {
+    "analysis": AdmissionGate("analysis", ADMISSION_ANALYSIS_CONCURRENCY, ADMISSION_ANALYSIS_QUEUE, ADMISSION_ANALYSIS_MAX_WAIT_SECONDS),
+    "lookup": AdmissionGate("lookup", ADMISSION_LOOKUP_CONCURRENCY, ADMISSION_LOOKUP_QUEUE, ADMISSION_LOOKUP_MAX_WAIT_SECONDS),
+}
+# Reading the digest snapshot is a lookup; only the inline-refresh mode runs the pipeline inside the request
+DAILY_NEWS_ADMISSION = ('lookup', PRIORITY_LOOKUP, None) if DAILY_NEWS_SCHEDULER_ENABLED else ('analysis', PRIORITY_DEFERRABLE, 1)
+
+
+def admission_rejection_body(rejection):
+    return {"error": f"Server is busy ({rejection.reason}). Please retry in {rejection.retry_after} seconds.", "retry_after": rejection.retry_after}
+
+
+def admission_control(gate_name, priority, max_active=None):
+    """Runs the view inside a gate's budget (`max_active` caps this endpoint alone); refusals are immediate JSON 429/503s."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not ADMISSION_ENABLED: return view(*args, **kwargs)
+            gate = ADMISSION_GATES[gate_name]
+            try: started = gate.acquire(view.__name__, priority, max_active)
+            except AdmissionRejected as e:
+                response = jsonify(admission_rejection_body(e))
+                response.status_code = e.status
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+            try: return view(*args, **kwargs)
+            finally: gate.release(view.__name__, started)
+        return wrapper
+    return decorator
 
 
 # ----------------------------------------------------------------------
@@ -277,15 +1279,19 @@ def analyze_text_for_fake_news(text, external_rep_score=0.5, external_rep_tag="N
 # ----------------------------------------------------------------------
 
 def save_article_analysis(url, title, content, source_name, analysis_result):
+    index_article_embedding(url, title, content, source_name, analysis_result)
     if db is None: return
     article_doc = {
         "url": url, "title": title, "full_content": content, "source_name": source_name,
         "timestamp": datetime.utcnow(), "verdict": analysis_result.get('verdict'),
         "confidence": analysis_result.get('confidence'), "txHash": analysis_result.get('txHash'),
         "ipfsCid": analysis_result.get('ipfsCid'), "gemini_summary": analysis_result.get('summary'),
-        "evidence": analysis_result.get('evidence', [])
+        "evidence": analysis_result.get('evidence', []), "prompt_stats": analysis_result.get('prompt_stats'),
+        "cascade": analysis_result.get('cascade'), "statistics": analysis_result.get('statistics')
     }
-    try: db.articles.update_one({"url": url}, {"$set": article_doc}, upsert=True)
+    try:
+        db.articles.update_one({"url": url}, {"$set": article_doc}, upsert=True)
+        COLLECTION_VERSIONS.bump('articles')
     except Exception: pass
 
 def save_or_update_source(source_url, verdict, confidence):
@@ -311,6 +1317,7 @@ def save_or_update_source(source_url, verdict, confidence):
                 "domain": clean_domain, "credibility_score": 0.5 + impact, "category": "unclassified", 
                 "first_seen": datetime.utcnow(), "last_updated": datetime.utcnow()
             })
+        COLLECTION_VERSIONS.bump('sources')
     except Exception: pass
 
 def get_verification_analytics():
@@ -383,22 +1390,52 @@ def get_verification_analytics():
     # Note: the output structure already matches the interface: [{'_id': 'source', 'total_analyses': 5}]
 
 
-    # 4. CONSTRUCT FINAL RESPONSE
+    # 4. CASCADE TIER DISTRIBUTION (which stage decided each verdict; cost vs accuracy tuning)
+    cascade_tiers_pipeline = [
+        {"$match": {"cascade.decided_by": {"$exists": True}}},
+        {"$group": {"_id": "$cascade.decided_by", "count": {"$sum": 1}, "avg_confidence": {"$avg": "$confidence"}}},
+        {"$sort": {"count": -1}}
+    ]
+    cascade_tiers_list = list(db.articles.aggregate(cascade_tiers_pipeline))
+
+    # 5. CONSTRUCT FINAL RESPONSE
     return {
         "success": True,
         "total_metrics": metrics,
         "verdict_distribution": verdict_distribution_list,
-        "top_analyzed_sources": top_analyzed_sources_list
+        "top_analyzed_sources": top_analyzed_sources_list,
+        "cascade_tiers": cascade_tiers_list
     }
 
+SCRAPE_HEADERS = {'User-Agent': 'FakeNewsDetector/1.0'}
+
 def extract_article_text_from_url(url):
-    """Fetches a URL and extracts the main article text using content density heuristics."""
+    """Fetches a URL and extracts the main article text using content density heuristics, as (text, success, title)."""
     try:
-        headers = {'User-Agent': 'FakeNewsDetector/1.0'}
-        response = requests.get(url, headers=headers, timeout=15)
+        response = requests.get(url, headers=SCRAPE_HEADERS, timeout=15)
         response.raise_for_status() 
+        return parse_article_html(response.content)
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+    except requests.RequestException as e:
+        return f"Error fetching URL: {e}. Check if the link is correct or the site blocks scraping.", False, None
+    except Exception as e:
+        return f"An unexpected error occurred during scraping: {e}", False, None
+
+
+def parse_article_title(soup):
+    """The page's headline: og:title, else the first <h1>, else <title>; None if the page has none."""
+    og_title = soup.find('meta', attrs={'property': 'og:title'})
+    candidates = [og_title.get('content') if og_title else None, soup.h1.get_text() if soup.h1 else None, soup.title.string if soup.title else None]
+    for candidate in candidates:
+        if candidate and candidate.strip(): return ' '.join(candidate.split())[:300]
+    return None
+
+
+def parse_article_html(html):
+    """Main article text and headline from a fetched page, as (text, success, title)."""
+    try:
+        soup = BeautifulSoup(html, 'html.parser')
+        title = parse_article_title(soup)
         article_tag = soup.find('article') or soup.find(itemprop="articleBody") or soup.find(id='content')
 
         if article_tag:
@@ -426,70 +1463,20 @@ def extract_article_text_from_url(url):
         article_text = ' '.join(article_text.split())[:15000]
 
         if not article_text or len(article_text) < 50:
-            return "Error: Could not extract sufficient meaningful text from the URL.", True
+            return "Error: Could not extract sufficient meaningful text from the URL.", True, title
         
-        return article_text, True
+        return article_text, True, title
 
-    except requests.RequestException as e:
-        return f"Error fetching URL: {e}. Check if the link is correct or the site blocks scraping.", False
     except Exception as e:
-        return f"An unexpected error occurred during scraping: {e}", False
+        return f"An unexpected error occurred during scraping: {e}", False, None
 
 
 # ----------------------------------------------------------------------
-# --- API ENDPOINTS ---
+# --- FUSION & NEWS FEED HELPERS (shared with async_app.py) ---
 # ----------------------------------------------------------------------
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze_input():
-    """ENDPOINT 1: Runs the full hybrid analysis (Local Model + Gemini Pipeline + AI Detection)."""
-    data = request.get_json()
-    input_value = data.get('input_value', '').strip()
-    input_type = data.get('input_type') 
-    
-    if not input_value: return jsonify({"error": "No text or URL provided."}), 400
-
-    # --- Prepare content & variables ---
-    article_url = input_value 
-    article_title = f"User Input - {input_value[:50]}..."
-    source_name = "User Submitted"
-    article_text = input_value
-
-    if input_type == 'url':
-        article_text, success = extract_article_text_from_url(input_value)
-        if not success or article_text.startswith("Error:"): return jsonify({"error": article_text}), 500
-        try:
-             source_name = urllib.parse.urlparse(input_value).netloc
-             article_title = article_text[:100].strip().replace('\n', ' ') + "..."
-        except Exception: pass
-        external_rep_score, external_rep_tag = get_external_domain_reputation(input_value)
-    
-    elif input_type == 'text':
-        article_text = input_value
-        external_rep_score, external_rep_tag = 0.5, "RAW_TEXT_INPUT"
-    
-    else: return jsonify({"error": "Invalid input_type. Must be 'text' or 'url'."}), 400
-
-    # --- CORE HYBRID PIPELINE EXECUTION ---
-    
-    # 1. Local Classifier and AI Detector
-    bert_confidence, bert_verdict = predict_local_model_confidence(article_title, article_text, source_name)
-    ai_probability = predict_ai_generation_probability(article_text)
-    ai_detected = ai_probability > 0.7 
-    
-    # 2. Gemini Pipeline Pre-Checks
-    primary_claim = extract_primary_claim(article_text)
-    fact_check_result, fact_check_confidence = check_google_fact_check(primary_claim)
-
-    # 3. Run Gemini Analysis (passes ALL context)
-    gemini_analysis = analyze_text_for_fake_news(
-        article_text, 
-        external_rep_score=external_rep_score, 
-        external_rep_tag=external_rep_tag,
-        fact_check_result=fact_check_result,
-        fact_check_confidence=fact_check_confidence
-    )
-    
+def fuse_analysis(bert_confidence, ai_probability, gemini_analysis, cascade_info):
+    """ENDPOINT 1 fusion: returns (final_verdict, final_confidence_adjusted, fused_analysis_result)."""
     gemini_confidence = gemini_analysis.get('confidence', 0.5)
     
     # 4. Fusion and Penalty Calculation
@@ -527,29 +1514,31 @@ def analyze_input():
         "verdict": final_verdict,
         "confidence": float(final_confidence_adjusted),
         "summary": f"FUSED: {final_verdict.upper()} (Conf. adjusted from {fused_confidence_raw:.2f} due to AI Prob: {float(ai_probability):.2f}). Gemini Summary: {gemini_summary_text}",
+        "cascade": cascade_info,
     }
+    return final_verdict, final_confidence_adjusted, fused_analysis_result
 
-    save_article_analysis(url=article_url, title=article_title, content=article_text, 
-                          source_name=source_name, analysis_result=fused_analysis_result)
-    save_or_update_source(article_url, final_verdict, final_confidence_adjusted)
 
-    return jsonify({
+def build_analyze_response(final_verdict, final_confidence_adjusted, bert_confidence, bert_verdict, ai_probability, gemini_analysis, cascade_info):
+    gemini_confidence = gemini_analysis.get('confidence', 0.5)
+    gemini_summary_text = gemini_analysis.get('summary', 'Gemini analysis summary not available.')
+    return {
         "status": "FUSED_ANALYSIS_COMPLETE",
         "final_verdict": final_verdict,
         "final_confidence": round(float(final_confidence_adjusted), 4),
         "fused_components": {
-            "ai_synthesis_detected": ai_detected,
+            "ai_synthesis_detected": ai_probability > 0.7,
             "ai_probability": round(float(ai_probability), 4),
             "local_model": {"verdict": bert_verdict, "confidence": round(float(bert_confidence), 4)},
-            "gemini_pipeline": {"verdict": gemini_analysis.get('verdict', 'mixed'), "confidence": round(float(gemini_confidence), 4), "summary": gemini_summary_text}
+            "gemini_pipeline": {"verdict": gemini_analysis.get('verdict', 'mixed'), "confidence": round(float(gemini_confidence), 4), "summary": gemini_summary_text},
+            "cascade": cascade_info,
+            "statistics": gemini_analysis.get('statistics')
         }
-    })
-
+    }
 
-@app.route('/api/daily-news', methods=['GET'])
-def get_daily_news():
-    """ENDPOINT 2: Fetches and analyzes fresh headlines using the full pipeline."""
 
+def news_service_request():
+    """Returns ((api_url, params, content_key), None), or (None, (error_body, status)) when misconfigured."""
     if ACTIVE_NEWS_SERVICE == 'newsapi':
         api_url = NEWSAPI_ENDPOINT
         api_key = NEWS_API_KEY_NEWSAPI
@@ -560,84 +1549,320 @@ def get_daily_news():
         api_key = NEWS_API_KEY_NEWSDATA
         params = {'country': 'us', 'language': 'en', 'size': 5, 'apikey': api_key}
         content_key = 'content' 
-    else: return jsonify({"error": "Invalid ACTIVE_NEWS_SERVICE configuration."}), 500
+    else: return None, ({"error": "Invalid ACTIVE_NEWS_SERVICE configuration."}, 500)
     
-    if not api_key: return jsonify({"error": f"API Key for {ACTIVE_NEWS_SERVICE} is missing. Check your .env file."}), 500
+    if not api_key: return None, ({"error": f"API Key for {ACTIVE_NEWS_SERVICE} is missing. Check your .env file."}, 500)
+    return (api_url, params, content_key), None
+
+
+def news_articles_from_response(news_data):
+    return news_data.get('articles', []) if ACTIVE_NEWS_SERVICE == 'newsapi' else news_data.get('results', [])
+
+
+def news_article_fields(article, content_key):
+    title = article.get('title', 'No Title')
+    url = article.get('url', '#')
+    content = article.get(content_key) or article.get('description') or title
+    if ACTIVE_NEWS_SERVICE == 'newsapi': source_name = article.get('source', {}).get('name', 'N/A')
+    else: source_name = article.get('source_id', 'N/A')
+    return title, url, content, source_name
+
+
+def fuse_news_item(bert_confidence, ai_probability, gemini_analysis, cascade_info):
+    """ENDPOINT 2 fusion (simpler thresholds than ENDPOINT 1): returns (final_verdict, final_confidence_adjusted, fused_analysis_result)."""
+    gemini_confidence = gemini_analysis.get('confidence', 0.5)
+    
+    # 4. Fusion and Penalty Calculation
+    fused_confidence_raw = (float(bert_confidence) * 0.6) + (float(gemini_confidence) * 0.4)
+    final_confidence_adjusted = fused_confidence_raw * (1.0 - float(ai_probability))
+
+    if final_confidence_adjusted < 0.3: final_verdict = "false"
+    elif final_confidence_adjusted > 0.7: final_verdict = "true"
+    else: final_verdict = "mixed"
+
+    fused_analysis_result = {
+        **gemini_analysis, 'verdict': final_verdict, 'confidence': final_confidence_adjusted,
+        'summary': f"FUSED: {final_verdict.upper()} (AI Penalty: {ai_probability:.2f}). Gemini Summary: {gemini_analysis.get('summary', 'N/A')}",
+        'cascade': cascade_info,
+    }
+    return final_verdict, final_confidence_adjusted, fused_analysis_result
+
+
+def news_item_response(title, url, source_name, final_verdict, final_confidence_adjusted, fused_analysis_result, cascade_info):
+    return {
+        "title": title, "url": url, "source": source_name, "verdict": final_verdict,
+        "confidence": float(final_confidence_adjusted), "summary": fused_analysis_result['summary'],
+        "decided_by": cascade_info['decided_by']
+    }
+
+
+# ----------------------------------------------------------------------
+# --- DAILY NEWS DIGEST (BACKGROUND REFRESH + SNAPSHOT) ---
+# ----------------------------------------------------------------------
+
+try: import fcntl # POSIX only; the Windows dev server is a single process and needs no lock
+except ImportError: fcntl = None
+
+
+def analyze_news_article(title, url, content, source_name):
+    """Runs the full pipeline on one headline, saves it and returns its digest item."""
+    external_rep_score, external_rep_tag = get_external_domain_reputation(url)
+
+    # 1. Local Classifier and AI Detector
+    bert_confidence, bert_verdict = predict_local_model_confidence(title, content, url)
+    ai_probability = predict_ai_generation_probability(content)
+
+    # 2 + 3. Confidence-gated cascade (Fact Check pre-checks, then Gemini Analysis if undecided)
+    gemini_analysis, cascade_info = run_verification_cascade(
+        content,
+        bert_confidence, bert_verdict,
+        external_rep_score, external_rep_tag,
+        headline=title,
+        trusted_source=is_trusted_source(url)
+    )
+
+    # 4. Fusion and Penalty Calculation
+    final_verdict, final_confidence_adjusted, fused_analysis_result = fuse_news_item(bert_confidence, ai_probability, gemini_analysis, cascade_info)
+
+    # 5. Save
+    save_article_analysis(url=url, title=title, content=content, source_name=source_name, analysis_result=fused_analysis_result)
+    save_or_update_source(source_url=url, verdict=final_verdict, confidence=final_confidence_adjusted)
+    return news_item_response(title, url, source_name, final_verdict, final_confidence_adjusted, fused_analysis_result, cascade_info)
+
+
+def saved_news_items(urls):
+    """Digest items for headlines already analyzed and stored in MongoDB, by URL."""
+    if db is None or not urls: return {}
+    try: docs = db.articles.find({"url": {"$in": list(urls)}, "verdict": {"$ne": None}})
+    except Exception: return {}
+    return {
+        doc['url']: news_item_response(
+            doc.get('title'), doc['url'], doc.get('source_name'), doc['verdict'], float(doc.get('confidence') or 0.0),
+            {"summary": doc.get('gemini_summary')}, {"decided_by": (doc.get('cascade') or {}).get('decided_by', 'gemini')}
+        )
+        for doc in docs
+    }
+
+
+class DailyNewsDigest:
+    """
+    Latest analyzed headlines, kept as a JSON snapshot on disk. A refresh only runs the pipeline on
+    headlines whose URL is in neither the previous snapshot nor MongoDB, then replaces the file with
+    os.replace, so readers in every worker see either the old or the new digest, never a partial one.
+    With several gunicorn workers only the one holding the refresher lock runs the pipeline.
+    """
+
+    def __init__(self, snapshot_path, interval, retry_interval):
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self._snapshot = None
+        self._snapshot_stamp = None
+        self._read_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._lock_fd = None
+        self._thread_pid = None
+
+    # --- snapshot storage ---
+    def current(self):
+        """The newest snapshot (reloaded when another worker replaced the file), or None."""
+        try: stat = os.stat(self.snapshot_path)
+        except FileNotFoundError: return self._snapshot
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        with self._read_lock:
+            if stamp != self._snapshot_stamp:
+                try:
+                    with open(self.snapshot_path, 'r', encoding='utf-8') as f: self._snapshot = json.load(f)
+                    self._snapshot_stamp = stamp
+                except (OSError, ValueError): pass # mid-replace on a non-atomic filesystem; keep the old one
+            return self._snapshot
+
+    def _swap(self, snapshot):
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
+        with self._read_lock: self._snapshot = snapshot
+
+    @staticmethod
+    def age(snapshot):
+        return max(0.0, time.time() - snapshot['generated_at'])
+
+    def is_stale(self, snapshot):
+        return snapshot is None or snapshot.get('error') is not None or self.age(snapshot) >= self.interval
+
+    # --- refresh ---
+    def refresh(self):
+        """Fetches the headlines and analyzes the unseen ones. Returns True if a good snapshot was stored."""
+        with self._refresh_lock:
+            started = time.perf_counter()
+            previous = self.current()
+            if not self.is_stale(previous): return True # another request refreshed it while we waited for the lock
+            try: snapshot = self._build_snapshot(previous)
+            except requests.RequestException as e:
+                snapshot = {"error": f"Failed to connect to News API ({ACTIVE_NEWS_SERVICE}): {e}", "status": 500}
+            except Exception as e:
+                snapshot = {"error": f"An unexpected error occurred during news processing: {e}", "status": 500}
+
+            if snapshot.get('error') is not None:
+                print(f"Daily news refresh failed: {snapshot['error']}")
+                if previous and previous.get('articles'): return False # keep serving the last good digest
+                self._swap({**snapshot, "generated_at": time.time(), "articles": []})
+                return False
+
+            snapshot['refresh_seconds'] = round(time.perf_counter() - started, 2)
+            self._swap(snapshot)
+            print(f"Daily news digest refreshed: {snapshot['analyzed']} analyzed, {snapshot['reused']} reused in {snapshot['refresh_seconds']}s.")
+            return True
+
+    def _build_snapshot(self, previous):
+        news_request, error = news_service_request()
+        if error: return {"error": error[0]['error'], "status": error[1]}
+        api_url, params, content_key = news_request
 
-    try:
         response = requests.get(api_url, params=params, timeout=10)
-        response.raise_for_status() 
-        news_data = response.json()
-        
-        articles_list = news_data.get('articles', []) if ACTIVE_NEWS_SERVICE == 'newsapi' else news_data.get('results', [])
-        processed_articles = []
-        
-        for article in articles_list:
-            title = article.get('title', 'No Title')
-            url = article.get('url', '#')
-            content = article.get(content_key) or article.get('description') or title
-            
-            if processed_articles:
+        response.raise_for_status()
+        headlines = [news_article_fields(article, content_key) for article in news_articles_from_response(response.json())]
+
+        known = {item['url']: item for item in (previous or {}).get('articles', [])}
+        known.update(saved_news_items({url for _, url, _, _ in headlines if url not in known}))
+
+        articles, analyzed = [], 0
+        for title, url, content, source_name in headlines:
+            if url in known:
+                articles.append(known[url])
+                continue
+            if analyzed:
                 print(f"Pausing for {ANALYSIS_DELAY_SECONDS} seconds between headlines...")
-                time.sleep(ANALYSIS_DELAY_SECONDS) 
-            
-            # --- Multi-Source Pipeline Execution ---
-            external_rep_score, external_rep_tag = get_external_domain_reputation(url)
-            
-            # 1. Local Classifier and AI Detector
-            bert_confidence, bert_verdict = predict_local_model_confidence(title, content, url)
-            ai_probability = predict_ai_generation_probability(content)
-            ai_detected = ai_probability > 0.7 
-            
-            # 2. Gemini Pipeline Pre-Checks
-            primary_claim = extract_primary_claim(content)
-            fact_check_result, fact_check_confidence = check_google_fact_check(primary_claim)
-            
-            # 3. Run Gemini Analysis
-            gemini_analysis = analyze_text_for_fake_news(
-                content,
-                external_rep_score=external_rep_score,
-                external_rep_tag=external_rep_tag,
-                fact_check_result=fact_check_result,
-                fact_check_confidence=fact_check_confidence
-            )
-            
-            gemini_confidence = gemini_analysis.get('confidence', 0.5)
-            
-            # 4. Fusion and Penalty Calculation
-            fused_confidence_raw = (float(bert_confidence) * 0.6) + (float(gemini_confidence) * 0.4)
-            final_confidence_adjusted = fused_confidence_raw * (1.0 - float(ai_probability))
-
-            if final_confidence_adjusted < 0.3: final_verdict = "false"
-            elif final_confidence_adjusted > 0.7: final_verdict = "true"
-            else: final_verdict = "mixed"
-
-            # 5. Save and Append
-            fused_analysis_result = {
-                **gemini_analysis, 'verdict': final_verdict, 'confidence': final_confidence_adjusted,
-                'summary': f"FUSED: {final_verdict.upper()} (AI Penalty: {ai_probability:.2f}). Gemini Summary: {gemini_analysis.get('summary', 'N/A')}",
-            }
+                time.sleep(ANALYSIS_DELAY_SECONDS)
+            articles.append(analyze_news_article(title, url, content, source_name))
+            analyzed += 1
+        return {"generated_at": time.time(), "articles": articles, "analyzed": analyzed, "reused": len(articles) - analyzed}
+
+    # --- scheduler ---
+    def _acquire_refresher_lock(self):
+        """Non-blocking, process-wide lock so a single worker runs the refreshes (released when it exits)."""
+        if fcntl is None or self._lock_fd is not None: return True
+        fd = os.open(self.snapshot_path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
 
-            if ACTIVE_NEWS_SERVICE == 'newsapi': source_name = article.get('source', {}).get('name', 'N/A')
-            else: source_name = article.get('source_id', 'N/A')
+    def _run(self):
+        while True:
+            delay = self.interval
+            if self._acquire_refresher_lock():
+                snapshot = self.current()
+                if self.is_stale(snapshot): delay = self.interval if self.refresh() else self.retry_interval
+                else: delay = self.interval - self.age(snapshot)
+            time.sleep(max(1.0, delay))
 
-            save_article_analysis(url=url, title=title, content=content, source_name=source_name, analysis_result=fused_analysis_result)
-            save_or_update_source(source_url=url, verdict=final_verdict, confidence=final_confidence_adjusted)
+    def start(self):
+        """Starts this process's refresher thread (idempotent; call after fork, not before)."""
+        if not DAILY_NEWS_SCHEDULER_ENABLED or self._thread_pid == os.getpid(): return
+        self._thread_pid = os.getpid()
+        self._lock_fd = None # a descriptor inherited across fork is not ours
+        threading.Thread(target=self._run, name="daily-news-refresh", daemon=True).start()
 
-            processed_articles.append({
-                "title": title, "url": url, "source": source_name, "verdict": final_verdict,
-                "confidence": float(final_confidence_adjusted), "summary": fused_analysis_result['summary']
-            })
 
-        return jsonify(processed_articles)
+DAILY_NEWS_DIGEST = DailyNewsDigest(DAILY_NEWS_SNAPSHOT_FILE, DAILY_NEWS_REFRESH_SECONDS, DAILY_NEWS_RETRY_SECONDS)
 
-    except requests.RequestException as e:
-        return jsonify({"error": f"Failed to connect to News API ({ACTIVE_NEWS_SERVICE}): {e}"}), 500
-    except Exception as e:
-        return jsonify({"error": f"An unexpected error occurred during news processing: {e}"}), 500
+
+def start_daily_news_scheduler():
+    DAILY_NEWS_DIGEST.start()
+
+
+# ----------------------------------------------------------------------
+# --- API ENDPOINTS ---
+# ----------------------------------------------------------------------
+
+@app.route('/api/analyze', methods=['POST'])
+@admission_control('analysis', PRIORITY_INTERACTIVE)
+def analyze_input():
+    """ENDPOINT 1: Runs the full hybrid analysis (Local Model + Gemini Pipeline + AI Detection)."""
+    data = request.get_json()
+    input_value = data.get('input_value', '').strip()
+    input_type = data.get('input_type') 
+    
+    if not input_value: return jsonify({"error": "No text or URL provided."}), 400
+
+    # --- Prepare content & variables ---
+    article_url = input_value 
+    article_title = f"User Input - {input_value[:50]}..."
+    source_name = "User Submitted"
+    article_text = input_value
+    headline = None
+
+    if input_type == 'url':
+        article_text, success, headline = extract_article_text_from_url(input_value)
+        if not success or article_text.startswith("Error:"): return jsonify({"error": article_text}), 500
+        try:
+             source_name = urllib.parse.urlparse(input_value).netloc
+             article_title = article_text[:100].strip().replace('\n', ' ') + "..."
+        except Exception: pass
+        external_rep_score, external_rep_tag = get_external_domain_reputation(input_value)
+    
+    elif input_type == 'text':
+        article_text = input_value
+        external_rep_score, external_rep_tag = 0.5, "RAW_TEXT_INPUT"
+    
+    else: return jsonify({"error": "Invalid input_type. Must be 'text' or 'url'."}), 400
+
+    # --- CORE HYBRID PIPELINE EXECUTION ---
+    
+    # 1. Local Classifier and AI Detector
+    bert_confidence, bert_verdict = predict_local_model_confidence(article_title, article_text, source_name)
+    ai_probability = predict_ai_generation_probability(article_text)
+    
+    # 2 + 3. Confidence-gated cascade: Fact Check pre-checks, then Gemini Analysis only if still undecided
+    gemini_analysis, cascade_info = run_verification_cascade(
+        article_text,
+        bert_confidence, bert_verdict,
+        external_rep_score, external_rep_tag,
+        headline=headline, # the page's own headline, never the body prefix stored as article_title
+        trusted_source=input_type == 'url' and is_trusted_source(input_value)
+    )
+    
+    # 4 + 5. Fusion, penalty and final categorical verdict (prioritizing factual reasoning)
+    final_verdict, final_confidence_adjusted, fused_analysis_result = fuse_analysis(bert_confidence, ai_probability, gemini_analysis, cascade_info)
+
+    save_article_analysis(url=article_url, title=article_title, content=article_text, 
+                          source_name=source_name, analysis_result=fused_analysis_result)
+    save_or_update_source(article_url, final_verdict, final_confidence_adjusted)
+
+    return jsonify(build_analyze_response(final_verdict, final_confidence_adjusted, bert_confidence, bert_verdict, ai_probability, gemini_analysis, cascade_info))
+
+
+@app.route('/api/daily-news', methods=['GET'])
+@admission_control(*DAILY_NEWS_ADMISSION)
+def get_daily_news():
+    """ENDPOINT 2: Returns the latest analyzed headlines from the background-refreshed digest (age in the Age header)."""
+    start_daily_news_scheduler()
+    snapshot = DAILY_NEWS_DIGEST.current()
+    if not DAILY_NEWS_SCHEDULER_ENABLED and DAILY_NEWS_DIGEST.is_stale(snapshot):
+        DAILY_NEWS_DIGEST.refresh() # no background thread: refresh inline, still only analyzing unseen headlines
+        snapshot = DAILY_NEWS_DIGEST.current()
+
+    if snapshot is None:
+        response = jsonify({"error": "The daily news digest is being prepared. Please try again shortly."})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(int(DAILY_NEWS_RETRY_SECONDS))
+        return response
+    if snapshot.get('error') is not None and not snapshot.get('articles'):
+        return jsonify({"error": snapshot['error']}), snapshot.get('status', 500)
+
+    response = jsonify(snapshot['articles'])
+    response.headers['Age'] = str(int(DAILY_NEWS_DIGEST.age(snapshot)))
+    response.headers['X-Digest-Generated-At'] = datetime.utcfromtimestamp(snapshot['generated_at']).isoformat() + 'Z'
+    return response
 
 
 @app.route('/api/history/query', methods=['GET'])
+@admission_control('lookup', PRIORITY_LOOKUP)
+@conditional_get('articles')
 def query_history():
     """ENDPOINT 3: Queries the database for past analyses."""
     if db is None: return jsonify({"error": "Database is not initialized. Cannot query history."}), 500
@@ -660,6 +1885,8 @@ def query_history():
 
 
 @app.route('/api/source/<domain>', methods=['GET'])
+@admission_control('lookup', PRIORITY_LOOKUP)
+@conditional_get('sources', 'articles')
 def get_source_credibility(domain):
     """ENDPOINT 4: Queries the 'sources' collection for aggregated credibility."""
     if db is None: return jsonify({"error": "Database is not initialized."}), 500
@@ -698,63 +1925,106 @@ def get_source_credibility(domain):
         return jsonify({"error": f"An unexpected error occurred: {e}"}), 500
 
 @app.route('/api/analytics/summary', methods=['GET'])
+@admission_control('lookup', PRIORITY_LOOKUP)
+@conditional_get('articles', 'sources')
 def analytics_summary():
     """ENDPOINT 5: Returns aggregated statistics for the entire database history."""
     analytics = get_verification_analytics()
     if analytics.get("error"): return jsonify(analytics), 500
     return jsonify(analytics), 200
 
+@app.route('/api/similar', methods=['GET', 'POST'])
+@admission_control('lookup', PRIORITY_LOOKUP, max_active=ADMISSION_SIMILAR_CONCURRENCY)
+def find_similar_verdicts():
+    """ENDPOINT 7: Top-k previously analyzed articles closest to a text (or to an already analyzed URL)."""
+    if VECTOR_INDEX is None: return jsonify({"error": "Similarity search is unavailable (local model not loaded)."}), 503
+    params = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    text = (params.get('text') or '').strip()
+    url = (params.get('url') or '').strip()
+    if not text and not url: return jsonify({"error": "A 'text' or 'url' parameter is required."}), 400
+    try: k = max(1, min(SIMILAR_MAX_K, int(params.get('k', SIMILAR_DEFAULT_K))))
+    except (TypeError, ValueError): return jsonify({"error": "'k' must be an integer."}), 400
+
+    try:
+        started = time.perf_counter()
+        url_key = content_hash(url) if url else None
+        vector = VECTOR_INDEX.get_vector(url_key) if url_key else None
+        if vector is None:
+            if not text: return jsonify({"error": "This URL has not been analyzed yet. Pass 'text' instead."}), 404
+            vector = embed_text('', text) # same shape as the stored title + sep + content embeddings
+        results, search_mode = VECTOR_INDEX.search(vector, k=k, exclude_key=url_key)
+
+        similar = [{**{key: value for key, value in item.items() if key != 'key'}, "similarity": round(score, 4)} for score, item in results]
+        return jsonify({
+            "query": text[:100] or url, "k": k, "count": len(similar), "index_size": len(VECTOR_INDEX),
+            "search": search_mode, "latency_ms": round((time.perf_counter() - started) * 1000, 2), "results": similar
+        })
+    except Exception as e:
+        return jsonify({"error": f"Similarity search failed: {e}"}), 500
+
+
 @app.route('/api/explain', methods=['POST'])
+@admission_control('analysis', PRIORITY_DEFERRABLE, max_active=ADMISSION_EXPLAIN_CONCURRENCY)
 def explain_analysis():
     """
-    ENDPOINT 6: Calculates LIME explanation for the local BERT/RoBERTa model.
+    ENDPOINT 6: Word-level explanation of the local BERT/RoBERTa verdict, via LIME (default) or
+    integrated gradients (`"method": "gradients"`, a few batched forward/backward passes).
     """
     data = request.get_json()
     input_value = data.get('input_value', '').strip()
     input_type = data.get('input_type')
+    method = data.get('method') or EXPLAIN_DEFAULT_METHOD
     
     if not input_value:
         return jsonify({"error": "No text or URL provided."}), 400
+    if method not in EXPLAIN_METHODS:
+        return jsonify({"error": f"Invalid method. Must be one of: {', '.join(EXPLAIN_METHODS)}."}), 400
     
     if GLOBAL_MODEL is None:
-        return jsonify({"error": "Local Model required for LIME is not loaded."}), 503
+        return jsonify({"error": "Local Model required for explanations is not loaded."}), 503
 
     # --- 1. Get Text (Reuse content extraction logic) ---
     article_text = input_value
     if input_type == 'url':
-        article_text, success = extract_article_text_from_url(input_value)
+        article_text, success, _ = extract_article_text_from_url(input_value)
         if not success or article_text.startswith("Error:"):
             return jsonify({"error": article_text}), 500
             
-    # LIME Explainer Setup (Explain the prediction for the 'Real' class, which is index 1)
-    explainer = LimeTextExplainer(class_names=['Fake', 'Real'])
-    
-    # 2. Generate Explanation
+    # 2. Generate Explanation (for the 'Real' class, which is index 1)
     try:
-        explanation = explainer.explain_instance(
-            article_text[:2000], 
-            classifier_fn=predict_proba_for_lime, 
-            num_samples=300, 
-            num_features=10, 
-            labels=(0, 1) 
-        )
+        # Only explain what the model actually sees; the cached encoding (shared with /api/analyze) gives the cut
+        visible_limit = get_document_encoding(article_text).visible_char_limit()
+        explain_text = article_text[:min(EXPLAIN_MAX_CHARS, visible_limit or EXPLAIN_MAX_CHARS)]
+
+        if method == 'gradients': explanation_data = explain_with_gradients(explain_text)
+        else: explanation_data = explain_with_lime(explain_text)
         
         # 3. Format Output for Frontend (weights)
-        explanation_data = explanation.as_list(label=1) 
-        
         formatted_weights = [{"word": word, "weight": round(weight, 5)} for word, weight in explanation_data]
         
         return jsonify({
             "status": "EXPLANATION_GENERATED",
+            "method": method,
             "weights": formatted_weights,
             "text_summary": article_text[:500] + "...",
         })
         
     except Exception as e:
-        return jsonify({"error": f"LIME failed to generate explanation: {e}"}), 500
+        label = "LIME" if method == 'lime' else "Gradient attribution"
+        return jsonify({"error": f"{label} failed to generate explanation: {e}"}), 500
+
+
+@app.route('/api/admission', methods=['GET'])
+def admission_stats():
+    """ENDPOINT 8: Live admission-control state of this worker (active, queue depth, rejections per endpoint)."""
+    return jsonify({
+        "enabled": ADMISSION_ENABLED, "pid": os.getpid(),
+        "gates": {name: gate.snapshot() for name, gate in ADMISSION_GATES.items()}
+    })
 
 
 if __name__ == '__main__':
     print("Starting Flask server with Gemini Real-Time Fact-Checking and MongoDB initialization...")
+    start_daily_news_scheduler()
     # NOTE: use_reloader=False is set to prevent the Windows socket crash
-    app.run(debug=True, use_reloader=False, host='0.0.0.0', port=5001)
\ No newline at end of file
+    app.run(debug=True, use_reloader=False, host='0.0.0.0', port=int(os.getenv("PORT", 5001)))
\ No newline at end of file
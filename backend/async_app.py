@@ -0,0 +1,255 @@
+"""
+Async serving mode for the upstream-bound endpoints.
+
+    cd backend
+    uvicorn async_app:asgi_app --host 0.0.0.0 --port 5001
+    # or, with the preload / memory hooks: gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker async_app:asgi_app
+
+/api/analyze runs as a coroutine on the event loop: Gemini goes through the
+async client (client.aio), Fact Check / news / scraping calls share one httpx.AsyncClient, and
+503 backoff uses asyncio.sleep. The local RoBERTa inference runs on a small dedicated executor
+so it never blocks the loop; blocking MongoDB writes use the loop's default thread pool. Every
+other route is the unchanged Flask app mounted as WSGI on its own pool of ASYNC_WSGI_THREADS
+threads, so a slow Flask request (e.g. a LIME /api/explain) never serialises the others
+(/api/daily-news included: it only reads the digest snapshot, which app.py refreshes on a
+background thread).
+
+Request / response JSON is identical to app.py: both modes share the same prompt, parsing,
+cascade and fusion helpers, only the I/O differs.
+"""
+import os
+import time
+import asyncio
+import functools
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from google.genai.errors import APIError
+
+import app as backend
+
+# --- CONFIGURATION ---
+# Model inference is CPU-bound and already multi-threaded inside torch; one or two workers are enough.
+ASYNC_INFERENCE_WORKERS = int(os.getenv("ASYNC_INFERENCE_WORKERS", 1))
+# Default executor for blocking calls (MongoDB, HTML parsing, and Gemini on google-genai versions whose
+# client.aio wraps the sync client in a thread). Sized for hundreds of in-flight analyses.
+ASYNC_IO_THREADS = int(os.getenv("ASYNC_IO_THREADS", 256))
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", 500))
+# Threads serving the mounted Flask routes concurrently (like gunicorn's gthread `threads`)
+ASYNC_WSGI_THREADS = int(os.getenv("ASYNC_WSGI_THREADS", 32))
+# Admission for the native /api/analyze. Its own gate: an in-flight analysis here mostly awaits upstream I/O,
+# so it is budgeted far above the thread-bound "analysis" gate the mounted Flask routes share.
+ASYNC_ADMISSION_ANALYSIS_CONCURRENCY = int(os.getenv("ASYNC_ADMISSION_ANALYSIS_CONCURRENCY", 256))
+ASYNC_ADMISSION_ANALYSIS_QUEUE = int(os.getenv("ASYNC_ADMISSION_ANALYSIS_QUEUE", 256))
+
+INFERENCE_EXECUTOR = ThreadPoolExecutor(max_workers=ASYNC_INFERENCE_WORKERS, thread_name_prefix="inference")
+http_client = None # shared httpx.AsyncClient, opened in lifespan()
+# Registered with the Flask app's gates so GET /api/admission reports it too
+backend.ADMISSION_GATES["async_analysis"] = backend.AdmissionGate("async_analysis", ASYNC_ADMISSION_ANALYSIS_CONCURRENCY, ASYNC_ADMISSION_ANALYSIS_QUEUE, backend.ADMISSION_ANALYSIS_MAX_WAIT_SECONDS)
+
+
+class FlaskJSONResponse(Response):
+    """Serialises exactly like Flask's jsonify, so both serving modes return byte-identical bodies."""
+    media_type = "application/json"
+
+    def render(self, content):
+        with backend.app.app_context():
+            return backend.app.json.response(content).get_data()
+
+
+def async_admission_control(gate_name, priority, max_active=None):
+    """Coroutine twin of app.admission_control: same gates, status codes, body and Retry-After header."""
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(request):
+            if not backend.ADMISSION_ENABLED: return await endpoint(request)
+            gate = backend.ADMISSION_GATES[gate_name]
+            try: started = await gate.acquire_async(endpoint.__name__, priority, max_active)
+            except backend.AdmissionRejected as e:
+                return FlaskJSONResponse(backend.admission_rejection_body(e), status_code=e.status, headers={'Retry-After': str(e.retry_after)})
+            try: return await endpoint(request)
+            finally: gate.release(endpoint.__name__, started)
+        return wrapper
+    return decorator
+
+
+async def run_inference(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(INFERENCE_EXECUTOR, function, *args)
+
+
+def local_predictions(title, text, source_name):
+    """Step 1 of the pipeline (local classifier + AI detector) as a single executor hop."""
+    bert_confidence, bert_verdict = backend.predict_local_model_confidence(title, text, source_name)
+    return bert_confidence, bert_verdict, backend.predict_ai_generation_probability(text)
+
+
+def save_results(url, title, content, source_name, fused_analysis_result, final_verdict, final_confidence_adjusted):
+    backend.save_article_analysis(url=url, title=title, content=content, source_name=source_name, analysis_result=fused_analysis_result)
+    backend.save_or_update_source(url, final_verdict, final_confidence_adjusted)
+
+
+# --- ASYNC UPSTREAM CALLS ---
+async def extract_primary_claim_async(text):
+    if not backend.client: return None
+    try:
+        response = await backend.client.aio.models.generate_content(model=backend.CLAIM_EXTRACTION_MODEL, contents=backend.build_claim_extraction_prompt(text))
+        return response.text.strip().replace('"', '')
+    except Exception: return None
+
+
+async def check_google_fact_check_async(claim):
+    if not claim or not backend.FACT_CHECK_API_KEY: return "API_KEY_MISSING", 0.0
+    try:
+        response = await http_client.get(backend.FACT_CHECK_ENDPOINT, params=backend.fact_check_params(claim), timeout=5)
+        response.raise_for_status()
+        return backend.interpret_fact_check(response.json())
+    except Exception: return "API_ERROR", 0.0
+
+
+async def generate_gemini_analysis_async(prompt, tx_hash, ipfs_cid):
+    """Async twin of app._generate_gemini_analysis (same retry policy and error results)."""
+    for attempt in range(backend.MAX_RETRIES):
+        try:
+            response = await backend.client.aio.models.generate_content(model=backend.GEMINI_ANALYSIS_MODEL, contents=prompt, config=backend.gemini_analysis_config())
+            return backend.parse_gemini_analysis(response.text, tx_hash, ipfs_cid)
+        except APIError as e:
+            wait_time = backend.gemini_retry_delay(e, attempt)
+            if wait_time is None: return backend.gemini_failure_result(e, attempt)
+            await asyncio.sleep(wait_time)
+        except Exception as e:
+            return backend.gemini_failure_result(e)
+
+    return backend.gemini_retries_exhausted_result()
+
+
+async def analyze_text_for_fake_news_async(text, external_rep_score=0.5, external_rep_tag="N/A", fact_check_result=None, fact_check_confidence=0.0, primary_claim=None, headline=None):
+    result, gemini_request = backend.prepare_gemini_analysis(text, external_rep_score, external_rep_tag, fact_check_result, fact_check_confidence, primary_claim, headline)
+    if result is not None: return result
+
+    started = time.perf_counter()
+    analysis_result = await generate_gemini_analysis_async(gemini_request['prompt'], gemini_request['tx_hash'], gemini_request['ipfs_cid'])
+    return backend.finish_gemini_analysis(gemini_request, analysis_result, started)
+
+
+async def run_verification_cascade_async(text, bert_confidence, bert_verdict, external_rep_score, external_rep_tag, headline=None, trusted_source=False):
+    """Async twin of app.run_verification_cascade: same tiers, thresholds and cascade_info."""
+    stages_run = ['local_model']
+    stats_check = backend.check_statistical_claims(text) # in-process lookup, sub-millisecond
+
+    decided = backend.run_local_cascade_tiers(bert_confidence, bert_verdict, trusted_source, stats_check, stages_run)
+    if decided: return decided
+
+    stages_run.append('fact_check')
+    primary_claim = await extract_primary_claim_async(text)
+    fact_check_result, fact_check_confidence = await check_google_fact_check_async(primary_claim)
+    decided = backend.run_fact_check_tier(fact_check_result, fact_check_confidence, stats_check, stages_run)
+    if decided: return decided
+
+    analysis_result = await analyze_text_for_fake_news_async(
+        text,
+        external_rep_score=external_rep_score,
+        external_rep_tag=external_rep_tag,
+        fact_check_result=fact_check_result,
+        fact_check_confidence=fact_check_confidence,
+        primary_claim=primary_claim,
+        headline=headline
+    )
+    return backend.finish_cascade(fact_check_result, fact_check_confidence, analysis_result, stats_check, stages_run)
+
+
+async def extract_article_text_from_url_async(url):
+    try:
+        response = await http_client.get(url, headers=backend.SCRAPE_HEADERS, timeout=15, follow_redirects=True)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        return f"Error fetching URL: {e}. Check if the link is correct or the site blocks scraping.", False, None
+    except Exception as e:
+        return f"An unexpected error occurred during scraping: {e}", False, None
+    return await asyncio.to_thread(backend.parse_article_html, response.content)
+
+
+# --- ASYNC ENDPOINTS ---
+@async_admission_control('async_analysis', backend.PRIORITY_INTERACTIVE)
+async def analyze_input(request):
+    """ENDPOINT 1 (async): same contract as app.analyze_input."""
+    try: data = await request.json()
+    except Exception: return FlaskJSONResponse({"error": "Request body must be JSON."}, status_code=400)
+    input_value = data.get('input_value', '').strip()
+    input_type = data.get('input_type')
+
+    if not input_value: return FlaskJSONResponse({"error": "No text or URL provided."}, status_code=400)
+
+    # --- Prepare content & variables ---
+    article_url = input_value
+    article_title = f"User Input - {input_value[:50]}..."
+    source_name = "User Submitted"
+    article_text = input_value
+    headline = None
+
+    if input_type == 'url':
+        article_text, success, headline = await extract_article_text_from_url_async(input_value)
+        if not success or article_text.startswith("Error:"): return FlaskJSONResponse({"error": article_text}, status_code=500)
+        try:
+             source_name = urllib.parse.urlparse(input_value).netloc
+             article_title = article_text[:100].strip().replace('\n', ' ') + "..."
+        except Exception: pass
+        external_rep_score, external_rep_tag = backend.get_external_domain_reputation(input_value)
+
+    elif input_type == 'text':
+        article_text = input_value
+        external_rep_score, external_rep_tag = 0.5, "RAW_TEXT_INPUT"
+
+    else: return FlaskJSONResponse({"error": "Invalid input_type. Must be 'text' or 'url'."}, status_code=400)
+
+    # 1. Local Classifier and AI Detector (inference executor)
+    bert_confidence, bert_verdict, ai_probability = await run_inference(local_predictions, article_title, article_text, source_name)
+
+    # 2 + 3. Confidence-gated cascade
+    gemini_analysis, cascade_info = await run_verification_cascade_async(
+        article_text,
+        bert_confidence, bert_verdict,
+        external_rep_score, external_rep_tag,
+        headline=headline,
+        trusted_source=input_type == 'url' and backend.is_trusted_source(input_value)
+    )
+
+    # 4 + 5. Fusion and final verdict
+    final_verdict, final_confidence_adjusted, fused_analysis_result = backend.fuse_analysis(bert_confidence, ai_probability, gemini_analysis, cascade_info)
+    await asyncio.to_thread(save_results, article_url, article_title, article_text, source_name, fused_analysis_result, final_verdict, final_confidence_adjusted)
+
+    return FlaskJSONResponse(backend.build_analyze_response(final_verdict, final_confidence_adjusted, bert_confidence, bert_verdict, ai_probability, gemini_analysis, cascade_info))
+
+
+# --- ASGI APPLICATION ---
+async def lifespan(asgi_app):
+    global http_client
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=ASYNC_IO_THREADS, thread_name_prefix="blocking-io"))
+    http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=ASYNC_HTTP_MAX_CONNECTIONS, max_keepalive_connections=100))
+    backend.start_daily_news_scheduler()
+    print(f"Async serving mode ready (inference workers={ASYNC_INFERENCE_WORKERS}, io threads={ASYNC_IO_THREADS}, analyze admission={ASYNC_ADMISSION_ANALYSIS_CONCURRENCY}+{ASYNC_ADMISSION_ANALYSIS_QUEUE} queued).")
+    try:
+        yield
+    finally:
+        await http_client.aclose()
+
+
+asgi_app = Starlette(
+    routes=[
+        Route('/api/analyze', analyze_input, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(backend.app, workers=ASYNC_WSGI_THREADS)), # every other endpoint: the synchronous Flask handlers
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=backend.ALLOWED_ORIGINS, allow_methods=["*"], allow_headers=["*"])],
+    lifespan=lifespan,
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(asgi_app, host='0.0.0.0', port=int(os.getenv("PORT", 5001)))
@@ -0,0 +1,460 @@
+"""
+Local statistical verification of numeric COVID-19 claims.
+
+The bundled Kaggle COVID-19 tables (day_wise, full_grouped, covid_19_clean_complete,
+usa_county_wise, worldometer_data) are converted once into a compact columnar store
+(one .npy file per column, rows sorted by place then date). At runtime the columns are
+memory-mapped, so lookups are a dict hit plus a binary search and gunicorn workers share
+the pages with the master.
+
+    python covid_stats.py --build                      # (re)build the store
+    python covid_stats.py --query "Over 150,000 people died of COVID-19 in the US by July 20, 2020."
+    python covid_stats.py --verify-extraction          # claim-extraction regression samples
+
+The store is rebuilt automatically when a source CSV changes (size / mtime) or STORE_VERSION moves.
+"""
+import os
+import re
+import json
+import time
+import shutil
+import argparse
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+DATA_DIR = os.getenv("COVID_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data-sets'))
+STORE_DIR_NAME = 'covid_store'
+STORE_VERSION = 1
+
+DAY_WISE_FILE = 'day_wise.csv'
+FULL_GROUPED_FILE = 'full_grouped.csv'
+CLEAN_COMPLETE_FILE = 'covid_19_clean_complete.csv'
+COUNTY_FILE = 'usa_county_wise.csv'
+WORLDOMETER_FILE = 'worldometer_data.csv'
+SOURCE_FILES = [DAY_WISE_FILE, FULL_GROUPED_FILE, CLEAN_COMPLETE_FILE, COUNTY_FILE, WORLDOMETER_FILE]
+
+# Time-series columns (int64, -1 = not reported at that level, e.g. recoveries per county)
+METRICS = ['confirmed', 'deaths', 'recovered', 'active', 'new_confirmed', 'new_deaths']
+# Ambiguous place names resolve in this order (e.g. "Georgia" is the country unless the US is mentioned)
+LEVEL_PREFERENCE = ['country', 'who_region', 'province', 'county', 'world']
+# ...while the most specific place mentioned in a sentence wins ("Cook County, Illinois" -> county)
+LEVEL_SPECIFICITY = ['county', 'province', 'country', 'who_region', 'world']
+
+# Claimed vs. dataset value: within SUPPORT_TOLERANCE is supported, beyond CONTRADICT_TOLERANCE contradicted
+SUPPORT_TOLERANCE = float(os.getenv("COVID_STATS_SUPPORT_TOLERANCE", 0.1))
+CONTRADICT_TOLERANCE = float(os.getenv("COVID_STATS_CONTRADICT_TOLERANCE", 0.25))
+
+COUNTRY_ALIASES = {
+    'US': ['United States', 'U.S.', 'U.S.A.', 'USA', 'America'],
+    'United Kingdom': ['UK', 'U.K.', 'Britain', 'Great Britain'],
+    'Korea, South': ['South Korea'],
+    'Taiwan*': ['Taiwan'],
+    'Congo (Kinshasa)': ['Democratic Republic of the Congo', 'DR Congo'],
+    'Congo (Brazzaville)': ['Republic of the Congo'],
+    'Burma': ['Myanmar'],
+    'Czechia': ['Czech Republic'],
+    'United Arab Emirates': ['UAE'],
+}
+WORLD_ALIASES = ['World', 'world', 'worldwide', 'Worldwide', 'globally', 'Globally', 'across the globe']
+WORLDOMETER_NAMES = {'US': 'USA', 'United Kingdom': 'UK', 'Korea, South': 'S. Korea', 'United Arab Emirates': 'UAE'}
+
+
+# --- STORE BUILD ---
+def is_lfs_pointer(path):
+    with open(path, 'rb') as f:
+        return f.read(40).startswith(b'version https://git-lfs')
+
+
+def source_signature(data_dir):
+    signature = {}
+    for filename in SOURCE_FILES:
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature[filename] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def _frame(df, level, name, parent, date_col, columns):
+    """Normalises one source table into the long (level, name, parent, day, metrics...) layout."""
+    out = pd.DataFrame({
+        'level': level,
+        'name': df[name].astype(str) if name in df.columns else name,
+        'parent': df[parent].astype(str) if parent in df.columns else parent,
+        'day': pd.to_datetime(df[date_col]).to_numpy().astype('datetime64[D]').astype(np.int32),
+    })
+    for metric in METRICS:
+        source_col = columns.get(metric)
+        out[metric] = df[source_col].to_numpy() if source_col in df.columns else np.nan
+    return out
+
+
+def load_source_frames(data_dir):
+    frames = []
+    base_columns = {'confirmed': 'Confirmed', 'deaths': 'Deaths', 'recovered': 'Recovered', 'active': 'Active'}
+    daily_columns = {**base_columns, 'new_confirmed': 'New cases', 'new_deaths': 'New deaths'}
+
+    def usable(filename):
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            print(f"WARNING: {filename} not found. Skipping.")
+            return None
+        if is_lfs_pointer(path):
+            print(f"WARNING: {filename} is a Git LFS pointer (run 'git lfs pull'). Skipping.")
+            return None
+        return path
+
+    path = usable(DAY_WISE_FILE)
+    if path:
+        frames.append(_frame(pd.read_csv(path, engine='c'), 'world', 'World', '', 'Date', daily_columns))
+
+    path = usable(FULL_GROUPED_FILE)
+    if path:
+        df = pd.read_csv(path, engine='c')
+        frames.append(_frame(df, 'country', 'Country/Region', 'WHO Region', 'Date', daily_columns))
+        regions = df.groupby(['WHO Region', 'Date'], as_index=False).sum(numeric_only=True)
+        frames.append(_frame(regions, 'who_region', 'WHO Region', 'World', 'Date', daily_columns))
+
+    path = usable(CLEAN_COMPLETE_FILE)
+    if path:
+        df = pd.read_csv(path, engine='c').dropna(subset=['Province/State'])
+        df = df.groupby(['Province/State', 'Country/Region', 'Date'], as_index=False).sum(numeric_only=True)
+        frames.append(_frame(df, 'province', 'Province/State', 'Country/Region', 'Date', base_columns))
+
+    path = usable(COUNTY_FILE)
+    if path:
+        county_columns = {'confirmed': 'Confirmed', 'deaths': 'Deaths'}
+        df = pd.read_csv(path, engine='c', usecols=['Admin2', 'Province_State', 'Date', 'Confirmed', 'Deaths'])
+        df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%y')
+        states = df.groupby(['Province_State', 'Date'], as_index=False).sum(numeric_only=True)
+        states['Country'] = 'US'
+        frames.append(_frame(states, 'province', 'Province_State', 'Country', 'Date', county_columns))
+        counties = df.dropna(subset=['Admin2'])
+        counties = counties[~counties['Admin2'].str.startswith(('Out of', 'Unassigned'))]
+        frames.append(_frame(counties, 'county', 'Admin2', 'Province_State', 'Date', county_columns))
+
+    return frames
+
+
+def load_worldometer(data_dir):
+    """Latest snapshot per country (no dates): totals plus tests and population."""
+    path = os.path.join(data_dir, WORLDOMETER_FILE)
+    if not os.path.exists(path) or is_lfs_pointer(path): return {}
+    df = pd.read_csv(path, engine='c')
+    snapshot = {}
+    for row in df.itertuples(index=False):
+        values = {'confirmed': row.TotalCases, 'deaths': row.TotalDeaths, 'recovered': row.TotalRecovered,
+                  'active': row.ActiveCases, 'tests': row.TotalTests, 'population': row.Population}
+        snapshot[str(row[0])] = {k: int(v) for k, v in values.items() if pd.notna(v)}
+    return snapshot
+
+
+def build_store(data_dir=DATA_DIR, store_dir=None):
+    store_dir = store_dir or os.path.join(data_dir, STORE_DIR_NAME)
+    start_time = time.perf_counter()
+    frames = load_source_frames(data_dir)
+    if not frames: raise FileNotFoundError(f"No COVID-19 source tables found in {data_dir}")
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df.sort_values(['level', 'parent', 'name', 'day'], kind='stable').reset_index(drop=True)
+    places = df[['level', 'name', 'parent']].drop_duplicates().reset_index(drop=True)
+    place_ids = pd.MultiIndex.from_frame(places).get_indexer(pd.MultiIndex.from_frame(df[['level', 'name', 'parent']]))
+
+    # Daily deltas where the source has no "New ..." column (provinces, counties)
+    for metric, base in (('new_confirmed', 'confirmed'), ('new_deaths', 'deaths')):
+        delta = df[base].groupby(place_ids).diff().fillna(df[base])
+        df[metric] = df[metric].fillna(delta)
+
+    tmp_dir = store_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, 'place.npy'), place_ids.astype(np.int32))
+    np.save(os.path.join(tmp_dir, 'day.npy'), df['day'].to_numpy(np.int32))
+    for metric in METRICS:
+        np.save(os.path.join(tmp_dir, f'{metric}.npy'), df[metric].fillna(-1).round().to_numpy(np.int64))
+    offsets = np.searchsorted(place_ids, np.arange(len(places) + 1)).astype(np.int64)
+    np.save(os.path.join(tmp_dir, 'place_offsets.npy'), offsets)
+
+    meta = {
+        'version': STORE_VERSION, 'sources': source_signature(data_dir),
+        'places': places.values.tolist(), 'worldometer': load_worldometer(data_dir),
+        'day_min': int(df['day'].min()), 'day_max': int(df['day'].max()), 'rows': len(df),
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f: json.dump(meta, f)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    print(f"COVID-19 store built: {len(df)} rows, {len(places)} places in {time.perf_counter() - start_time:.1f}s -> {store_dir}")
+    return store_dir
+
+
+# --- STORE LOOKUP ---
+class CovidStatsStore:
+    """Read-only, memory-mapped view of the columnar store."""
+
+    def __init__(self, store_dir):
+        with open(os.path.join(store_dir, 'meta.json')) as f: meta = json.load(f)
+        self.places = [tuple(p) for p in meta['places']]
+        self.worldometer = meta['worldometer']
+        self.day_min, self.day_max = meta['day_min'], meta['day_max']
+        self.days = np.load(os.path.join(store_dir, 'day.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(store_dir, 'place_offsets.npy'))
+        self.columns = {m: np.load(os.path.join(store_dir, f'{m}.npy'), mmap_mode='r') for m in METRICS}
+        self._build_name_index()
+
+    def _build_name_index(self):
+        self.name_index = {}
+        for place_id, (level, name, parent) in enumerate(self.places):
+            variants = [name]
+            if level == 'country': variants += COUNTRY_ALIASES.get(name, [])
+            elif level == 'county': variants = [f"{name} County", f"{name} Parish"]
+            elif level == 'world': variants = WORLD_ALIASES
+            for variant in variants: self.name_index.setdefault(variant, []).append(place_id)
+        # Case-sensitive on purpose: "US" the country, not "us" the pronoun
+        names = sorted(self.name_index, key=len, reverse=True)
+        self.place_regex = re.compile(r'(?<![\w.])(' + '|'.join(re.escape(n) for n in names) + r')(?![\w])')
+
+    def value_at(self, place_id, metric, day):
+        """Value on `day` (or the last reported day before it). Returns (value, day) or (None, None)."""
+        start, end = self.offsets[place_id], self.offsets[place_id + 1]
+        if start == end: return None, None
+        if day is None: idx = end - 1
+        else:
+            idx = start + np.searchsorted(self.days[start:end], day, side='right') - 1
+            if idx < start: return None, None
+        value = int(self.columns[metric][idx])
+        return (value, int(self.days[idx])) if value >= 0 else (None, None)
+
+    def snapshot_value(self, place_id, metric):
+        level, name, _ = self.places[place_id]
+        if level != 'country': return None
+        return self.worldometer.get(WORLDOMETER_NAMES.get(name, name), {}).get(metric)
+
+
+def open_store(data_dir=DATA_DIR, rebuild_if_stale=True):
+    """Opens the store, (re)building it first if it is missing or older than the source CSVs."""
+    store_dir = os.path.join(data_dir, STORE_DIR_NAME)
+    meta_path = os.path.join(store_dir, 'meta.json')
+    stale = True
+    if os.path.exists(meta_path):
+        with open(meta_path) as f: meta = json.load(f)
+        stale = meta.get('version') != STORE_VERSION or meta.get('sources') != source_signature(data_dir)
+    if stale:
+        if not rebuild_if_stale: return None
+        build_store(data_dir, store_dir)
+    return CovidStatsStore(store_dir)
+
+
+# --- NUMERIC CLAIM EXTRACTION ---
+MONTHS = {m: i + 1 for i, m in enumerate(['january', 'february', 'march', 'april', 'may', 'june', 'july',
+                                          'august', 'september', 'october', 'november', 'december'])}
+MONTH_PATTERN = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+DATE_REGEXES = [
+    (re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b'), ('y', 'm', 'd')),
+    (re.compile(r'\b(' + MONTH_PATTERN + r')\s+(\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(\d{4}))?', re.I), ('mon', 'd', 'y')),
+    (re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(' + MONTH_PATTERN + r')(?:,?\s+(\d{4}))?', re.I), ('d', 'mon', 'y')),
+    (re.compile(r'\b(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})\b'), ('m', 'd', 'y')),
+]
+QUALIFIER_PATTERN = (r'(?:(?P<qualifier>more than|over|at least|above|exceeding|nearly|almost|about|around|approximately|roughly|'
+                     r'close to|less than|under|fewer than|below)\s+)?')
+# The number must start a token: never the "19" of "COVID-19" / "SARS-CoV-2" or the tail of a word or decimal
+NUMBER_PATTERN = r'(?<![\w.-])(?P<number>\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)(?:\s*(?P<multiplier>million|billion|thousand|[km])\b)?'
+METRIC_PATTERN = r'(?P<metric>deaths?|died|dead|fatalities|cases|infections|infected|positive|recovered|recoveries|active cases|tests|tested)\b'
+# "<qualifier> <number> <metric>": "more than 35,000 deaths"
+CLAIM_REGEX = re.compile(QUALIFIER_PATTERN + NUMBER_PATTERN + r'\s+(?:[\w-]+\s+){0,2}?(?P<new>new\s+|daily\s+)?' + METRIC_PATTERN, re.I)
+# "<metric> ... <verb> <qualifier> <number>": "deaths in the US passed 150,000"
+CLAIM_VERB_REGEX = re.compile(
+    r'(?P<new>new\s+|daily\s+)?' + METRIC_PATTERN + r'(?:\s+[\w.,\'-]+){0,4}?\s+(?:has\s+|have\s+|had\s+)?'
+    r'(?P<verb>passed|topped|surpassed|exceeded|crossed|reached|hit|rose to|climbed to|totall?ed|stood at|stands at)\s+'
+    + QUALIFIER_PATTERN + NUMBER_PATTERN,
+    re.I)
+SENTENCE_REGEX = re.compile(r'(?<=[.!?])\s+(?=["\'A-Z0-9])')
+# Only sentences that are about the pandemic are checked ("3 people died in Georgia in road accidents" is not a COVID claim)
+COVID_TOPIC_REGEX = re.compile(r'\b(?:covid(?:-?19)?|coronavirus|pandemic|sars-cov-2)\b', re.I)
+METRIC_WORDS = {
+    'death': 'deaths', 'deaths': 'deaths', 'died': 'deaths', 'dead': 'deaths', 'fatalities': 'deaths',
+    'cases': 'confirmed', 'infections': 'confirmed', 'infected': 'confirmed', 'positive': 'confirmed',
+    'recovered': 'recovered', 'recoveries': 'recovered', 'active cases': 'active', 'tests': 'tests', 'tested': 'tests',
+}
+MULTIPLIERS = {'thousand': 1e3, 'k': 1e3, 'million': 1e6, 'm': 1e6, 'billion': 1e9}
+LOWER_BOUND_QUALIFIERS = {'more than', 'over', 'at least', 'above', 'exceeding'}
+LOWER_BOUND_VERBS = {'passed', 'topped', 'surpassed', 'exceeded', 'crossed'}
+
+# Sentence -> expected [(metric, claimed, bound)], checked by --verify-extraction
+CLAIM_REGRESSION_SAMPLES = [
+    ("COVID-19 deaths in the US passed 150,000 by July 20, 2020.", [('deaths', 150000.0, 'lower')]),
+    ("In Italy, COVID-19 deaths topped 35,000 by July 20, 2020.", [('deaths', 35000.0, 'lower')]),
+    ("Over 150,000 people have died of COVID-19 in the United States.", [('deaths', 150000.0, 'lower')]),
+    ("SARS-CoV-2 infections reached 2 million in Brazil.", [('confirmed', 2000000.0, 'approx')]),
+    ("Italy reported 1,200 new cases of COVID-19 on March 3.", [('new_confirmed', 1200.0, 'approx')]),
+    ("COVID19 cases keep rising in Italy.", []),
+    ("Fewer than 500 COVID-19 deaths were recorded in Norway.", [('deaths', 500.0, 'upper')]),
+]
+UPPER_BOUND_QUALIFIERS = {'less than', 'under', 'fewer than', 'below'}
+
+
+def parse_number(match):
+    value = float(match.group('number').replace(',', ''))
+    multiplier = (match.group('multiplier') or '').lower()
+    return value * MULTIPLIERS.get(multiplier, 1)
+
+
+def find_claim_matches(sentence):
+    """[(number_position, metric, claimed, bound)] for every numeric claim in one sentence (no place / date yet)."""
+    found, taken = [], []
+    for regex in (CLAIM_REGEX, CLAIM_VERB_REGEX):
+        for match in regex.finditer(sentence):
+            span = match.span('number')
+            if any(start < span[1] and span[0] < end for start, end in taken): continue # same number, both phrasings
+            taken.append(span)
+            metric = METRIC_WORDS[match.group('metric').lower()]
+            if match.group('new') and metric in ('confirmed', 'deaths'): metric = 'new_' + metric
+            qualifier = (match.group('qualifier') or '').lower()
+            verb = (match.groupdict().get('verb') or '').lower()
+            if qualifier in UPPER_BOUND_QUALIFIERS: bound = "upper"
+            elif qualifier in LOWER_BOUND_QUALIFIERS or (not qualifier and verb in LOWER_BOUND_VERBS): bound = "lower"
+            else: bound = "approx"
+            found.append((span[0], metric, parse_number(match), bound))
+    return sorted(found)
+
+
+def find_dates(sentence, default_year):
+    """[(char_position, epoch_day)] for every date mentioned in the sentence."""
+    found = []
+    for regex, order in DATE_REGEXES:
+        for match in regex.finditer(sentence):
+            parts = dict(zip(order, match.groups()))
+            try:
+                month = MONTHS[next(m for m in MONTHS if m.startswith(parts['mon'].lower().rstrip('.')[:3]))] if 'mon' in parts else int(parts['m'])
+                year = int(parts['y']) if parts.get('y') else default_year
+                if year < 100: year += 2000
+                day = (date(year, month, int(parts['d'])) - date(1970, 1, 1)).days
+            except (ValueError, StopIteration): continue
+            found.append((match.start(), day))
+    return found
+
+
+def resolve_place(store, sentence):
+    """Most specific unambiguous place mentioned in the sentence, or None."""
+    mentioned = {m.group(1) for m in store.place_regex.finditer(sentence)}
+    mentioned_names = {store.places[pid][1] for name in mentioned for pid in store.name_index[name]}
+    resolved = []
+    for name in mentioned:
+        candidates = store.name_index[name]
+        # Prefer candidates whose parent (state / country) is also mentioned
+        with_parent = [pid for pid in candidates if store.places[pid][2] in mentioned_names]
+        candidates = with_parent or candidates
+        by_level = {}
+        for pid in candidates: by_level.setdefault(store.places[pid][0], []).append(pid)
+        for level in LEVEL_PREFERENCE:
+            if level in by_level:
+                if len(by_level[level]) == 1: resolved.append(by_level[level][0])
+                break
+    if not resolved: return None
+    return min(resolved, key=lambda pid: LEVEL_SPECIFICITY.index(store.places[pid][0]))
+
+
+def extract_numeric_claims(store, text):
+    """Numeric claims of the form "<qualifier> <number> <metric> in <place> by <date>", from COVID-19 sentences only."""
+    claims = []
+    default_year = date.fromordinal(date(1970, 1, 1).toordinal() + store.day_max).year
+    for sentence in SENTENCE_REGEX.split(text or ''):
+        if not COVID_TOPIC_REGEX.search(sentence): continue
+        matches = find_claim_matches(sentence)
+        if not matches: continue
+        place_id = resolve_place(store, sentence)
+        if place_id is None: continue
+        dates = find_dates(sentence, default_year)
+        for position, metric, claimed, bound in matches:
+            # Date nearest to the number, if any
+            day = min(dates, key=lambda d: abs(d[0] - position))[1] if dates else None
+            claims.append({"text": sentence.strip()[:300], "metric": metric, "claimed": claimed, "bound": bound, "place_id": place_id, "day": day})
+    return claims
+
+
+# --- VERIFICATION ---
+def compare(claimed, actual, bound):
+    if bound == 'lower':
+        if actual >= claimed: return 'supported'
+        return 'contradicted' if actual < claimed * (1 - CONTRADICT_TOLERANCE) else 'inconclusive'
+    if bound == 'upper':
+        if actual <= claimed: return 'supported'
+        return 'contradicted' if actual > claimed * (1 + CONTRADICT_TOLERANCE) else 'inconclusive'
+    relative_error = abs(actual - claimed) / max(claimed, 1.0)
+    if relative_error <= SUPPORT_TOLERANCE: return 'supported'
+    return 'contradicted' if relative_error > CONTRADICT_TOLERANCE else 'inconclusive'
+
+
+def format_day(day):
+    return str(np.datetime64(int(day), 'D')) if day is not None else None
+
+
+def check_claim(store, claim):
+    level, name, parent = store.places[claim['place_id']]
+    result = {
+        "text": claim['text'], "metric": claim['metric'], "claimed": claim['claimed'], "bound": claim['bound'],
+        "place": name, "level": level, "parent": parent, "date": format_day(claim['day']),
+        "actual": None, "actual_date": None, "verdict": "inconclusive", "reason": None,
+    }
+    if claim['metric'] == 'tests':
+        # Tests only exist in the undated worldometer snapshot
+        actual = store.snapshot_value(claim['place_id'], 'tests')
+        if actual is None: result['reason'] = 'metric_not_available'; return result
+        result['actual'] = actual
+        verdict = compare(claim['claimed'], actual, claim['bound'])
+        result['verdict'] = 'supported' if verdict == 'supported' else 'inconclusive'
+        result['reason'] = 'undated_snapshot'
+        return result
+
+    if claim['day'] is not None and not (store.day_min <= claim['day'] <= store.day_max):
+        result['reason'] = 'date_out_of_range'
+        return result
+
+    actual, actual_day = store.value_at(claim['place_id'], claim['metric'], claim['day'])
+    if actual is None:
+        result['reason'] = 'metric_not_available'
+        return result
+    result['actual'], result['actual_date'] = actual, format_day(actual_day)
+    verdict = compare(claim['claimed'], actual, claim['bound'])
+    if claim['day'] is None:
+        # Undated: a match pins the claim to the dataset's last day, a mismatch may just be a different date
+        result['reason'] = 'date_assumed_latest'
+        if verdict == 'contradicted': verdict = 'inconclusive'
+    result['verdict'] = verdict
+    return result
+
+
+def verify_text(store, text):
+    """Extracts and checks every numeric COVID-19 claim in the text. Pure in-process lookups."""
+    started = time.perf_counter()
+    checks = [check_claim(store, claim) for claim in extract_numeric_claims(store, text)]
+    counts = {v: sum(1 for c in checks if c['verdict'] == v) for v in ('supported', 'contradicted', 'inconclusive')}
+    return {"checked": len(checks), **counts, "claims": checks, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+# --- EXECUTION ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the local COVID-19 statistics store.")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--build', action='store_true', help="Rebuild the columnar store from the CSVs.")
+    parser.add_argument('--query', help="Text whose numeric COVID-19 claims should be checked.")
+    parser.add_argument('--verify-extraction', action='store_true', help="Check claim extraction against CLAIM_REGRESSION_SAMPLES and exit.")
+    args = parser.parse_args()
+
+    if args.verify_extraction:
+        failures = 0
+        for sentence, expected in CLAIM_REGRESSION_SAMPLES:
+            actual = [(metric, claimed, bound) for _, metric, claimed, bound in find_claim_matches(sentence)]
+            if actual != expected:
+                failures += 1
+                print(f"  {sentence!r}\n    expected={expected}\n    actual={actual}")
+        print(f"Claim extraction regression check: {len(CLAIM_REGRESSION_SAMPLES)} samples, {failures} failures.")
+        raise SystemExit(1 if failures else 0)
+
+    if args.build: build_store(args.data_dir)
+    if args.query:
+        store = open_store(args.data_dir)
+        print(json.dumps(verify_text(store, args.query), indent=2))
@@ -0,0 +1,125 @@
+"""
+Benchmark of the two /api/explain modes on the local classifier: LIME vs integrated gradients.
+
+For every text both explainers run on the same (model-visible) input, and the script reports the
+latency of each, the speed-up, and how closely the word rankings agree:
+
+    top-k overlap    share of LIME's top-k words that are also in the gradient top-k
+    spearman         rank correlation of the weights over every word both explainers scored
+    sign agreement   share of LIME's top-k words whose weight has the same sign in both
+
+    python explain_benchmark.py                              # built-in sample headlines
+    python explain_benchmark.py --texts-file articles.txt --steps 8,16,32 --json-out explain.json
+
+LOCAL_MODEL_PATH selects the model exactly as for app.py (which is imported, so the same weights,
+tokenizer and truncation are used).
+"""
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+from scipy.stats import spearmanr
+
+import app as backend
+
+# --- CONFIGURATION ---
+SAMPLE_TEXTS = [
+    "The city council approved a 12 percent increase in the transit budget on Tuesday, officials said, after a three-hour public hearing in which residents complained about delays and overcrowded buses.",
+    "A new study shows coffee consumption doubles life expectancy, according to a viral post that cites no journal and no researchers. Doctors say the claim is not supported by any published evidence.",
+    "The national unemployment rate fell to 3.4 percent last month, the Labor Department reported, the lowest level since 1969, as employers added more jobs than economists had expected.",
+    "Scientists confirmed the discovery of water ice on the lunar south pole using data from a NASA instrument aboard an Indian spacecraft, the agency said in a statement.",
+    "BREAKING: Government secretly admits vaccines contain microchips, insiders reveal shocking truth the mainstream media refuses to report. Share before it gets deleted!",
+    "Over 150,000 people have died of COVID-19 in the United States as of July 2020, according to figures compiled by Johns Hopkins University.",
+]
+DEFAULT_TOP_K = backend.EXPLAIN_NUM_FEATURES
+ALL_FEATURES = 10_000 # ask LIME for every word so rank agreement can be computed over all of them
+
+
+# --- AGREEMENT METRICS ---
+def rank_agreement(lime_weights, gradient_weights, top_k):
+    lime_top = [word for word, _ in lime_weights[:top_k]]
+    gradient_top = {word for word, _ in gradient_weights[:top_k]}
+    lime_all, gradient_all = dict(lime_weights), dict(gradient_weights)
+    shared = [word for word in lime_all if word in gradient_all]
+
+    spearman = None
+    if len(shared) >= 3:
+        spearman = spearmanr([lime_all[w] for w in shared], [gradient_all[w] for w in shared])[0]
+        spearman = None if np.isnan(spearman) else float(spearman)
+    same_sign = [np.sign(lime_all[w]) == np.sign(gradient_all[w]) for w in lime_top if w in gradient_all]
+    return {
+        "top_k_overlap": len(set(lime_top) & gradient_top) / max(1, len(lime_top)),
+        "spearman": spearman,
+        "sign_agreement": float(np.mean(same_sign)) if same_sign else None,
+    }
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def visible_text(text):
+    """The prefix /api/explain would explain (model window, EXPLAIN_MAX_CHARS)."""
+    limit = backend.get_document_encoding(text).visible_char_limit()
+    return text[:min(backend.EXPLAIN_MAX_CHARS, limit or backend.EXPLAIN_MAX_CHARS)]
+
+
+# --- MAIN EXECUTION ---
+def main():
+    parser = argparse.ArgumentParser(description="Compare LIME and integrated-gradient explanations of the local model.")
+    parser.add_argument('--texts-file', help="UTF-8 file with one text per line (default: built-in samples).")
+    parser.add_argument('--limit', type=int, default=None, help="Only use the first N texts.")
+    parser.add_argument('--steps', default=str(backend.EXPLAIN_IG_STEPS), help="Comma-separated integrated-gradient step counts (0 = gradient x input).")
+    parser.add_argument('--lime-samples', type=int, default=backend.LIME_NUM_SAMPLES)
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json-out', help="Write per-text results to this JSON file.")
+    args = parser.parse_args()
+
+    if backend.GLOBAL_MODEL is None:
+        sys.exit(f"No local model at {backend.LOCAL_MODEL_PATH}; set LOCAL_MODEL_PATH.")
+    if args.texts_file:
+        with open(args.texts_file, 'r', encoding='utf-8') as f: texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = SAMPLE_TEXTS
+    texts = [visible_text(text) for text in texts[:args.limit]]
+    step_counts = [int(s) for s in args.steps.split(',') if s.strip()]
+
+    # Warm-up so one-off allocation costs don't land on the first measurement
+    backend.explain_with_gradients(texts[0], steps=max(step_counts))
+    backend.predict_proba_for_lime([texts[0]])
+
+    rows = []
+    for index, text in enumerate(texts):
+        backend.ENCODING_CACHE.clear() # no cache hits carried over between texts or explainers
+        lime_weights, lime_ms = timed(backend.explain_with_lime, text, num_features=ALL_FEATURES, num_samples=args.lime_samples, random_state=args.seed)
+        row = {"text": text[:80], "words": len(lime_weights), "lime_ms": round(lime_ms, 1), "gradients": {}}
+        for steps in step_counts:
+            gradient_weights, gradient_ms = timed(backend.explain_with_gradients, text, num_features=ALL_FEATURES, steps=steps)
+            row["gradients"][steps] = {"ms": round(gradient_ms, 1), "speedup": round(lime_ms / max(gradient_ms, 1e-6), 1),
+                                       **rank_agreement(lime_weights, gradient_weights, args.top_k)}
+        rows.append(row)
+        print(f"[{index + 1}/{len(texts)}] {row['words']} words, LIME {lime_ms:.0f} ms, " +
+              ", ".join(f"IG{steps} {g['ms']:.0f} ms" for steps, g in row["gradients"].items()))
+
+    mean = lambda values: float(np.mean([v for v in values if v is not None])) if any(v is not None for v in values) else float('nan')
+    print(f"\n--- LIME ({args.lime_samples} samples) vs integrated gradients, {len(rows)} texts, top-{args.top_k} ---")
+    print(f"{'method':>10} {'mean ms':>10} {'speedup':>9} {'overlap':>9} {'spearman':>9} {'sign':>7}")
+    print(f"{'lime':>10} {mean([r['lime_ms'] for r in rows]):>10.1f} {'1.0x':>9} {'-':>9} {'-':>9} {'-':>7}")
+    for steps in step_counts:
+        results = [r["gradients"][steps] for r in rows]
+        print(f"{'ig' + str(steps):>10} {mean([g['ms'] for g in results]):>10.1f} {mean([g['speedup'] for g in results]):>8.1f}x "
+              f"{mean([g['top_k_overlap'] for g in results]):>9.2f} {mean([g['spearman'] for g in results]):>9.2f} {mean([g['sign_agreement'] for g in results]):>7.2f}")
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump({"lime_samples": args.lime_samples, "top_k": args.top_k, "steps": step_counts, "results": rows}, f, indent=2)
+        print(f"Results written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Production serving configuration for the TruthChain backend.
+
+    cd backend
+    gunicorn -c gunicorn.conf.py app:app
+
+The app (and the RoBERTa weights) are imported once in the master process and
+workers are forked from it, so the read-only model tensors stay in shared,
+copy-on-write pages instead of one private copy per worker.
+"""
+import gc
+import os
+import threading
+import time
+
+import psutil
+
+# --- CONFIGURATION ---
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', 5001)}")
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8)) # Most request time is spent waiting on Gemini / HTTP
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 300)) # Daily-news analysis can take minutes
+graceful_timeout = 30
+preload_app = True # Load weights in the master before forking (shared copy-on-write pages)
+pidfile = os.getenv("GUNICORN_PIDFILE", None)
+
+# Torch thread budget per worker. Default splits the cores evenly so workers don't oversubscribe.
+TORCH_INTRA_OP_THREADS = int(os.getenv("TORCH_INTRA_OP_THREADS", max(1, (os.cpu_count() or 1) // workers)))
+TORCH_INTER_OP_THREADS = int(os.getenv("TORCH_INTER_OP_THREADS", 1))
+MEMORY_REPORT_INTERVAL_SECONDS = int(os.getenv("MEMORY_REPORT_INTERVAL_SECONDS", 300))
+
+
+# --- MEMORY REPORTING ---
+def describe_process_memory(process):
+    """RSS / PSS / USS in MB. PSS splits shared pages between sharers; USS is memory private to the process."""
+    try:
+        info = process.memory_full_info()
+        pss = getattr(info, 'pss', None) # Only available on Linux
+        return {
+            "pid": process.pid,
+            "rss_mb": round(info.rss / 2**20, 1),
+            "pss_mb": round(pss / 2**20, 1) if pss is not None else None,
+            "uss_mb": round(info.uss / 2**20, 1),
+        }
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return {"pid": process.pid, "rss_mb": None, "pss_mb": None, "uss_mb": None}
+
+
+def log_worker_memory(log):
+    master = psutil.Process(os.getpid())
+    master_mem = describe_process_memory(master)
+    log.info(f"[memory] master pid={master_mem['pid']} rss={master_mem['rss_mb']}MB uss={master_mem['uss_mb']}MB")
+    for child in master.children():
+        mem = describe_process_memory(child)
+        log.info(f"[memory] worker pid={mem['pid']} rss={mem['rss_mb']}MB pss={mem['pss_mb']}MB uss={mem['uss_mb']}MB")
+
+
+# --- SERVER HOOKS ---
+def when_ready(server):
+    if MEMORY_REPORT_INTERVAL_SECONDS <= 0: return
+
+    def report_loop():
+        while True:
+            time.sleep(MEMORY_REPORT_INTERVAL_SECONDS)
+            log_worker_memory(server.log)
+
+    threading.Thread(target=report_loop, name="memory-report", daemon=True).start()
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far (the loaded model included) out of the GC's reach,
+    # so collections in the workers don't write to, and un-share, those pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import torch
+    torch.set_num_threads(TORCH_INTRA_OP_THREADS)
+    try:
+        torch.set_num_interop_threads(TORCH_INTER_OP_THREADS)
+    except RuntimeError as e:
+        server.log.warning(f"Could not set torch inter-op threads in worker {worker.pid}: {e}")
+
+    # Sockets must not be shared across fork; give each worker its own MongoDB client
+    import app as backend_app
+    backend_app.init_mongo_client()
+
+    # Refresher threads do not survive fork; each worker starts its own (only one runs refreshes)
+    backend_app.start_daily_news_scheduler()
+
+
+def post_worker_init(worker):
+    import torch
+    mem = describe_process_memory(psutil.Process(worker.pid))
+    worker.log.info(
+        f"[memory] worker pid={worker.pid} booted with torch threads intra={torch.get_num_threads()} "
+        f"inter={torch.get_num_interop_threads()} rss={mem['rss_mb']}MB uss={mem['uss_mb']}MB"
+    )
@@ -0,0 +1,438 @@
+"""
+End-to-end load-testing harness for the TruthChain backend.
+
+Starts local fake servers that emulate Gemini `generateContent`, the Google
+Fact Check `claims:search` endpoint and the NewsAPI / NewsData feeds, points
+app.py at them through environment variables and sweeps client concurrency
+against `/api/analyze` or `/api/daily-news`.
+
+Example:
+    python load_test.py --endpoint analyze --concurrency 1,4,16,64 --requests 200 \
+        --profile gemini=1500:0.6:0.05 --profile factcheck=120:0.4:0.0
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import subprocess
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# --- CONFIGURATION ---
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+DEFAULT_APP_PORT = 5011
+DEFAULT_FAKE_PORT = 5099
+APP_STARTUP_TIMEOUT_SECONDS = 180
+CLIENT_TIMEOUT_SECONDS = 600
+
+# Default upstream behaviour per service: median latency (ms), lognormal sigma, 503 rate
+DEFAULT_PROFILES = {
+    'gemini': (1500.0, 0.6, 0.02),
+    'factcheck': (150.0, 0.4, 0.0),
+    'news': (200.0, 0.4, 0.0),
+    'article': (100.0, 0.3, 0.0),
+}
+
+SAMPLE_CLAIMS = [
+    "The city council approved a 12 percent increase in the transit budget.",
+    "A new study shows coffee consumption doubles life expectancy.",
+    "The national unemployment rate fell to 3.4 percent last month.",
+    "Scientists confirmed the discovery of water ice on the lunar south pole.",
+]
+
+SAMPLE_RATINGS = ['False', 'True', 'Mostly True', 'Misleading', 'Half True']
+
+
+# --- LATENCY / FAULT PROFILES ---
+class UpstreamProfile:
+    """Lognormal latency distribution plus a probability of answering 503."""
+
+    def __init__(self, median_ms, sigma, error_rate):
+        self.median_ms = float(median_ms)
+        self.sigma = float(sigma)
+        self.error_rate = float(error_rate)
+
+    def sample_delay(self):
+        if self.median_ms <= 0: return 0.0
+        return random.lognormvariate(math.log(self.median_ms), self.sigma) / 1000.0
+
+    def should_fail(self):
+        return random.random() < self.error_rate
+
+    def __repr__(self):
+        return f"median={self.median_ms:.0f}ms sigma={self.sigma:.2f} 503-rate={self.error_rate:.2%}"
+
+
+def parse_profiles(specs):
+    """Parses '--profile service=median_ms[:sigma[:error_rate]]' overrides on top of the defaults."""
+    profiles = {name: UpstreamProfile(*values) for name, values in DEFAULT_PROFILES.items()}
+    for spec in specs or []:
+        name, _, values = spec.partition('=')
+        if name not in profiles:
+            raise ValueError(f"Unknown upstream '{name}'. Choose from: {', '.join(profiles)}")
+        parts = values.split(':')
+        median_ms, sigma, error_rate = DEFAULT_PROFILES[name]
+        if len(parts) > 0 and parts[0]: median_ms = float(parts[0])
+        if len(parts) > 1 and parts[1]: sigma = float(parts[1])
+        if len(parts) > 2 and parts[2]: error_rate = float(parts[2])
+        profiles[name] = UpstreamProfile(median_ms, sigma, error_rate)
+    return profiles
+
+
+# --- FAKE UPSTREAM RESPONSES ---
+def fake_gemini_payload(model_name):
+    """Mimics a generateContent response body. Flash calls extract claims, Pro calls return verdict JSON."""
+    if 'flash' in model_name:
+        text = random.choice(SAMPLE_CLAIMS)
+    else:
+        verdict = random.choice(['true', 'false', 'mixed'])
+        text = "```json\n" + json.dumps({
+            "verdict": verdict,
+            "confidence": round(random.uniform(0.4, 0.95), 2),
+            "summary": f"Simulated {verdict} verdict from the load-test Gemini fake.",
+            "evidence": [{"source": "Load Test Wire", "link": "http://fake.local/evidence", "content": "Simulated evidence",
+                          "credibility": round(random.uniform(0.5, 0.9), 2), "supportVerdict": verdict, "description": "Synthetic"}],
+        }) + "\n```"
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {"promptTokenCount": 500, "candidatesTokenCount": 120, "totalTokenCount": 620},
+        "modelVersion": model_name,
+    }
+
+
+def fake_fact_check_payload():
+    # Roughly a third of claims have no external match, like the real API
+    if random.random() < 0.33: return {}
+    claims = []
+    for _ in range(random.randint(1, 5)):
+        claims.append({
+            "text": random.choice(SAMPLE_CLAIMS),
+            "claimReview": [{"publisher": {"name": "Fake Checker"}, "url": "http://fake.local/review",
+                             "textualRating": random.choice(SAMPLE_RATINGS)}],
+        })
+    return {"claims": claims}
+
+
+def fake_news_articles(base_url, count):
+    articles = []
+    for i in range(count):
+        claim = random.choice(SAMPLE_CLAIMS)
+        articles.append({
+            "title": f"Headline {i}: {claim}",
+            "url": f"{base_url}/article/{random.getrandbits(32):x}",
+            "description": claim,
+            "content": (claim + " ") * 8,
+            "source": {"id": None, "name": "Load Test Wire"},
+            "source_id": "loadtestwire",
+        })
+    return articles
+
+
+def fake_article_html():
+    paragraphs = ''.join(f"<p>{random.choice(SAMPLE_CLAIMS)} Officials said more details would follow.</p>" for _ in range(20))
+    return f"<html><body><article>{paragraphs}</article></body></html>"
+
+
+# --- FAKE UPSTREAM SERVER ---
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass # Keep the harness output readable
+
+    def _send(self, status, body, content_type='application/json'):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _simulate(self, service):
+        """Sleeps for the sampled latency; returns True if a 503 was injected."""
+        profile = self.server.profiles[service]
+        time.sleep(profile.sample_delay())
+        self.server.record(service)
+        if profile.should_fail():
+            self.server.record(service + '_503')
+            self._send(503, {"error": {"code": 503, "message": "The model is overloaded. Please try again later.", "status": "UNAVAILABLE"}})
+            return True
+        return False
+
+    def do_POST(self):
+        path = urllib.parse.urlparse(self.path).path
+        length = int(self.headers.get('Content-Length') or 0)
+        if length: self.rfile.read(length)
+
+        if ':generateContent' in path:
+            if self._simulate('gemini'): return
+            model_name = path.rsplit('/', 1)[-1].split(':')[0]
+            return self._send(200, fake_gemini_payload(model_name))
+        self._send(404, {"error": f"Unknown fake endpoint {path}"})
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path
+        base_url = f"http://{self.headers.get('Host')}"
+
+        if path.endswith('claims:search'):
+            if self._simulate('factcheck'): return
+            return self._send(200, fake_fact_check_payload())
+        if path == '/v2/top-headlines':
+            if self._simulate('news'): return
+            size = int(urllib.parse.parse_qs(parsed.query).get('pageSize', ['5'])[0])
+            articles = fake_news_articles(base_url, size)
+            return self._send(200, {"status": "ok", "totalResults": len(articles), "articles": articles})
+        if path == '/api/1/latest':
+            if self._simulate('news'): return
+            size = int(urllib.parse.parse_qs(parsed.query).get('size', ['5'])[0])
+            return self._send(200, {"status": "success", "results": fake_news_articles(base_url, size)})
+        if path.startswith('/article/'):
+            if self._simulate('article'): return
+            return self._send(200, fake_article_html().encode(), content_type='text/html; charset=utf-8')
+        self._send(404, {"error": f"Unknown fake endpoint {path}"})
+
+
+class FakeUpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, profiles):
+        super().__init__(address, FakeUpstreamHandler)
+        self.profiles = profiles
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot_counts(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+def start_fake_upstreams(port, profiles):
+    server = FakeUpstreamServer(('127.0.0.1', port), profiles)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Fake upstreams listening on http://127.0.0.1:{port}")
+    for name, profile in profiles.items():
+        print(f"  {name:<10} {profile}")
+    return server
+
+
+# --- APP PROCESS MANAGEMENT ---
+def start_app(app_port, fake_base_url, keep_db=False, server='sync'):
+    """Launches app.py (dev server, gunicorn.conf.py, or the async_app.py mode under uvicorn) with every upstream pointed at the fake server."""
+    env = dict(os.environ)
+    env.update({
+        "PORT": str(app_port),
+        "GEMINI_API_KEY": "load-test-key",
+        "GEMINI_BASE_URL": fake_base_url,
+        "FACT_CHECK_API_KEY": "load-test-key",
+        "FACT_CHECK_ENDPOINT": f"{fake_base_url}/v1alpha1/claims:search",
+        "NEWS_API_KEY_NEWSAPI": "load-test-key",
+        "NEW_API_KEY_NEWSDATA": "load-test-key",
+        "NEWSAPI_ENDPOINT": f"{fake_base_url}/v2/top-headlines",
+        "NEWSDATA_ENDPOINT": f"{fake_base_url}/api/1/latest",
+        "INITIAL_BACKOFF_SECONDS": env.get("INITIAL_BACKOFF_SECONDS", "0.5"),
+        "ANALYSIS_DELAY_SECONDS": env.get("ANALYSIS_DELAY_SECONDS", "0"),
+    })
+    if not keep_db:
+        # Empty values win over .env (load_dotenv does not override) and disable Mongo writes
+        env["MONGO_URI"] = ""
+        env["MONGO_DB_NAME"] = ""
+
+    if server == 'async':
+        command = [sys.executable, '-m', 'uvicorn', 'async_app:asgi_app', '--host', '127.0.0.1', '--port', str(app_port), '--log-level', 'warning']
+    elif server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{app_port}', 'app:app']
+    else:
+        command = [sys.executable, APP_SCRIPT]
+    process = subprocess.Popen(command, cwd=os.path.dirname(APP_SCRIPT), env=env)
+    app_url = f"http://127.0.0.1:{app_port}"
+    deadline = time.time() + APP_STARTUP_TIMEOUT_SECONDS
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"app.py exited during startup with code {process.returncode}.")
+        try:
+            requests.get(f"{app_url}/api/analytics/summary", timeout=2)
+            print(f"App is up at {app_url}")
+            return process, app_url
+        except requests.RequestException:
+            time.sleep(1)
+    process.terminate()
+    raise RuntimeError(f"app.py did not start within {APP_STARTUP_TIMEOUT_SECONDS} seconds.")
+
+
+# --- LOAD GENERATION ---
+def build_request(endpoint, input_type, fake_base_url, explain_method=None):
+    if endpoint == 'daily-news':
+        return 'GET', '/api/daily-news', None
+    if endpoint == 'explain':
+        path = '/api/explain'
+    else:
+        path = '/api/analyze'
+    if input_type == 'url':
+        payload = {"input_type": "url", "input_value": f"{fake_base_url}/article/{random.getrandbits(32):x}"}
+    else:
+        body = ' '.join(random.choice(SAMPLE_CLAIMS) for _ in range(12))
+        payload = {"input_type": "text", "input_value": body}
+    if endpoint == 'explain' and explain_method: payload["method"] = explain_method
+    return 'POST', path, payload
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values: return float('nan')
+    index = min(len(sorted_values) - 1, max(0, int(math.ceil(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarise_latencies(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def run_probe(app_url, probe_path, rate, stop_event):
+    """Issues GET `probe_path` at `rate` req/s (one client) until `stop_event` is set: the cheap-endpoint tail under load."""
+    latencies, statuses = [], {}
+    session = requests.Session()
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        try: status = session.get(app_url + probe_path, timeout=CLIENT_TIMEOUT_SECONDS).status_code
+        except requests.RequestException: status = 'conn_error'
+        elapsed = time.perf_counter() - started
+        latencies.append(elapsed)
+        statuses[status] = statuses.get(status, 0) + 1
+        stop_event.wait(max(0.0, 1.0 / rate - elapsed))
+    return {"path": probe_path, "requests": len(latencies), **summarise_latencies(latencies),
+            "status_counts": {str(status): count for status, count in statuses.items()}}
+
+
+def run_level(app_url, concurrency, total_requests, endpoint, input_type, fake_base_url, probe_path=None, probe_rate=5.0, explain_method=None):
+    """Fires `total_requests` calls with `concurrency` in flight (optionally probing a cheap endpoint) and summarises the results."""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    session_local = threading.local()
+
+    def one_call(_):
+        if not hasattr(session_local, 'session'): session_local.session = requests.Session()
+        method, path, payload = build_request(endpoint, input_type, fake_base_url, explain_method)
+        started = time.perf_counter()
+        try:
+            response = session_local.session.request(method, app_url + path, json=payload, timeout=CLIENT_TIMEOUT_SECONDS)
+            status = response.status_code
+        except requests.RequestException:
+            status = 'conn_error'
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    stop_probe = threading.Event()
+    probe_pool = ThreadPoolExecutor(max_workers=1)
+    probe = probe_pool.submit(run_probe, app_url, probe_path, probe_rate, stop_probe) if probe_path else None
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_call, range(total_requests)))
+    wall_elapsed = time.perf_counter() - wall_started
+    stop_probe.set()
+    probe_pool.shutdown()
+
+    errors = sum(count for status, count in statuses.items() if status != 200)
+    row = {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "wall_seconds": round(wall_elapsed, 3),
+        "throughput_rps": round(total_requests / wall_elapsed, 3) if wall_elapsed > 0 else 0.0,
+        **summarise_latencies(latencies),
+        "error_rate": round(errors / total_requests, 4) if total_requests else 0.0,
+        "status_counts": {str(status): count for status, count in statuses.items()},
+    }
+    if probe: row["probe"] = probe.result()
+    return row
+
+
+def print_report(results):
+    print("\n--- Load Test Results ---")
+    print(f"{'conc':>6} {'reqs':>6} {'rps':>9} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'err %':>7}  statuses")
+    for row in results:
+        print(f"{row['concurrency']:>6} {row['requests']:>6} {row['throughput_rps']:>9.2f} {row['p50_ms']:>10.1f} "
+              f"{row['p95_ms']:>10.1f} {row['p99_ms']:>10.1f} {row['error_rate'] * 100:>6.1f}%  {row['status_counts']}")
+        probe = row.get('probe')
+        if probe:
+            print(f"{'probe':>6} {probe['requests']:>6} {'':>9} {probe['p50_ms']:>10.1f} {probe['p95_ms']:>10.1f} "
+                  f"{probe['p99_ms']:>10.1f} {'':>7}  {probe['status_counts']}  {probe['path']}")
+
+
+# --- MAIN EXECUTION ---
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the TruthChain API against local upstream fakes.")
+    parser.add_argument('--endpoint', choices=['analyze', 'daily-news', 'explain'], default='analyze')
+    parser.add_argument('--input-type', choices=['text', 'url'], default='text')
+    parser.add_argument('--explain-method', choices=['lime', 'gradients'], help="Explanation method for --endpoint explain (default: the server's).")
+    parser.add_argument('--concurrency', default='1,4,16', help="Comma-separated concurrency levels to sweep.")
+    parser.add_argument('--requests', type=int, default=50, help="Requests issued per concurrency level.")
+    parser.add_argument('--profile', action='append', metavar='SERVICE=MEDIAN_MS[:SIGMA[:503_RATE]]',
+                        help="Override an upstream profile (gemini, factcheck, news, article). Repeatable.")
+    parser.add_argument('--fake-port', type=int, default=DEFAULT_FAKE_PORT)
+    parser.add_argument('--app-port', type=int, default=DEFAULT_APP_PORT)
+    parser.add_argument('--app-url', help="Target an already running app instead of spawning one (it must use the fakes).")
+    parser.add_argument('--server', choices=['sync', 'gunicorn', 'async'], default='sync', help="Spawn the Flask dev server, gunicorn (gunicorn.conf.py) or the async serving mode (async_app.py).")
+    parser.add_argument('--keep-db', action='store_true', help="Let the spawned app write to the configured MongoDB.")
+    parser.add_argument('--probe', metavar='PATH', help="Also GET this cheap endpoint (e.g. /api/source/example.com) during each level and report its latency.")
+    parser.add_argument('--probe-rate', type=float, default=5.0, help="Probe requests per second.")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json-out', help="Write the raw results to this JSON file.")
+    args = parser.parse_args()
+
+    if args.seed is not None: random.seed(args.seed)
+    profiles = parse_profiles(args.profile)
+    fake_server = start_fake_upstreams(args.fake_port, profiles)
+    fake_base_url = f"http://127.0.0.1:{args.fake_port}"
+
+    app_process = None
+    try:
+        if args.app_url:
+            app_url = args.app_url.rstrip('/')
+        else:
+            app_process, app_url = start_app(args.app_port, fake_base_url, keep_db=args.keep_db, server=args.server)
+
+        results = []
+        for level in [int(c) for c in args.concurrency.split(',') if c.strip()]:
+            print(f"\nRunning {args.requests} x {args.endpoint} ({args.input_type}) at concurrency {level}...")
+            row = run_level(app_url, level, args.requests, args.endpoint, args.input_type, fake_base_url, args.probe, args.probe_rate, args.explain_method)
+            row["upstream_calls"] = fake_server.snapshot_counts()
+            results.append(row)
+            print(f"  {row['throughput_rps']:.2f} req/s, p95 {row['p95_ms']:.0f} ms, errors {row['error_rate']:.1%}")
+
+        print_report(results)
+        print(f"\nUpstream calls served by fakes (cumulative): {fake_server.snapshot_counts()}")
+
+        if args.json_out:
+            with open(args.json_out, 'w') as f:
+                json.dump({"endpoint": args.endpoint, "input_type": args.input_type,
+                           "profiles": {name: vars(p) for name, p in profiles.items()}, "results": results}, f, indent=2)
+            print(f"Results written to {args.json_out}")
+    finally:
+        if app_process is not None:
+            app_process.terminate()
+            try: app_process.wait(timeout=10)
+            except subprocess.TimeoutExpired: app_process.kill()
+        fake_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
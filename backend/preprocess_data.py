@@ -3,20 +3,91 @@ import numpy as np
 import os
 import re
 import csv
-from sklearn.model_selection import train_test_split
+import time
+import json
+import math
+import hashlib
+import argparse
+import threading
+import psutil
+import pyarrow as pa
+import pyarrow.parquet as pq
 from transformers import AutoTokenizer 
 # --- NEW IMPORTS FOR CPU SPEEDUP ---
-import swifter
 import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 # -----------------------------------
 
 # --- CONFIGURATION ---
 # Base path where your data files reside
 BASE_PATH = r'C:\Users\DELL\Desktop\truthChain\backend\data-sets'
-OUTPUT_FILE = 'unified_fake_news_data.csv'
+OUTPUT_FILE = 'unified_fake_news_data.parquet'
+LEGACY_CSV_OUTPUT_FILE = 'unified_fake_news_data.csv'
 MODEL_NAME = 'roberta-base' 
 SEPARATOR = " [SEP] " # Separator token for headline and body
 
+# Columnar artifact consumed directly by train_model.py
+UNIFIED_SCHEMA = pa.schema([
+    pa.field('content', pa.string(), nullable=False),
+    pa.field('label', pa.int8(), nullable=False),
+])
+PARQUET_COMPRESSION = 'zstd'
+# Per-source cleaned shard (the raw text is kept for --verify-cleaning)
+SHARD_SCHEMA = pa.schema([
+    pa.field('raw_content', pa.string(), nullable=False),
+    pa.field('content', pa.string(), nullable=False),
+    pa.field('label', pa.int8(), nullable=False),
+])
+DEDUP_DIGEST_SIZE = 16 # bytes of blake2b remembered per unique cleaned text
+
+# Only the columns we use are parsed, with explicit dtypes (no per-cell type inference)
+LIAR_COLUMNS = ['ID', 'label', 'statement', 'subject', 'speaker', 'job_title', 
+                'state_info', 'party', 'bt_count', 'f_count', 'ht_count', 
+                'mt_count', 'pof_count', 'context']
+LIAR_USECOLS = ['label', 'statement', 'speaker']
+LIAR_DTYPES = {'label': 'string', 'statement': 'string', 'speaker': 'string'}
+NEWS_TEXT_COLUMNS = ['title', 'text', 'news_content']
+
+# Sources in concatenation order (drop_duplicates keeps the first occurrence): (file, kind, fixed label)
+SOURCE_FILES = [
+    ('train.tsv', 'liar', None), ('test.tsv', 'liar', None), ('valid.tsv', 'liar', None),
+    ('gossipcop_fake.csv', 'news', 0), ('gossipcop_real.csv', 'news', 1),
+    ('politifact_fake.csv', 'news', 0), ('politifact_real.csv', 'news', 1),
+]
+
+# Cleaned per-source shards + manifest (checksum, size, mtime, row count) for incremental runs.
+# Bump PIPELINE_VERSION whenever loading or cleaning logic changes, to invalidate every shard.
+PREPROCESS_CACHE_DIR = 'preprocess_cache'
+MANIFEST_FILE = 'manifest.json'
+PIPELINE_VERSION = 1
+
+# Per-source profile: process RSS is sampled, since pandas' C parser and pyarrow allocate outside
+# the Python heap (tracemalloc would not see them). Cleaning in the pool workers is not included.
+RSS_SAMPLE_SECONDS = 0.005
+
+# Streaming, multi-core cleaning: sources are read in CLEAN_CHUNK_SIZE-row chunks, cleaned in a process
+# pool and appended to their shard as they finish. At most CLEAN_MAX_IN_FLIGHT chunks are read ahead,
+# so peak memory depends on the chunk window, not on the size of the source.
+CLEAN_NUM_WORKERS = int(os.getenv('CLEAN_NUM_WORKERS', multiprocessing.cpu_count()))
+CLEAN_CHUNK_SIZE = int(os.getenv('CLEAN_CHUNK_SIZE', 5000))
+CLEAN_MAX_IN_FLIGHT = CLEAN_NUM_WORKERS * 2
+
+# Cleaning patterns (shared by the reference and the fused cleaner)
+URL_REGEX = r'http\S+|www\S+|https\S+'
+PUNCT_REGEX = r'[\\!\\"#$%&()\\*+/;<=>?@\\[\\]^_`{|}~\\n\\r\\t]'
+# One scan instead of three: every URL / punctuation match and every whitespace run becomes a
+# single space, which is what the URL -> punctuation -> whitespace-collapse passes produce in sequence.
+# Kept as a string so pandas runs it on the same regex engine as the reference passes.
+FUSED_CLEAN_REGEX = r'(?:\s|' + URL_REGEX + '|' + PUNCT_REGEX + ')+'
+
+# Tricky inputs always added to the --verify-cleaning sample
+CLEANING_REGRESSION_SAMPLES = [
+    "", "   ", "nan", "Visit HTTPS://Example.com/a?b=1 now!!", "www.site.org\tand\nmore\r\n",
+    "}~\\n\\r\\t] literal", "http", "a  http://x  b", "[brackets] {braces} | pipes ^ carets",
+    "\u00a0non-breaking\u2003spaces\u00a0", "\u0130stanbul CAFÉ", "tail https://t.co/xyz",
+]
+
 # --- DATA CLEANING UTILITY (Optimized for Vectorization) ---
 def map_liar_labels(label):
     """
@@ -49,11 +120,10 @@ def clean_text_optimized(series):
     
     # 2. Vectorized URL removal (fast regex)
     # The '|' separator is used to combine complex cleaning into one .str.replace
-    text_series = text_series.str.replace(r'http\S+|www\S+|https\S+', ' ', regex=True)
+    text_series = text_series.str.replace(URL_REGEX, ' ', regex=True)
     
     # 3. Vectorized removal of special characters
     # Replaces the slow re.sub loop in the old function
-    PUNCT_REGEX = r'[\\!\\"#$%&()\\*+/;<=>?@\\[\\]^_`{|}~\\n\\r\\t]'
     text_series = text_series.str.replace(PUNCT_REGEX, ' ', regex=True)
     
     # 4. Collapse multiple spaces and strip ends (fast regex)
@@ -61,125 +131,345 @@ def clean_text_optimized(series):
     
     return text_series
 
+
+# --- MULTI-CORE CLEANING ---
+def clean_chunk(values):
+    """Fused single-scan equivalent of clean_text_optimized for one chunk of already-stringified values."""
+    text_series = pd.Series(values, dtype=str).str.lower()
+    return text_series.str.replace(FUSED_CLEAN_REGEX, ' ', regex=True).str.strip().tolist()
+
+
+def clean_chunks(chunks, executor=None):
+    """
+    Yields (chunk, cleaned values) for a stream of frames with a 'content' column, in input order.
+    With an executor the chunks are cleaned on all cores, with at most CLEAN_MAX_IN_FLIGHT of them
+    read ahead; the caller consumes each result before the next chunk is read.
+    """
+    if executor is None:
+        for chunk in chunks: yield chunk, clean_chunk(chunk['content'].astype(str).tolist())
+        return
+
+    in_flight = deque()
+    for chunk in chunks:
+        if len(in_flight) >= CLEAN_MAX_IN_FLIGHT:
+            done, future = in_flight.popleft()
+            yield done, future.result()
+        in_flight.append((chunk, executor.submit(clean_chunk, chunk['content'].astype(str).tolist())))
+    while in_flight:
+        done, future = in_flight.popleft()
+        yield done, future.result()
+
+
+def clean_text_parallel(series, executor=None, chunk_size=CLEAN_CHUNK_SIZE):
+    """Same output as clean_text_optimized for an in-memory Series, cleaned chunk by chunk (see clean_chunks)."""
+    values = series.astype(str).fillna("")
+    frames = (pd.DataFrame({'content': values.iloc[start:start + chunk_size]}) for start in range(0, len(values), chunk_size))
+    cleaned = [text for _, part in clean_chunks(frames, executor) for text in part]
+    return pd.Series(cleaned, index=series.index, dtype=object)
+
+
+def make_cleaning_executor():
+    # Worker processes are only started on the first submit, so fully cached runs pay nothing
+    return ProcessPoolExecutor(max_workers=CLEAN_NUM_WORKERS) if CLEAN_NUM_WORKERS > 1 else None
+
+
+def verify_cleaning(df, sample_size, executor=None):
+    """Regression check: the fused/parallel cleaner must be byte-identical to clean_text_optimized."""
+    sample = df['content'].sample(n=min(sample_size, len(df)), random_state=42) if len(df) else df['content']
+    sample = pd.concat([sample.astype(str), pd.Series(CLEANING_REGRESSION_SAMPLES)], ignore_index=True)
+    expected = clean_text_optimized(sample).tolist()
+    start_time = time.perf_counter()
+    actual = clean_text_parallel(sample, executor, chunk_size=max(1, len(sample) // max(1, CLEAN_NUM_WORKERS))).tolist()
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a.encode() != b.encode()]
+    print(f"\nCleaning regression check: {len(sample)} samples, {len(mismatches)} mismatches "
+          f"({time.perf_counter() - start_time:.3f}s parallel).")
+    for i in mismatches[:5]: print(f"  input={sample.iloc[i]!r}\n    expected={expected[i]!r}\n    actual={actual[i]!r}")
+    return not mismatches
+
+# --- LOAD PROFILING ---
+class RssSampler:
+    """Peak resident set size of this process while the `with` block runs, sampled every RSS_SAMPLE_SECONDS."""
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.start_rss = self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval): self._sample()
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = self.process.memory_info().rss
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def profiled_load(name, loader, load_report):
+    """Runs `loader()` (returns a row count) and records wall-clock, peak RSS and RSS growth for that source file."""
+    started = time.perf_counter()
+    with RssSampler() as rss:
+        rows = loader()
+    elapsed = time.perf_counter() - started
+    if load_report is not None:
+        load_report.append({"source": name, "rows": rows, "seconds": round(elapsed, 3),
+                            "peak_rss_mb": round(rss.peak_rss / 2**20, 1), "rss_growth_mb": round((rss.peak_rss - rss.start_rss) / 2**20, 1)})
+    return rows
+
+
+def print_load_report(load_report):
+    print("\n--- Source Load Report (main process RSS; pool workers not included) ---")
+    print(f"{'source':<22} {'rows':>9} {'seconds':>9} {'peak RSS MB':>12} {'+RSS MB':>9}")
+    for row in load_report:
+        print(f"{row['source']:<22} {row['rows']:>9} {row['seconds']:>9.3f} {row['peak_rss_mb']:>12.1f} {row['rss_growth_mb']:>9.1f}")
+
+
+def read_liar_tsv(path, chunksize=CLEAN_CHUNK_SIZE):
+    # C parser: QUOTE_NONE + on_bad_lines='skip' behave like the old python engine, at native speed
+    # (no usecols: it would make the parser accept, rather than skip, rows with extra fields)
+    reader = pd.read_csv(path, sep='\t', header=None, names=LIAR_COLUMNS, dtype=LIAR_DTYPES,
+                         on_bad_lines='skip', engine='c', quoting=csv.QUOTE_NONE, chunksize=chunksize)
+    for chunk in reader: yield chunk[LIAR_USECOLS]
+
+
+def read_news_csv(path, chunksize=CLEAN_CHUNK_SIZE):
+    # Quoted multi-line article bodies need the C parser (pyarrow's reader rejects newlines in values)
+    yield from pd.read_csv(path, usecols=lambda column: column in NEWS_TEXT_COLUMNS,
+                           dtype={column: 'string' for column in NEWS_TEXT_COLUMNS}, engine='c', chunksize=chunksize)
+
+
+# --- PER-SOURCE PROCESSING (ONE CHUNK AT A TIME) ---
+def prepare_liar_chunk(df_liar):
+    # --- OPTIMIZATION POINT: Use .map() for label cleaning (vectorized) ---
+    labels = df_liar['label'].map(map_liar_labels)
+    keep = labels.notna()
+    df_liar = df_liar[keep]
+
+    # Combine text fields (vectorized operations are fast)
+    content = df_liar['statement'].fillna("").astype(str) + SEPARATOR + "Claimed by " + df_liar['speaker'].fillna("unknown speaker").astype(str)
+    return pd.DataFrame({'content': content, 'label': labels[keep].astype(int)})
+
+
+def prepare_news_chunk(df, filename, label_value, warn=False):
+    if 'text' not in df.columns:
+        if 'news_content' in df.columns:
+             df = df.rename(columns={'news_content': 'text'})
+        else:
+             if warn: print(f"WARNING: '{filename}' missing 'text' column. Using only 'title' for content.")
+             df = df.assign(text=df['title'])
+
+    # Combine text fields (vectorized operations are fast)
+    content = df['title'].fillna("").astype(str) + SEPARATOR + df['text'].fillna("").astype(str)
+    return pd.DataFrame({'content': content, 'label': label_value})
+
+
+def iter_source_chunks(path, filename, kind, label_value):
+    """The source file as a stream of (content, label) frames of at most CLEAN_CHUNK_SIZE rows."""
+    if kind == 'liar':
+        for chunk in read_liar_tsv(path): yield prepare_liar_chunk(chunk)
+    else:
+        for index, chunk in enumerate(read_news_csv(path)): yield prepare_news_chunk(chunk, filename, label_value, warn=index == 0)
+
+
+def build_source_shard(base_path, filename, kind, label_value, shard_path, executor=None):
+    """
+    Streams one source file into its cleaned shard (read, cleaned and written chunk by chunk) and
+    returns the row count. Cleaning is row-wise, so doing it per chunk gives the same rows as
+    cleaning the concatenated corpus. The shard is replaced atomically once complete.
+    """
+    path = os.path.join(base_path, filename)
+    tmp_path = shard_path + '.tmp'
+    rows = 0
+    # --- OPTIMIZATION POINT: Fused single-scan cleaning, chunked across all cores ---
+    with pq.ParquetWriter(tmp_path, SHARD_SCHEMA, compression=PARQUET_COMPRESSION) as writer:
+        for chunk, cleaned in clean_chunks(iter_source_chunks(path, filename, kind, label_value), executor):
+            if not len(chunk): continue
+            writer.write_table(pa.table({
+                'raw_content': chunk['content'].astype(str).tolist(),
+                'content': cleaned,
+                'label': pa.array(chunk['label'].to_numpy(dtype='int8')),
+            }, schema=SHARD_SCHEMA))
+            rows += len(chunk)
+    os.replace(tmp_path, shard_path)
+    return rows
+
+
+# --- STREAMED UNIFICATION ---
+def write_unified_parquet(shard_paths, output_path):
+    """
+    Concatenates the shards (in SOURCE_FILES order) into the unified Parquet file one batch at a
+    time. The first occurrence of each cleaned text is kept, remembered as a DEDUP_DIGEST_SIZE-byte
+    blake2b digest rather than the text, and texts of 10 characters or less are dropped.
+    Returns the label counts of the written rows.
+    """
+    seen, label_counts = set(), {}
+    tmp_path = output_path + '.tmp'
+    # pre_buffer=False: with read-ahead, pyarrow keeps every row group it has read buffered
+    with pq.ParquetWriter(tmp_path, UNIFIED_SCHEMA, compression=PARQUET_COMPRESSION) as writer:
+        for shard_path in shard_paths:
+            for batch in pq.ParquetFile(shard_path, pre_buffer=False).iter_batches(batch_size=CLEAN_CHUNK_SIZE, columns=['content', 'label']):
+                contents, labels = batch.column('content').to_pylist(), batch.column('label').to_pylist()
+                keep = []
+                for index, text in enumerate(contents):
+                    # Drop rows whose content became empty or too short after cleaning
+                    if text is None or len(text) <= 10: continue
+                    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=DEDUP_DIGEST_SIZE).digest()
+                    if digest in seen: continue
+                    seen.add(digest)
+                    keep.append(index)
+                if not keep: continue
+                writer.write_table(pa.table({'content': [contents[i] for i in keep], 'label': pa.array([labels[i] for i in keep], pa.int8())}, schema=UNIFIED_SCHEMA))
+                for i in keep: label_counts[labels[i]] = label_counts.get(labels[i], 0) + 1
+    os.replace(tmp_path, output_path)
+    return label_counts
+
+
+def write_legacy_csv(parquet_path, csv_path):
+    """Streams the unified Parquet file into the legacy CSV."""
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        for index, batch in enumerate(pq.ParquetFile(parquet_path, pre_buffer=False).iter_batches(batch_size=CLEAN_CHUNK_SIZE)):
+            batch.to_pandas().to_csv(f, index=False, header=index == 0)
+
+
+# --- INCREMENTAL MANIFEST ---
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(8 * 2**20), b''): digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(cache_dir):
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f: manifest = json.load(f)
+        if manifest.get('pipeline_version') == PIPELINE_VERSION: return manifest
+        print("Preprocessing pipeline changed since the last run. Rebuilding all shards.")
+    return {'pipeline_version': PIPELINE_VERSION, 'sources': {}}
+
+
+def save_manifest(cache_dir, manifest):
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f: json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def source_is_unchanged(path, entry, shard_path):
+    """Compares against the manifest; the checksum is only recomputed if size or mtime moved."""
+    if not entry or not os.path.exists(shard_path): return False, None
+    stat = os.stat(path)
+    if stat.st_size == entry.get('size') and stat.st_mtime_ns == entry.get('mtime_ns'):
+        return True, entry['checksum']
+    checksum = file_checksum(path)
+    return checksum == entry.get('checksum'), checksum
+
+
 # --- MAIN DATA LOADING AND UNIFICATION (Optimized) ---
-def load_and_unify_datasets(base_path):
+def load_and_unify_datasets(base_path, output_path, load_report=None, use_cache=True):
+    """Builds (or reuses) every cleaned source shard, then streams them into `output_path`. Returns the label counts."""
     print("Starting data loading and unification...")
-    all_dataframes = []
+    cache_dir = os.path.join(base_path, PREPROCESS_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = load_manifest(cache_dir) if use_cache else {'pipeline_version': PIPELINE_VERSION, 'sources': {}}
 
-    # --- 1. LIAR Dataset (TSV files) ---
-    try:
-        liar_cols = ['ID', 'label', 'statement', 'subject', 'speaker', 'job_title', 
-                     'state_info', 'party', 'bt_count', 'f_count', 'ht_count', 
-                     'mt_count', 'pof_count', 'context']
-        
-        # Loading remains the same, as file I/O is hard to optimize
-        df_liar_train = pd.read_csv(os.path.join(base_path, 'train.tsv'), sep='\t', header=None, names=liar_cols, on_bad_lines='skip', engine='python', quoting=csv.QUOTE_NONE)
-        df_liar_test = pd.read_csv(os.path.join(base_path, 'test.tsv'), sep='\t', header=None, names=liar_cols, on_bad_lines='skip', engine='python', quoting=csv.QUOTE_NONE)
-        df_liar_valid = pd.read_csv(os.path.join(base_path, 'valid.tsv'), sep='\t', header=None, names=liar_cols, on_bad_lines='skip', engine='python', quoting=csv.QUOTE_NONE)
-        
-        df_liar = pd.concat([df_liar_train, df_liar_test, df_liar_valid], ignore_index=True)
-        
-        # --- OPTIMIZATION POINT: Use .map() for label cleaning (vectorized) ---
-        df_liar['label'] = df_liar['label'].map(map_liar_labels) 
-        df_liar.dropna(subset=['label'], inplace=True)
-        
-        # Combine text fields (vectorized operations are fast)
-        df_liar['content'] = df_liar['statement'].fillna("").astype(str) + SEPARATOR + "Claimed by " + df_liar['speaker'].fillna("unknown speaker").astype(str)
-        df_liar = df_liar[['content', 'label']]
-        df_liar['label'] = df_liar['label'].astype(int)
-        all_dataframes.append(df_liar)
-        print(f"LIAR loaded: {len(df_liar)} samples.")
-    except Exception as e:
-        print(f"ERROR LOADING LIAR DATASET: {e}. Skipping LIAR.")
-    
-    # --- 2. GossipCop and PolitiFact (Assuming CSV files) ---
-    
-    gossip_politifact_files = [
-        ('gossipcop_fake.csv', 0), ('gossipcop_real.csv', 1),
-        ('politifact_fake.csv', 0), ('politifact_real.csv', 1)
-    ]
-    
-    df_combined_news = []
-    
-    for filename, label_value in gossip_politifact_files:
-        try:
-            df = pd.read_csv(os.path.join(base_path, filename))
-            df['label'] = label_value
-            
-            if 'text' not in df.columns:
-                if 'news_content' in df.columns:
-                     df.rename(columns={'news_content': 'text'}, inplace=True)
-                else:
-                     print(f"WARNING: '{filename}' missing 'text' column. Using only 'title' for content.")
-                     df['text'] = df['title']
-            
-            # Combine text fields (vectorized operations are fast)
-            df['content'] = df['title'].fillna("").astype(str) + SEPARATOR + df['text'].fillna("").astype(str)
-            df_combined_news.append(df[['content', 'label']])
-            print(f"Successfully loaded {filename}.")
-
-        except FileNotFoundError:
+    shard_paths = []
+    executor = make_cleaning_executor()
+    for filename, kind, label_value in SOURCE_FILES:
+        path = os.path.join(base_path, filename)
+        shard_path = os.path.join(cache_dir, filename + '.parquet')
+        if not os.path.exists(path):
             print(f"WARNING: File {filename} not found. Ensure file extension is .csv (not .xlsx). Skipping.")
+            continue
+
+        try:
+            unchanged, checksum = source_is_unchanged(path, manifest['sources'].get(filename), shard_path) if use_cache else (False, None)
+            if unchanged:
+                rows = pq.ParquetFile(shard_path).metadata.num_rows
+                print(f"{filename} unchanged, reusing cleaned shard ({rows} samples).")
+                if load_report is not None:
+                    load_report.append({"source": f"{filename} (cached)", "rows": rows, "seconds": 0.0, "peak_rss_mb": 0.0, "rss_growth_mb": 0.0})
+            else:
+                start_time = time.perf_counter()
+                rows = profiled_load(filename, lambda: build_source_shard(base_path, filename, kind, label_value, shard_path, executor), load_report)
+                print(f"Cleaned {filename}: {rows} rows in {time.perf_counter() - start_time:.2f}s.")
+                stat = os.stat(path)
+                manifest['sources'][filename] = {
+                    'checksum': checksum or file_checksum(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                    'rows': rows, 'shard': os.path.basename(shard_path), 'processed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                }
+            shard_paths.append(shard_path)
         except Exception as e:
             print(f"ERROR PROCESSING {filename}: {e}. Skipping.")
 
-    if df_combined_news:
-        df_gossip_politifact = pd.concat(df_combined_news, ignore_index=True)
-        all_dataframes.append(df_gossip_politifact)
-        print(f"GossipCop/PolitiFact total loaded: {len(df_gossip_politifact)} samples.")
+    if executor is not None: executor.shutdown()
+    save_manifest(cache_dir, manifest)
     
-    
-    # 3. Combine All DataFrames and Finalize
-    if not all_dataframes:
-        print("FATAL: No data was successfully loaded. Returning empty DataFrame.")
-        return pd.DataFrame({'content': [], 'label': []})
-
-    df_combined = pd.concat(all_dataframes, ignore_index=True)
-    df_combined.drop_duplicates(subset=['content'], inplace=True)
-    
-    # --- OPTIMIZATION POINT: Use the vectorized cleaning function ---
-    df_combined['content'] = clean_text_optimized(df_combined['content'])
-    
-    # Drop rows where content might have become empty or ambiguous after cleaning
-    df_combined.replace('', np.nan, inplace=True) 
-    df_combined.dropna(subset=['content', 'label'], inplace=True)
-    
-    # Final cleanup of samples that became too short
-    df_combined = df_combined[df_combined['content'].str.len() > 10] 
-    
-    df_combined['label'] = df_combined['label'].astype(int)
+    # 3. Combine the shards and finalize (streamed: shards are already clean)
+    if not shard_paths:
+        print("FATAL: No data was successfully loaded. Writing an empty unified file.")
 
-    print(f"Total Unified Samples: {len(df_combined)}.")
+    label_counts = write_unified_parquet(shard_paths, output_path)
+    print(f"Total Unified Samples: {sum(label_counts.values())}.")
     
-    return df_combined
+    return label_counts
 
 # --- EXECUTION ---
 if __name__ == "__main__":
-    # Ensure 'swifter' is configured to use all available CPU cores
-    # This line sets up swifter to use a specified number of CPU cores for parallel processing.
-    # We use all available cores for maximum speedup.
-    # Note: swifter.set_n_workers(n_workers) can be used if you want to limit cores.
-    # For now, we'll keep the execution section focused on the data loading.
+    # Text cleaning runs in a process pool (CLEAN_NUM_WORKERS, default: all cores).
+    # The __main__ guard is required for the pool on Windows (spawn start method).
+
+    parser = argparse.ArgumentParser(description="Load, clean and unify the fake news datasets.")
+    parser.add_argument('--data-dir', default=BASE_PATH)
+    parser.add_argument('--also-csv', action='store_true', help="Additionally write the legacy unified CSV.")
+    parser.add_argument('--full-rebuild', action='store_true', help="Ignore the manifest and reprocess every source file.")
+    parser.add_argument('--verify-cleaning', type=int, default=0, metavar='N',
+                        help="Check the parallel cleaner against clean_text_optimized on N sampled rows and exit.")
+    args = parser.parse_args()
+
+    if args.verify_cleaning:
+        raw = pd.concat([pd.read_parquet(os.path.join(args.data_dir, PREPROCESS_CACHE_DIR, f + '.parquet'), columns=['raw_content'])
+                         for f, _, _ in SOURCE_FILES if os.path.exists(os.path.join(args.data_dir, PREPROCESS_CACHE_DIR, f + '.parquet'))]
+                        or [pd.DataFrame({'raw_content': []})], ignore_index=True)
+        executor = make_cleaning_executor()
+        ok = verify_cleaning(raw.rename(columns={'raw_content': 'content'}), args.verify_cleaning, executor)
+        if executor is not None: executor.shutdown()
+        raise SystemExit(0 if ok else 1)
 
-    df_unified = load_and_unify_datasets(BASE_PATH)
+    # The unified, clean data is streamed into a compressed Parquet file with an explicit schema
+    load_report = []
+    final_output_path = os.path.join(args.data_dir, OUTPUT_FILE)
+    label_counts = load_and_unify_datasets(args.data_dir, final_output_path, load_report, use_cache=not args.full_rebuild)
+    print_load_report(load_report)
     
     # Display label balance
     print("\nLabel Distribution (0=Fake, 1=Real):")
-    print(df_unified['label'].value_counts())
-    
-    # Save the unified, clean data to a single CSV file
-    final_output_path = os.path.join(BASE_PATH, OUTPUT_FILE)
-    df_unified.to_csv(final_output_path, index=False)
+    for label, count in sorted(label_counts.items(), key=lambda item: -item[1]): print(f"{label}    {count}")
     print(f"\n--- Successfully saved unified data to: {final_output_path} ---")
 
+    if args.also_csv:
+        csv_output_path = os.path.join(args.data_dir, LEGACY_CSV_OUTPUT_FILE)
+        write_legacy_csv(final_output_path, csv_output_path)
+        print(f"--- Legacy CSV written to: {csv_output_path} ---")
+
     # --- Next Step Preparation (Train/Test Split) ---
     
-    # Split the final dataset for training purposes (80/20 split)
-    if len(df_unified) > 10: # Ensure enough samples to split
-        df_train, df_test = train_test_split(df_unified, test_size=0.2, stratify=df_unified['label'], random_state=42)
+    # Sizes of the 80/20 split train_model.py makes (the test share is rounded up, as train_test_split does)
+    total_samples = sum(label_counts.values())
+    if total_samples > 10: # Ensure enough samples to split
+        test_size = math.ceil(total_samples * 0.2)
         
-        print(f"\nTraining Set Size: {len(df_train)}")
-        print(f"Testing Set Size: {len(df_test)}")
+        print(f"\nTraining Set Size: {total_samples - test_size}")
+        print(f"Testing Set Size: {test_size}")
         
         print("\nData is ready for BERT/RoBERTa Fine-Tuning (Step 2).")
     else:
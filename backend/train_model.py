@@ -1,25 +1,51 @@
 import pandas as pd
 import numpy as np
 import os
+import json
+import time
+import hashlib
+import argparse
 import torch
+import torch.nn.functional as F
+import pyarrow.parquet as pq
 import evaluate # Hugging Face library for metrics
 
-from datasets import Dataset
+from datasets import Dataset, load_from_disk
 from transformers import (
     AutoTokenizer, 
     AutoModelForSequenceClassification, 
     TrainingArguments, 
-    Trainer
+    Trainer,
+    TrainerCallback,
+    DataCollatorWithPadding
 )
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, f1_score
 
 # --- CONFIGURATION ---
 BASE_PATH = r'C:\Users\DELL\Desktop\truthChain\backend\data-sets'
-INPUT_FILE = 'unified_fake_news_data.csv'
+INPUT_FILE = 'unified_fake_news_data.parquet' # Written by preprocess_data.py
+LEGACY_INPUT_FILE = 'unified_fake_news_data.csv'
 OUTPUT_MODEL_DIR = './models/roberta_finetuned/final'
 MODEL_NAME = "roberta-base"
 
+MAX_LENGTH = 512
+
+# Tokenized Arrow datasets are cached under BASE_PATH, keyed by a fingerprint of data + tokenizer + settings
+TOKENIZED_CACHE_DIR = 'tokenized_cache'
+TOKENIZE_NUM_PROC = os.cpu_count() or 1
+
+# 'dynamic' pads per batch and groups similar lengths together; 'max_length' is the old fixed 512 padding
+PADDING_MODE = 'dynamic'
+
+# --- DISTILLATION CONFIGURATION ---
+TEACHER_MODEL_DIR = './models/roberta_finetuned_final'   # The model app.py serves today
+DISTILLED_MODEL_DIR = './models/roberta_distilled_final' # Same layout, loadable via LOCAL_MODEL_PATH
+STUDENT_NUM_LAYERS = 6
+DISTILL_TEMPERATURE = 2.0
+DISTILL_ALPHA = 0.7 # Weight of the soft-target (teacher) loss vs. the hard-label loss
+LATENCY_SAMPLE_SIZE = 200
+
 # --- 1. METRICS DEFINITION ---
 # Function to compute evaluation metrics (accuracy and F1 score)
 def compute_metrics(eval_pred):
@@ -36,23 +62,51 @@ def compute_metrics(eval_pred):
         'f1_score': f1_score(labels, preds),
     }
 
+# --- TRAINING THROUGHPUT REPORTING ---
+class EpochThroughputCallback(TrainerCallback):
+    """Records wall-clock and samples/second for every epoch so padding strategies can be compared."""
+
+    def __init__(self, num_train_samples):
+        self.num_train_samples = num_train_samples
+        self.epoch_started = None
+        self.epochs = []
+
+    def on_epoch_begin(self, args, state, control, **kwargs):
+        self.epoch_started = time.perf_counter()
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        elapsed = time.perf_counter() - self.epoch_started
+        self.epochs.append({"epoch": round(state.epoch or len(self.epochs) + 1, 2), "wall_seconds": round(elapsed, 2),
+                            "samples_per_second": round(self.num_train_samples / elapsed, 2) if elapsed > 0 else 0.0})
+        print(f"Epoch {self.epochs[-1]['epoch']}: {elapsed:.1f}s wall-clock, {self.epochs[-1]['samples_per_second']} samples/s")
+
+
+def padding_training_kwargs(padding_mode):
+    """TrainingArguments needed for the chosen padding strategy."""
+    # Length-grouped sampling keeps similarly sized samples in a batch, so per-batch padding stays small
+    return {"group_by_length": padding_mode == 'dynamic'}
+
+
+def build_data_collator(tokenizer, padding_mode):
+    if padding_mode == 'dynamic':
+        return DataCollatorWithPadding(tokenizer, pad_to_multiple_of=8 if torch.cuda.is_available() else None)
+    return None # Samples are already padded to 512
+
+
+def print_throughput_report(train_metrics, epoch_callback, padding_mode):
+    print(f"\n--- Training Throughput ({padding_mode} padding) ---")
+    print(f"Total train runtime: {train_metrics.get('train_runtime', 0):.1f}s, "
+          f"{train_metrics.get('train_samples_per_second', 0):.2f} samples/s")
+    for epoch in epoch_callback.epochs:
+        print(f"  epoch {epoch['epoch']}: {epoch['wall_seconds']}s, {epoch['samples_per_second']} samples/s")
+
+
 # --- 2. DATA LOADING AND TOKENIZATION ---
-def prepare_data_and_model():
+def prepare_data_and_model(base_path=BASE_PATH, padding_mode=PADDING_MODE, use_cache=True):
     # Set device to GPU if available, otherwise CPU
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"Using device: {device}")
     
-    # Load the unified dataset
-    data_path = os.path.join(BASE_PATH, INPUT_FILE)
-    if not os.path.exists(data_path):
-        raise FileNotFoundError(f"Unified data file not found at: {data_path}. Please run preprocess_data.py first.")
-        
-    df = pd.read_csv(data_path)
-    print(f"Total dataset size loaded: {len(df)} samples.")
-    
-    # Convert Pandas DataFrame to Hugging Face Dataset
-    dataset = Dataset.from_pandas(df.reset_index(drop=True))
-    
     # Initialize Tokenizer and Model
     tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
     
@@ -60,14 +114,56 @@ def prepare_data_and_model():
     model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, num_labels=2)
     model.to(device)
 
-    # Tokenization Function
-    def tokenize_function(examples):
-        # Truncation=True cuts text longer than 512 (max for RoBERTa)
-        # Padding='max_length' pads all samples to the same 512 length
-        return tokenizer(examples["content"], padding="max_length", truncation=True, max_length=512)
+    train_dataset, eval_dataset = load_tokenized_splits(tokenizer, base_path, padding_mode, use_cache)
+    
+    return model, tokenizer, train_dataset, eval_dataset, device
+
+
+def load_tokenized_splits(tokenizer, base_path=BASE_PATH, padding_mode=PADDING_MODE, use_cache=True, num_proc=TOKENIZE_NUM_PROC):
+    """Loads the unified dataset, tokenizes it (or reuses the cached tokenization) and returns the fixed (seed=42) train/eval split."""
+    # Load the unified dataset (Parquet; the legacy CSV is still accepted)
+    data_path = os.path.join(base_path, INPUT_FILE)
+    if not os.path.exists(data_path) and os.path.exists(os.path.join(base_path, LEGACY_INPUT_FILE)):
+        data_path = os.path.join(base_path, LEGACY_INPUT_FILE)
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"Unified data file not found at: {data_path}. Please run preprocess_data.py first.")
 
-    # Apply tokenization across the dataset
-    tokenized_dataset = dataset.map(tokenize_function, batched=True)
+    fingerprint = tokenization_fingerprint(data_path, tokenizer, MAX_LENGTH, padding_mode)
+    cache_path = os.path.join(base_path, TOKENIZED_CACHE_DIR, fingerprint)
+
+    if use_cache and os.path.exists(os.path.join(cache_path, 'dataset_info.json')):
+        # Arrow files are memory-mapped, so this is near-instant regardless of dataset size
+        tokenized_dataset = load_from_disk(cache_path)
+        print(f"Reusing cached tokenization ({len(tokenized_dataset)} samples) from: {cache_path}")
+    else:
+        if data_path.endswith('.parquet'):
+            # Arrow table straight into a Hugging Face Dataset, no text parsing or pandas round-trip
+            dataset = Dataset(pq.read_table(data_path, columns=['content', 'label']))
+        else:
+            df = pd.read_csv(data_path)
+            # Convert Pandas DataFrame to Hugging Face Dataset
+            dataset = Dataset.from_pandas(df.reset_index(drop=True))
+        print(f"Total dataset size loaded: {len(dataset)} samples.")
+
+        # Tokenization Function
+        def tokenize_function(examples):
+            # Truncation=True cuts text longer than 512 (max for RoBERTa)
+            if padding_mode == 'max_length':
+                # Padding='max_length' pads all samples to the same 512 length
+                return tokenizer(examples["content"], padding="max_length", truncation=True, max_length=MAX_LENGTH)
+            # No padding here: the collator pads each batch to its own longest sample
+            return tokenizer(examples["content"], truncation=True, max_length=MAX_LENGTH)
+
+        # Apply tokenization across the dataset, one worker per core (small datasets aren't worth the fork cost)
+        workers = max(1, min(num_proc, len(dataset) // 1000))
+        started = time.perf_counter()
+        tokenized_dataset = dataset.map(tokenize_function, batched=True, num_proc=workers if workers > 1 else None, remove_columns=["content"])
+        print(f"Tokenized {len(tokenized_dataset)} samples with {workers} process(es) in {time.perf_counter() - started:.1f}s.")
+
+        if use_cache:
+            tokenized_dataset.save_to_disk(cache_path)
+            tokenized_dataset = load_from_disk(cache_path)
+            print(f"Tokenized dataset cached at: {cache_path}")
     
     # Split the tokenized dataset into training and evaluation sets
     train_test_split_datasets = tokenized_dataset.train_test_split(test_size=0.2, seed=42)
@@ -77,12 +173,29 @@ def prepare_data_and_model():
     print(f"Training samples: {len(train_dataset)}")
     print(f"Evaluation samples: {len(eval_dataset)}")
     
-    return model, tokenizer, train_dataset, eval_dataset, device
+    return train_dataset, eval_dataset
+
+
+def tokenization_fingerprint(data_path, tokenizer, max_length, padding_mode):
+    """Hash of everything that determines the tokenized output: input file bytes, tokenizer definition and settings."""
+    digest = hashlib.sha256()
+    with open(data_path, 'rb') as f:
+        for block in iter(lambda: f.read(8 * 2**20), b''): digest.update(block)
+
+    if getattr(tokenizer, 'is_fast', False):
+        tokenizer_definition = tokenizer.backend_tokenizer.to_str()
+    else:
+        tokenizer_definition = json.dumps(sorted(tokenizer.get_vocab().items()))
+    digest.update(type(tokenizer).__name__.encode())
+    digest.update(tokenizer_definition.encode())
+    digest.update(json.dumps(tokenizer.special_tokens_map, sort_keys=True, default=str).encode())
+    digest.update(f"max_length={max_length};padding={padding_mode}".encode())
+    return digest.hexdigest()[:16]
 
 
 # --- 3. TRAINING EXECUTION ---
 # --- 3. TRAINING EXECUTION ---
-def run_training(model, tokenizer, train_dataset, eval_dataset):
+def run_training(model, tokenizer, train_dataset, eval_dataset, padding_mode=PADDING_MODE):
     print("\n--- Starting Model Fine-Tuning ---")
     
     # Define Training Arguments (Hyperparameters)
@@ -104,8 +217,11 @@ def run_training(model, tokenizer, train_dataset, eval_dataset):
         
         load_best_model_at_end=True,            # Load the model with the best evaluation metric (F1/Accuracy)
         report_to="none",                       # Prevent automatic logging to external services
+        **padding_training_kwargs(padding_mode),
     )
 
+    epoch_callback = EpochThroughputCallback(len(train_dataset))
+
     # Initialize the Trainer
     trainer = Trainer(
         model=model,
@@ -113,11 +229,14 @@ def run_training(model, tokenizer, train_dataset, eval_dataset):
         train_dataset=train_dataset,
         eval_dataset=eval_dataset,
         tokenizer=tokenizer,
+        data_collator=build_data_collator(tokenizer, padding_mode),
         compute_metrics=compute_metrics,
+        callbacks=[epoch_callback],
     )
 
     # Train the model
-    trainer.train()
+    train_output = trainer.train()
+    print_throughput_report(train_output.metrics, epoch_callback, padding_mode)
     
     # Evaluate the final model on the held-out test set
     results = trainer.evaluate()
@@ -132,11 +251,208 @@ def run_training(model, tokenizer, train_dataset, eval_dataset):
     print(f"\nModel fine-tuning complete and saved to: {final_output_path}")
 
 
+# --- 4. KNOWLEDGE DISTILLATION (COMPACT STUDENT FOR CPU SERVING) ---
+def build_student_from_teacher(teacher, num_layers=STUDENT_NUM_LAYERS):
+    """
+    Creates a shallower copy of the teacher: same config, tokenizer and embeddings, keeping
+    `num_layers` evenly spaced encoder layers. The result saves in the same layout as the
+    teacher, so app.py can load it without changes.
+    """
+    config = teacher.config.__class__.from_dict(teacher.config.to_dict())
+    teacher_layers = config.num_hidden_layers
+    config.num_hidden_layers = num_layers
+    student = AutoModelForSequenceClassification.from_config(config)
+
+    # Start from the teacher's weights rather than random init (layer-dropping init)
+    teacher_state = teacher.state_dict()
+    base_prefix = teacher.base_model_prefix
+    layer_map = np.linspace(0, teacher_layers - 1, num_layers).round().astype(int)
+    student_state = {}
+    for key in student.state_dict():
+        layer_marker = f"{base_prefix}.encoder.layer."
+        if key.startswith(layer_marker):
+            student_index, rest = key[len(layer_marker):].split('.', 1)
+            student_state[key] = teacher_state[f"{layer_marker}{layer_map[int(student_index)]}.{rest}"]
+        elif key in teacher_state:
+            student_state[key] = teacher_state[key]
+    student.load_state_dict(student_state, strict=False)
+    print(f"Student initialised with teacher layers {layer_map.tolist()} ({num_layers}/{teacher_layers}).")
+    return student
+
+
+def compute_teacher_logits(teacher, tokenizer, dataset, device, batch_size=64):
+    """Runs the teacher once over the training split; soft targets are stored as a column instead of re-running it every epoch."""
+    teacher.eval()
+    teacher.to(device)
+    input_ids = dataset["input_ids"]
+    # Visit samples shortest-first so each padded batch wastes as little compute as possible
+    order = np.argsort([len(ids) for ids in input_ids], kind="stable")
+    all_logits = np.zeros((len(input_ids), teacher.config.num_labels), dtype=np.float32)
+    for start in range(0, len(order), batch_size):
+        batch_index = order[start:start + batch_size]
+        inputs = tokenizer.pad({"input_ids": [input_ids[i] for i in batch_index]}, return_tensors="pt").to(device)
+        with torch.no_grad(): all_logits[batch_index] = teacher(**inputs).logits.float().cpu().numpy()
+    return all_logits.tolist()
+
+
+class DistillationTrainer(Trainer):
+    """Trainer whose loss mixes KL(student || teacher soft targets) with the usual cross-entropy."""
+
+    def __init__(self, *args, temperature=DISTILL_TEMPERATURE, alpha=DISTILL_ALPHA, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(self, model, inputs, return_outputs=False, num_items_in_batch=None):
+        teacher_logits = inputs.pop("teacher_logits", None)
+        outputs = model(**inputs)
+        hard_loss = outputs.loss
+        if teacher_logits is None: # Evaluation batches carry hard labels only
+            return (hard_loss, outputs) if return_outputs else hard_loss
+
+        t = self.temperature
+        soft_loss = F.kl_div(
+            F.log_softmax(outputs.logits / t, dim=-1),
+            F.softmax(teacher_logits.to(outputs.logits.dtype) / t, dim=-1),
+            reduction="batchmean",
+        ) * (t ** 2)
+        loss = self.alpha * soft_loss + (1.0 - self.alpha) * hard_loss
+        return (loss, outputs) if return_outputs else loss
+
+
+def model_size_mb(model_dir):
+    weight_files = [f for f in os.listdir(model_dir) if f.endswith(('.safetensors', '.bin')) and f != 'training_args.bin']
+    return round(sum(os.path.getsize(os.path.join(model_dir, f)) for f in weight_files) / 2**20, 1)
+
+
+def benchmark_model(model, tokenizer, eval_texts, eval_labels, sample_size=LATENCY_SAMPLE_SIZE):
+    """Accuracy/F1 over the eval split and single-item CPU latency (the way app.py calls the model)."""
+    model.eval()
+    model.to(torch.device("cpu"))
+    preds = []
+    for start in range(0, len(eval_texts), 32):
+        inputs = tokenizer(eval_texts[start:start + 32], return_tensors="pt", padding=True, truncation=True, max_length=512)
+        with torch.no_grad(): preds.extend(model(**inputs).logits.argmax(dim=-1).tolist())
+
+    latencies = []
+    for text in eval_texts[:sample_size]:
+        inputs = tokenizer([text], return_tensors="pt", truncation=True, max_length=512)
+        started = time.perf_counter()
+        with torch.no_grad(): model(**inputs)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "accuracy": round(accuracy_score(eval_labels, preds), 4),
+        "f1_score": round(f1_score(eval_labels, preds), 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 2),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 2),
+        "num_parameters": sum(p.numel() for p in model.parameters()),
+    }
+
+
+def run_distillation(base_path=BASE_PATH, teacher_dir=TEACHER_MODEL_DIR, output_dir=DISTILLED_MODEL_DIR,
+                     num_layers=STUDENT_NUM_LAYERS, student_model=None, epochs=3, padding_mode=PADDING_MODE, use_cache=True):
+    print("\n--- Starting Knowledge Distillation ---")
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print(f"Using device: {device}")
+
+    tokenizer = AutoTokenizer.from_pretrained(teacher_dir)
+    teacher = AutoModelForSequenceClassification.from_pretrained(teacher_dir, local_files_only=True)
+
+    train_dataset, eval_dataset = load_tokenized_splits(tokenizer, base_path, padding_mode, use_cache)
+    train_dataset = train_dataset.remove_columns([c for c in train_dataset.column_names if c not in ('input_ids', 'attention_mask', 'label')])
+    eval_dataset = eval_dataset.remove_columns([c for c in eval_dataset.column_names if c not in ('input_ids', 'attention_mask', 'label')])
+
+    print("Computing teacher soft logits over the training split...")
+    train_dataset = train_dataset.add_column("teacher_logits", compute_teacher_logits(teacher, tokenizer, train_dataset, device))
+
+    if student_model:
+        # Pre-trained compact model sharing the teacher's tokenizer (e.g. distilroberta-base)
+        student = AutoModelForSequenceClassification.from_pretrained(student_model, num_labels=2)
+    else:
+        student = build_student_from_teacher(teacher, num_layers)
+    student.to(device)
+
+    training_args = TrainingArguments(
+        output_dir=os.path.join(output_dir, 'checkpoints'),
+        num_train_epochs=epochs,
+        per_device_train_batch_size=16,
+        per_device_eval_batch_size=16,
+        warmup_steps=500,
+        weight_decay=0.01,
+        logging_dir='./logs',
+        logging_steps=500,
+        eval_strategy="epoch",
+        save_strategy="epoch",
+        load_best_model_at_end=True,
+        remove_unused_columns=False, # Keep 'teacher_logits' for compute_loss
+        report_to="none",
+        **padding_training_kwargs(padding_mode),
+    )
+
+    epoch_callback = EpochThroughputCallback(len(train_dataset))
+    trainer = DistillationTrainer(
+        model=student,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=eval_dataset,
+        tokenizer=tokenizer,
+        data_collator=build_data_collator(tokenizer, padding_mode),
+        compute_metrics=compute_metrics,
+        callbacks=[epoch_callback],
+    )
+    train_output = trainer.train()
+    print_throughput_report(train_output.metrics, epoch_callback, padding_mode)
+
+    trainer.save_model(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    print(f"\nDistilled student saved to: {output_dir}")
+
+    # --- Teacher vs. student report (quality vs. CPU latency and size) ---
+    eval_texts = tokenizer.batch_decode(eval_dataset["input_ids"], skip_special_tokens=True)
+    eval_labels = eval_dataset["label"]
+    report = {}
+    for name, model, model_dir in (("teacher", teacher, teacher_dir), ("student", trainer.model, output_dir)):
+        report[name] = benchmark_model(model, tokenizer, eval_texts, eval_labels)
+        report[name]["size_mb"] = model_size_mb(model_dir)
+    report["speedup"] = round(report["teacher"]["latency_ms_p50"] / max(report["student"]["latency_ms_p50"], 1e-6), 2)
+    report["size_ratio"] = round(report["student"]["size_mb"] / max(report["teacher"]["size_mb"], 1e-6), 3)
+
+    print("\n--- Distillation Report ---")
+    print(f"{'model':<8} {'accuracy':>9} {'f1':>7} {'p50 ms':>8} {'p95 ms':>8} {'size MB':>8} {'params':>12}")
+    for name in ("teacher", "student"):
+        r = report[name]
+        print(f"{name:<8} {r['accuracy']:>9.4f} {r['f1_score']:>7.4f} {r['latency_ms_p50']:>8.2f} {r['latency_ms_p95']:>8.2f} {r['size_mb']:>8.1f} {r['num_parameters']:>12,}")
+    print(f"Speedup: {report['speedup']}x, size ratio: {report['size_ratio']}")
+
+    with open(os.path.join(output_dir, 'distillation_report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
 # --- MAIN EXECUTION ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fine-tune the RoBERTa classifier or distill it into a compact student.")
+    parser.add_argument('--mode', choices=['finetune', 'distill'], default='finetune')
+    parser.add_argument('--data-dir', default=BASE_PATH, help="Directory containing the unified dataset.")
+    parser.add_argument('--teacher-dir', default=TEACHER_MODEL_DIR)
+    parser.add_argument('--output-dir', default=DISTILLED_MODEL_DIR)
+    parser.add_argument('--student-layers', type=int, default=STUDENT_NUM_LAYERS)
+    parser.add_argument('--student-model', default=None, help="Optional pre-trained student (e.g. distilroberta-base) instead of layer-dropping the teacher.")
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--padding', choices=['dynamic', 'max_length'], default=PADDING_MODE,
+                        help="'max_length' reproduces the old fixed 512 padding for before/after throughput comparisons.")
+    parser.add_argument('--no-tokenize-cache', action='store_true', help="Always re-tokenize instead of reusing the fingerprinted cache.")
+    args = parser.parse_args()
+
     try:
-        model, tokenizer, train_dataset, eval_dataset, device = prepare_data_and_model()
-        run_training(model, tokenizer, train_dataset, eval_dataset)
+        if args.mode == 'distill':
+            run_distillation(base_path=args.data_dir, teacher_dir=args.teacher_dir, output_dir=args.output_dir,
+                             num_layers=args.student_layers, student_model=args.student_model, epochs=args.epochs,
+                             padding_mode=args.padding, use_cache=not args.no_tokenize_cache)
+        else:
+            model, tokenizer, train_dataset, eval_dataset, device = prepare_data_and_model(args.data_dir, args.padding, not args.no_tokenize_cache)
+            run_training(model, tokenizer, train_dataset, eval_dataset, args.padding)
         
         # Optional: Clean up checkpoint directories to save disk space
         # import shutil
@@ -144,6 +460,6 @@ if __name__ == "__main__":
         
     except FileNotFoundError as e:
         print(f"\nFATAL ERROR: {e}")
-        print("ACTION REQUIRED: Ensure 'unified_fake_news_data.csv' exists in the data-sets directory.")
+        print("ACTION REQUIRED: Ensure 'unified_fake_news_data.parquet' exists in the data-sets directory (run preprocess_data.py).")
     except Exception as e:
         print(f"\nAN UNEXPECTED ERROR OCCURRED DURING TRAINING: {e}")
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+Vector index over the pooled RoBERTa embeddings of analyzed articles ("similar past verdicts").
+
+Vectors live in one contiguous float32 matrix (L2-normalised, so cosine similarity is a dot
+product). Small indexes are searched exactly by brute force; past ANN_MIN_ITEMS an inverted-file
+index (k-means coarse quantizer, only the nearest IVF_NPROBE lists are scanned) keeps queries in
+the millisecond range. Each list keeps its own array of row numbers, so a query only touches the
+rows of the lists it probes.
+
+Persistence is an append-only JSON-lines log, one record per save (metadata + base64 vector),
+written with a single O_APPEND write. Every gunicorn worker keeps its own copy and tails the log
+before searching, so additions from other workers show up without a restart. Re-analyzed URLs
+overwrite their row; the log is compacted once it holds more than twice the live records.
+Appends and compactions take an exclusive flock on a sidecar lock file, so a compaction in one
+worker never drops a record another worker is appending (no cross-process lock on Windows,
+where the app runs as a single process).
+"""
+import os
+import json
+import time
+import base64
+import threading
+import contextlib
+
+import numpy as np
+
+try: import fcntl
+except ImportError: fcntl = None
+
+# --- CONFIGURATION ---
+LOG_FILE = 'index.jsonl'
+LOCK_FILE = 'index.jsonl.lock'
+ANN_MIN_ITEMS = int(os.getenv("VECTOR_INDEX_ANN_MIN_ITEMS", 20000))
+IVF_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", 8))
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 40
+
+
+def normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def group_rows(assignments, nlist):
+    """Row numbers of each IVF list, as one int32 array per list."""
+    order = np.argsort(assignments, kind='stable').astype(np.int32)
+    return np.split(order, np.cumsum(np.bincount(assignments, minlength=nlist))[:-1])
+
+
+# --- INVERTED-FILE (IVF) APPROXIMATE SEARCH ---
+class IVFQuantizer:
+    """k-means centroids over the stored vectors; each row is assigned to its nearest centroid."""
+
+    def __init__(self, centroids, trained_on):
+        self.centroids = centroids
+        self.trained_on = trained_on
+
+    @classmethod
+    def train(cls, matrix, seed=42):
+        n = len(matrix)
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = matrix[rng.choice(n, size=min(n, nlist * KMEANS_SAMPLE_PER_LIST), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members): centroids[c] = normalize(members.mean(axis=0))
+        return cls(centroids, n)
+
+    def assign(self, vectors):
+        return np.argmax(np.atleast_2d(vectors) @ self.centroids.T, axis=1).astype(np.int32)
+
+    def probe(self, query, nprobe):
+        scores = self.centroids @ query
+        nprobe = min(nprobe, len(scores))
+        return np.argpartition(-scores, nprobe - 1)[:nprobe]
+
+
+# --- VECTOR INDEX ---
+class VectorIndex:
+    def __init__(self, index_dir, dim):
+        self.index_dir = index_dir
+        self.log_path = os.path.join(index_dir, LOG_FILE)
+        self.lock_path = os.path.join(index_dir, LOCK_FILE)
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._reset()
+        os.makedirs(index_dir, exist_ok=True)
+        with self._lock: self._read_log()
+
+    def _reset(self):
+        self._matrix = np.zeros((1024, self.dim), dtype=np.float32)
+        self._assignments = np.zeros(1024, dtype=np.int32)
+        self._list_rows = [] # IVF list -> row numbers (buffer, filled up to _list_sizes)
+        self._list_sizes = None
+        self._items = [] # metadata per row
+        self._rows = {} # key -> row
+        self._log_offset = 0
+        self._log_inode = None
+        self._log_records = 0
+        self._quantizer = None
+
+    def __len__(self):
+        return len(self._items)
+
+    # --- storage ---
+    def _list_append(self, list_id, row):
+        size = self._list_sizes[list_id]
+        if size == len(self._list_rows[list_id]): # grow geometrically, like the matrix
+            self._list_rows[list_id] = np.concatenate([self._list_rows[list_id], np.zeros(max(16, size), dtype=np.int32)])
+        self._list_rows[list_id][size] = row
+        self._list_sizes[list_id] = size + 1
+
+    def _list_remove(self, list_id, row):
+        size = self._list_sizes[list_id]
+        rows = self._list_rows[list_id]
+        position = np.flatnonzero(rows[:size] == row)[0]
+        rows[position] = rows[size - 1] # order within a list does not matter
+        self._list_sizes[list_id] = size - 1
+
+    def _set_row(self, key, vector, metadata):
+        row = self._rows.get(key)
+        overwrite = row is not None
+        if row is None:
+            row = len(self._items)
+            if row == len(self._matrix): # grow geometrically, stay contiguous
+                self._matrix = np.concatenate([self._matrix, np.zeros_like(self._matrix)])
+                self._assignments = np.concatenate([self._assignments, np.zeros_like(self._assignments)])
+            self._items.append(None)
+            self._rows[key] = row
+        self._matrix[row] = vector
+        self._items[row] = {**metadata, "key": key}
+        if self._quantizer is not None:
+            list_id = self._quantizer.assign(vector)[0]
+            if overwrite and self._assignments[row] == list_id: return
+            if overwrite: self._list_remove(self._assignments[row], row)
+            self._assignments[row] = list_id
+            self._list_append(list_id, row)
+
+    def _maybe_train(self):
+        n = len(self._items)
+        if n < ANN_MIN_ITEMS: self._quantizer = None; self._list_rows, self._list_sizes = [], None; return
+        if self._quantizer is None or n > 2 * self._quantizer.trained_on:
+            self._quantizer = IVFQuantizer.train(self._matrix[:n])
+            self._assignments[:n] = self._quantizer.assign(self._matrix[:n])
+            self._list_rows = group_rows(self._assignments[:n], len(self._quantizer.centroids))
+            self._list_sizes = np.array([len(rows) for rows in self._list_rows], dtype=np.int64)
+
+    def _read_log(self):
+        """Reads records appended since the last call (all of them after a compaction elsewhere)."""
+        try: stat = os.stat(self.log_path)
+        except FileNotFoundError: return
+        if self._log_inode is not None and (stat.st_ino != self._log_inode or stat.st_size < self._log_offset):
+            self._reset()
+        self._log_inode = stat.st_ino
+        if stat.st_size == self._log_offset: return
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        complete = data.rfind(b'\n') + 1 # ignore a partially written trailing record
+        for line in data[:complete].splitlines():
+            try:
+                record = json.loads(line)
+                vector = np.frombuffer(base64.b64decode(record.pop('vector')), dtype=np.float32)
+            except (ValueError, KeyError): continue
+            if len(vector) != self.dim: continue
+            self._set_row(record.pop('key'), vector, record)
+            self._log_records += 1
+        self._log_offset += complete
+        self._maybe_train()
+
+    @contextlib.contextmanager
+    def _log_lock(self):
+        """Exclusive lock on the log across worker processes (held for an append or a compaction)."""
+        if fcntl is None: yield; return
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally: os.close(fd) # closing the descriptor releases the lock
+
+    def _append_log(self, record):
+        line = (json.dumps(record) + '\n').encode('utf-8')
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try: os.write(fd, line)
+        finally: os.close(fd)
+
+    def _compact(self):
+        """Rewrites the log with one record per live row. Caller holds _log_lock."""
+        self._read_log() # records appended by other workers before we took the lock must survive
+        tmp_path = self.log_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for row, item in enumerate(self._items):
+                record = {**item, "vector": base64.b64encode(self._matrix[row].tobytes()).decode('ascii')}
+                f.write((json.dumps(record) + '\n').encode('utf-8'))
+        os.replace(tmp_path, self.log_path)
+        stat = os.stat(self.log_path)
+        self._log_inode, self._log_offset, self._log_records = stat.st_ino, stat.st_size, len(self._items)
+
+    # --- public API ---
+    def add(self, key, vector, metadata):
+        """Inserts or overwrites `key` and persists it (one appended log record)."""
+        vector = normalize(vector)
+        if len(vector) != self.dim: raise ValueError(f"Expected a {self.dim}-d vector, got {len(vector)}")
+        record = {**metadata, "key": key, "vector": base64.b64encode(vector.tobytes()).decode('ascii')}
+        with self._lock, self._log_lock():
+            self._append_log(record)
+            self._read_log() # applies our record along with anything other workers appended
+            if self._log_records > 2 * len(self._items) + 100: self._compact()
+
+    def get_vector(self, key):
+        with self._lock:
+            self._read_log()
+            row = self._rows.get(key)
+            return None if row is None else self._matrix[row].copy()
+
+    def search(self, vector, k=5, exclude_key=None):
+        """Top-k most similar items as (similarity, metadata), plus the search mode used."""
+        query = normalize(vector)
+        with self._lock:
+            self._read_log()
+            n = len(self._items)
+            if n == 0: return [], "exact"
+            if self._quantizer is not None:
+                lists = self._quantizer.probe(query, IVF_NPROBE)
+                candidates = np.concatenate([self._list_rows[l][:self._list_sizes[l]] for l in lists])
+                mode = "ivf"
+            else:
+                candidates = None
+                mode = "exact"
+
+            scores = self._matrix[:n] @ query if candidates is None else self._matrix[candidates] @ query
+            rows = np.arange(n) if candidates is None else candidates
+            fetch = min(len(scores), k + 1)
+            if fetch == 0: return [], mode
+            top = np.argpartition(-scores, fetch - 1)[:fetch]
+            top = top[np.argsort(-scores[top])]
+            results = [(float(scores[i]), dict(self._items[rows[i]])) for i in top if self._items[rows[i]]['key'] != exclude_key]
+            return results[:k], mode
+
+
+def benchmark(dim=768, sizes=(1000, 10000, 50000), queries=50):
+    """Prints brute-force vs IVF query latency and recall@10 on clustered synthetic unit vectors."""
+    rng = np.random.default_rng(0)
+    noise = lambda rows, scale: scale / np.sqrt(dim) * rng.standard_normal((rows, dim)).astype(np.float32)
+    for n in sizes:
+        topics = rng.standard_normal((max(10, n // 100), dim)).astype(np.float32) / np.sqrt(dim)
+        matrix = topics[rng.integers(len(topics), size=n)] + noise(n, 0.7)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        qs = matrix[rng.choice(n, queries)] + noise(queries, 0.3)
+        quantizer = IVFQuantizer.train(matrix)
+        list_rows = group_rows(quantizer.assign(matrix), len(quantizer.centroids))
+        exact_ms, ivf_ms, recall = [], [], []
+        for q in qs:
+            q = normalize(q)
+            t = time.perf_counter(); exact = np.argsort(-(matrix @ q))[:10]; exact_ms.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            candidates = np.concatenate([list_rows[l] for l in quantizer.probe(q, IVF_NPROBE)])
+            approx = candidates[np.argsort(-(matrix[candidates] @ q))[:10]]
+            ivf_ms.append(time.perf_counter() - t)
+            recall.append(len(set(exact) & set(approx)) / 10)
+        print(f"n={n:>7}  exact={np.mean(exact_ms) * 1000:.2f}ms  ivf={np.mean(ivf_ms) * 1000:.2f}ms  recall@10={np.mean(recall):.2f}")
+
+
+if __name__ == "__main__":
+    benchmark()